@@ -0,0 +1,323 @@
+# archive.py
+
+import mmap
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from board import Board
+from errors import LogFormatError
+from simlog import pack_cells, sync_state, truncate_log, unpack_cells
+
+# --- Archive layout ---
+#
+# Header (HEADER_SIZE bytes, zero padded):
+#   magic      6 bytes  b"GOLARC"
+#   version    uint8
+#   packed     uint8    (0 = one byte per cell, 1 = 8 cells per byte)
+#   rows       uint32
+#   cols       uint32
+#   frame_size uint32   (bytes per frame, including the generation number)
+#   rule_len   uint16, followed by the ruleset name (UTF-8, max 64 bytes)
+#
+# Frames (all the same size, starting at HEADER_SIZE):
+#   generation uint64
+#   cells      rows*cols bytes (or ceil(rows*cols/8) when packed),
+#              zero padded to a multiple of 8 bytes
+#
+# Because every frame has the same size, frame i starts at
+# HEADER_SIZE + i * frame_size and can be read without touching the rest
+# of the file. Unpacked frames are 8-byte aligned, so they can be viewed
+# as a (rows, cols) uint8 array without copying.
+
+MAGIC = b"GOLARC"
+VERSION = 1
+HEADER = struct.Struct("<6sBBIIIH")
+HEADER_SIZE = 128
+MAX_RULE_LEN = HEADER_SIZE - HEADER.size
+GENERATION = struct.Struct("<Q")
+
+
+def _frame_size(cell_bytes: int) -> int:
+    return GENERATION.size + (cell_bytes + 7) // 8 * 8
+
+
+class ArchiveWriter:
+    """
+    Writes every logged generation as a fixed-size frame.
+
+    Has the same write / write_frame / flush / close interface as the
+    writers in simlog.py, so it can be used as run_simulation's log
+    (log_format="archive") and wrapped by AsyncLogWriter.
+    The file is overwritten, not appended to.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        rows: int,
+        cols: int,
+        ruleset_name: str,
+        packed: bool = False,
+        resume: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param filepath: Path to the archive file.
+        :param rows: Number of rows of the archived board.
+        :param cols: Number of columns of the archived board.
+        :param ruleset_name: Ruleset name stored in the header.
+        :param packed: Store 8 cells per byte (8x smaller, but frames
+                       must be unpacked instead of viewed in place).
+        :param resume: State from checkpoint_state(): the existing archive
+                       is truncated after the checkpointed frame and
+                       appended to instead of overwritten.
+        :raises LogFormatError: If the ruleset name is too long.
+        """
+        rule = ruleset_name.encode("utf-8")
+        if len(rule) > MAX_RULE_LEN:
+            raise LogFormatError(
+                f"Ruleset name is too long for the archive header "
+                f"({len(rule)} bytes)"
+            )
+
+        self.filepath = filepath
+        self.rows = rows
+        self.cols = cols
+        self.packed = packed
+        cell_bytes = (rows * cols + 7) // 8 if packed else rows * cols
+        self.frame_size = _frame_size(cell_bytes)
+        self._padding = bytes(self.frame_size - GENERATION.size - cell_bytes)
+        self.generation = -1
+
+        if resume is not None:
+            truncate_log(filepath, resume["offset"])
+            self._file: BinaryIO = open(filepath, "ab")
+            self.generation = resume["generation"]
+            return
+
+        self._file = open(filepath, "wb")
+        header = HEADER.pack(
+            MAGIC, VERSION, 1 if packed else 0, rows, cols, self.frame_size, len(rule)
+        ) + rule
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def write(self, board: Board, generation: int) -> None:
+        """
+        Append one generation.
+        """
+        self.write_frame(generation, board.cols, board.to_bytes())
+
+    def write_frame(self, generation: int, cols: int, cells: bytes) -> None:
+        """
+        Append one generation given as a cell snapshot (see Board.to_bytes).
+        """
+        if len(cells) != self.rows * self.cols:
+            raise LogFormatError(
+                f"Frame has {len(cells)} cells, "
+                f"archive expects {self.rows}x{self.cols}"
+            )
+
+        if self.packed:
+            cells = pack_cells(cells)
+
+        self._file.write(GENERATION.pack(generation))
+        self._file.write(cells)
+        self._file.write(self._padding)
+        self.generation = generation
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush the archive to disk and return the state needed to resume it.
+        """
+        return sync_state(self._file, self.generation)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ArchiveReader:
+    """
+    Random access to the generations of an archive through mmap.
+
+    Opening the reader only maps the file; a generation is located by
+    its frame offset (or a binary search if some generations were not
+    logged), so reading generation N never reads the frames before it.
+    The mapping is read-only, so any number of processes can open their
+    own reader on the same file at the same time, even while it is being
+    written (call refresh() to see frames added since opening).
+
+    Views returned by frame_view() / array() point into the mapping:
+    release them before calling close().
+    """
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Map the archive and read its header.
+
+        :raises LogFormatError: If the file is not a simulation archive.
+        """
+        self.filepath = filepath
+        self._file = open(filepath, "rb")
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            header = self._file.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise LogFormatError(f"File is too short to be an archive: {filepath}")
+
+            (magic, version, packed,
+             rows, cols, frame_size, rule_len) = HEADER.unpack_from(header)
+            if magic != MAGIC:
+                raise LogFormatError(f"Not a simulation archive: {filepath}")
+            if version != VERSION:
+                raise LogFormatError(f"Unsupported archive version: {version}")
+
+            rule = header[HEADER.size:HEADER.size + rule_len]
+            self.ruleset_name = rule.decode("utf-8")
+            self.rows = rows
+            self.cols = cols
+            self.packed = bool(packed)
+            self.frame_size = frame_size
+            self.refresh()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def refresh(self) -> None:
+        """
+        Re-map the file to pick up frames appended by a running writer.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        """
+        Number of complete frames in the archive.
+        """
+        assert self._mmap is not None
+        return (len(self._mmap) - HEADER_SIZE) // self.frame_size
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + index * self.frame_size
+
+    def generation_at(self, index: int) -> int:
+        """
+        Return the generation number stored in frame `index`.
+        """
+        assert self._mmap is not None
+        return GENERATION.unpack_from(self._mmap, self._offset(index))[0]
+
+    def index_of(self, generation: int) -> int:
+        """
+        Return the frame index that holds the given generation.
+
+        O(1) when every generation was logged (frame i = generation i - first),
+        otherwise a binary search over the (increasing) generation numbers.
+
+        :raises KeyError: If the generation is not in the archive.
+        """
+        count = len(self)
+        if count == 0:
+            raise KeyError(generation)
+
+        guess = generation - self.generation_at(0)
+        if 0 <= guess < count and self.generation_at(guess) == generation:
+            return guess
+
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.generation_at(mid) < generation:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < count and self.generation_at(lo) == generation:
+            return lo
+        raise KeyError(generation)
+
+    def frame_view(self, generation: int) -> memoryview:
+        """
+        Return a zero-copy view of the cells of a generation.
+
+        Unpacked archives give a (rows, cols) view of one byte per cell;
+        packed archives give the flat packed bytes.
+        """
+        assert self._mmap is not None
+        start = self._offset(self.index_of(generation)) + GENERATION.size
+        view = memoryview(self._mmap)
+        if self.packed:
+            return view[start:start + (self.rows * self.cols + 7) // 8]
+        frame = view[start:start + self.rows * self.cols]
+        return frame.cast("B", (self.rows, self.cols))
+
+    def cells(self, generation: int) -> bytes:
+        """
+        Return the cells of a generation as one byte per cell (a copy).
+        """
+        view = self.frame_view(generation)
+        if self.packed:
+            return unpack_cells(bytes(view), self.rows * self.cols)
+        return view.tobytes()
+
+    def array(self, generation: int) -> Any:
+        """
+        Return a generation as a (rows, cols) NumPy uint8 array.
+
+        For unpacked archives the array is a read-only view into the
+        mapping (no copy). Requires NumPy.
+        """
+        import numpy as np
+
+        if self.packed:
+            bits = np.frombuffer(self.frame_view(generation), dtype=np.uint8)
+            cells = np.unpackbits(bits)[:self.rows * self.cols]
+            return cells.reshape(self.rows, self.cols)
+
+        assert self._mmap is not None
+        start = self._offset(self.index_of(generation)) + GENERATION.size
+        return np.frombuffer(
+            self._mmap, dtype=np.uint8, count=self.rows * self.cols, offset=start
+        ).reshape(self.rows, self.cols)
+
+    def board(self, generation: int) -> Board:
+        """
+        Return a generation as a (new) Board.
+        """
+        return Board.from_bytes(self.rows, self.cols, self.cells(generation))
+
+    def generations(
+        self, start: int = 0, stop: Optional[int] = None, step: int = 1
+    ) -> Iterator[Tuple[int, memoryview]]:
+        """
+        Iterate over (generation, frame_view) for generations in
+        range(start, stop, step) that are present in the archive.
+        Each view must be released before the reader is closed.
+        """
+        count = len(self)
+        if count == 0:
+            return
+        if stop is None:
+            stop = self.generation_at(count - 1) + 1
+
+        for generation in range(start, stop, step):
+            try:
+                yield generation, self.frame_view(generation)
+            except KeyError:
+                continue
+
+    def close(self) -> None:
+        """
+        Unmap and close the archive.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
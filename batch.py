@@ -0,0 +1,342 @@
+# batch.py
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from board import Board
+from cycles import CycleDetector
+from engine import run_simulation
+from errors import GameOfLifeError
+from metrics import SummaryObserver
+from patterns import load_pattern, save_rle
+from simlog import LOG_FORMATS
+
+# Default sweep axes of random soups
+DEFAULT_DENSITIES = (0.35,)
+DEFAULT_SEEDS = (0,)
+
+# Extension of the per-run log files, by log format
+LOG_EXTENSIONS = {"text": ".log", "binary": ".glog", "archive": ".garc"}
+
+# Type alias for one run of a sweep (JSON-serializable, sent to the workers)
+Job = Dict[str, Any]
+
+
+def parse_size(spec: str) -> Tuple[int, int]:
+    """
+    Parse a soup size such as "256x128" (rows x cols) or "256" (square).
+
+    :raises ValueError: If the spec is not one or two positive integers.
+    """
+    parts = spec.lower().split("x")
+    if len(parts) not in (1, 2) or not all(p.isdigit() and int(p) > 0 for p in parts):
+        raise ValueError(f"Invalid soup size {spec!r}, expected e.g. 256x128")
+    rows = int(parts[0])
+    cols = int(parts[-1])
+    return rows, cols
+
+
+def random_soup(rows: int, cols: int, density: float, seed: int) -> Board:
+    """
+    Return a board where each cell is alive with probability `density`.
+    The same (size, density, seed) always gives the same board.
+    """
+    rng = random.Random(seed)
+    board = Board(rows, cols)
+    # One draw per cell in row-major order, written in one bulk copy
+    board.cells[:] = bytes(rng.random() < density for _ in range(rows * cols))
+    return board
+
+
+def build_jobs(
+    patterns: Sequence[str],
+    soups: Sequence[Tuple[int, int]],
+    densities: Sequence[float],
+    seeds: Sequence[int],
+    rulesets: Sequence[str],
+    steps: int,
+    engine_name: str = "python",
+) -> List[Job]:
+    """
+    Expand the sweep into one job per run:
+    pattern x ruleset, plus soup size x density x seed x ruleset.
+    """
+    jobs: List[Job] = []
+    for filepath, ruleset_name in itertools.product(patterns, rulesets):
+        jobs.append({"pattern": filepath, "ruleset": ruleset_name})
+    for (rows, cols), density, seed, ruleset_name in itertools.product(
+        soups, densities, seeds, rulesets
+    ):
+        jobs.append({
+            "rows": rows,
+            "cols": cols,
+            "density": density,
+            "seed": seed,
+            "ruleset": ruleset_name,
+        })
+
+    for run, job in enumerate(jobs):
+        job.update(run=run, engine=engine_name, steps=steps)
+    return jobs
+
+
+def _job_name(job: Job) -> str:
+    """
+    File name (without extension) for the outputs of one run.
+    """
+    if "pattern" in job:
+        source = os.path.splitext(os.path.basename(job["pattern"]))[0]
+    else:
+        source = f"soup-{job['rows']}x{job['cols']}-d{job['density']}-s{job['seed']}"
+    ruleset_name = job["ruleset"].replace("/", "_")
+    return f"{job['run']:05d}-{source}-{ruleset_name}"
+
+
+def run_job(job: Job) -> Dict[str, Any]:
+    """
+    Run one job and return a JSON-serializable result record.
+
+    Runs stop early on extinction or a repeating state unless the job has
+    "stop": False. Errors of the simulation (bad pattern file, unknown
+    ruleset, ...) and file errors (unreadable pattern, unwritable log or
+    save directory) are reported in the "error" field instead of raised, so
+    one bad run does not stop the sweep.
+
+    Optional job keys: "log_dir" and "log_format" (per-run simulation log),
+    "save_dir" (final board as RLE).
+    """
+    record: Dict[str, Any] = dict(job)
+    start = time.perf_counter()
+    try:
+        if "pattern" in job:
+            board = load_pattern(job["pattern"])
+        else:
+            board = random_soup(job["rows"], job["cols"], job["density"], job["seed"])
+        record.update(rows=board.rows, cols=board.cols)
+
+        log_file = None
+        log_format = job.get("log_format", "text")
+        if job.get("log_dir"):
+            log_file = os.path.join(
+                job["log_dir"], _job_name(job) + LOG_EXTENSIONS[log_format]
+            )
+            # The text log is appended to, so start from an empty file
+            if os.path.exists(log_file):
+                os.remove(log_file)
+
+        detector = CycleDetector() if job.get("stop", True) else None
+        summary = SummaryObserver()
+        final_board = run_simulation(
+            board=board,
+            ruleset_name=job["ruleset"],
+            steps=job["steps"],
+            log_file=log_file,
+            engine_name=job["engine"],
+            log_format=log_format,
+            detector=detector,
+            observers=[summary],
+        )
+
+        if job.get("save_dir"):
+            save_rle(
+                final_board,
+                os.path.join(job["save_dir"], _job_name(job) + ".rle"),
+                job["ruleset"],
+            )
+
+        result = detector.result if detector is not None else None
+        record.update(summary.summary())
+        record.update(
+            end=result.kind if result is not None else None,
+            period=result.period if result is not None else None,
+            end_generation=result.generation if result is not None else None,
+            log_file=log_file,
+            error=None,
+        )
+    except (GameOfLifeError, OSError) as e:
+        # OSError: unreadable pattern, unwritable log or save directory
+        record["error"] = str(e)
+    record["wall_seconds"] = time.perf_counter() - start
+    return record
+
+
+def run_jobs(jobs: Sequence[Job], workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Run the jobs and yield their results as they finish (not in job order).
+
+    With workers > 1 the jobs are spread over a process pool; with
+    workers == 1 they run one after another in this process.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield run_job(job)
+        return
+
+    with Pool(processes=min(workers, len(jobs))) as pool:
+        # chunksize 1: runs can differ a lot in length, keep workers busy
+        for record in pool.imap_unordered(run_job, jobs, chunksize=1):
+            yield record
+
+
+class SweepSummary:
+    """
+    Aggregates result records per (ruleset, density) group: number of runs
+    and errors, how the runs ended and the mean final population.
+    """
+
+    def __init__(self) -> None:
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.runs = 0
+        self.errors = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.runs += 1
+        if record.get("error"):
+            self.errors += 1
+            return
+
+        key = record["ruleset"]
+        if "density" in record:
+            key += f"/d{record['density']}"
+        group = self.groups.setdefault(key, {
+            "runs": 0,
+            "extinct": 0,
+            "still": 0,
+            "oscillator": 0,
+            "running": 0,
+            "mean_final_population": 0.0,
+            "mean_generations": 0.0,
+        })
+        group["runs"] += 1
+        group[record["end"] or "running"] += 1
+        # Running means, so nothing is kept per run
+        n = group["runs"]
+        group["mean_final_population"] += (
+            record["final_population"] - group["mean_final_population"]
+        ) / n
+        group["mean_generations"] += (
+            record["generations"] - group["mean_generations"]
+        ) / n
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"runs": self.runs, "errors": self.errors, "groups": self.groups}
+
+
+def run_sweep(
+    jobs: Sequence[Job],
+    out_file: str,
+    workers: int = 1,
+    log: Callable[[str], None] = print,
+) -> SweepSummary:
+    """
+    Run a sweep, appending one JSON line per finished run to `out_file`
+    (flushed after every run, so partial results survive an interrupted
+    sweep) and a final {"summary": ...} line.
+    """
+    summary = SweepSummary()
+    with open(out_file, "w", encoding="utf-8") as f:
+        for record in run_jobs(jobs, workers):
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            summary.add(record)
+            log(_describe(record, summary.runs, len(jobs)))
+        f.write(json.dumps({"summary": summary.as_dict()}) + "\n")
+    return summary
+
+
+def _describe(record: Dict[str, Any], done: int, total: int) -> str:
+    prefix = f"[{done}/{total}] {_job_name(record)}"
+    if record.get("error"):
+        return f"{prefix}: error: {record['error']}"
+    end = record["end"] or "running"
+    return (
+        f"{prefix}: {record['generations']} generations, "
+        f"population {record['final_population']}, {end} "
+        f"({record['wall_seconds']:.2f} s)"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point, e.g.:
+
+        python main.py run configs/board_config --steps 100 --out results.jsonl
+        python main.py run --soup 256x256 --densities 0.1 0.3 0.5 \
+            --seeds 1 2 3 --rulesets classic highlife --steps 500 --workers 8
+
+    (`python batch.py ...` takes the same arguments.)
+
+    :return: Exit code (1 if any run failed).
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py run", description="Run Game of Life simulations in batch"
+    )
+    parser.add_argument("patterns", nargs="*", help="pattern files to simulate")
+    parser.add_argument("--soup", nargs="+", default=[], metavar="ROWSxCOLS",
+                        help="random soup sizes (swept over densities x seeds)")
+    parser.add_argument("--densities", nargs="+", type=float,
+                        default=list(DEFAULT_DENSITIES))
+    parser.add_argument("--seeds", nargs="+", type=int, default=list(DEFAULT_SEEDS))
+    parser.add_argument("--rulesets", nargs="+", default=["classic"],
+                        help="ruleset names or rulestrings (e.g. B36/S23)")
+    parser.add_argument("--steps", type=int, required=True,
+                        help="generations per run")
+    parser.add_argument("--engine", default="python")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--out", default="results.jsonl",
+                        help="JSON lines results file")
+    parser.add_argument("--save-dir", help="write each final board as RLE here")
+    parser.add_argument("--log-dir", help="write a simulation log per run here")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default="text")
+    parser.add_argument("--no-stop", action="store_true",
+                        help="always run all steps (no extinction/cycle stop)")
+
+    args = parser.parse_args(argv)
+
+    try:
+        soups = [parse_size(spec) for spec in args.soup]
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.patterns and not soups:
+        parser.error("give at least one pattern file or --soup size")
+    if args.steps < 0:
+        parser.error("--steps must be non-negative")
+    if any(not 0.0 <= d <= 1.0 for d in args.densities):
+        parser.error("--densities must be between 0 and 1")
+
+    jobs = build_jobs(
+        args.patterns,
+        soups,
+        args.densities,
+        args.seeds,
+        args.rulesets,
+        args.steps,
+        args.engine,
+    )
+    for directory in (args.save_dir, args.log_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    for job in jobs:
+        job.update(
+            save_dir=args.save_dir,
+            log_dir=args.log_dir,
+            log_format=args.log_format,
+            stop=not args.no_stop,
+        )
+
+    summary = run_sweep(jobs, args.out, args.workers)
+    print(f"\n{summary.runs} run(s), {summary.errors} error(s); "
+          f"results written to: {args.out}")
+    return 1 if summary.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
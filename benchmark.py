@@ -0,0 +1,455 @@
+# benchmark.py
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from batch import random_soup
+from board import Board
+from engine import (
+    ENGINE_MODULES,
+    ENGINES,
+    DoubleBuffer,
+    get_engine,
+    next_generation,
+    run_simulation,
+)
+from errors import EngineError, GameOfLifeError
+from patterns import load_pattern, parse_rle
+from rules import RULESETS, get_ruleset, is_range_rule
+
+# Board sizes (rows = cols) of the standard workloads
+SIZES = (64, 256, 1024, 2048, 4096, 8192)
+DEFAULT_SIZES = (64, 256, 1024)
+
+# Densities of the random soup workloads
+DENSITIES = (0.1, 0.35, 0.6)
+
+# Distance between the gliders of the "sparse" workload
+SPARSE_SPACING = 32
+
+# Each case simulates about this many cell updates (generations x cells),
+# with 2 to MAX_GENERATIONS generations. The count depends only on the
+# board size, so every engine and every run does exactly the same work.
+CELL_BUDGET = 1 << 22
+MAX_GENERATIONS = 1000
+
+# Larger than Life rules of range 1, 5 and 10, benchmarked on the "ltl"
+# engine with --ltl (its cost per cell should not depend on the range)
+LTL_RULESETS = (
+    "R1,C0,M0,S2..3,B3..3,NM",           # Conway's Life written as LtL
+    "bosco",                             # R5,C0,M1,S34..58,B34..45,NM
+    "R10,C0,M1,S221..441,B221..441,NM",  # majority vote over 21x21 cells
+)
+LTL_ENGINES = ("ltl",)
+
+# A case is flagged when it is this much slower than the baseline (10%)
+DEFAULT_THRESHOLD = 0.10
+
+# Fixed seed so every run benchmarks exactly the same boards
+SEED = 4420
+
+GLIDER_CONFIG = "configs/board_config"
+
+GLIDER_RLE = """\
+x = 3, y = 3, rule = B3/S23
+bo$2bo$3o!
+"""
+
+GOSPER_GUN_RLE = """\
+x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$
+10bo5bo7bo$11bo3bo$12b2o!
+"""
+
+# Type alias for a workload builder: (size, seed) -> initial board
+WorkloadFunc = Callable[[int, int], Board]
+
+
+def _place(pattern: Board, size: int, copies: int = 1) -> Board:
+    """
+    Copy a pattern into a size x size board, tiled `copies` times per side.
+    """
+    board = Board(size, size)
+    step_r = max(size // copies, pattern.rows)
+    step_c = max(size // copies, pattern.cols)
+    for r0 in range(0, size - pattern.rows + 1, step_r):
+        for c0 in range(0, size - pattern.cols + 1, step_c):
+            for r, src in enumerate(pattern.grid):
+                board.grid[r0 + r][c0:c0 + pattern.cols] = src
+    return board
+
+
+def _workloads() -> Dict[str, WorkloadFunc]:
+    """
+    Return the standard workloads by name.
+    """
+    workloads: Dict[str, WorkloadFunc] = {}
+    for density in DENSITIES:
+        workloads[f"soup-{density}"] = (
+            lambda size, seed, d=density: random_soup(size, size, d, seed)
+        )
+    workloads["glider"] = lambda size, seed: _place(load_pattern(GLIDER_CONFIG), size)
+    # One gun per 64x64 block, so the work grows with the board
+    workloads["guns"] = lambda size, seed: _place(
+        parse_rle(GOSPER_GUN_RLE, margin=2), size, copies=max(size // 64, 1)
+    )
+    # Large, mostly empty board: a grid of gliders that keeps moving
+    workloads["sparse"] = lambda size, seed: _place(
+        parse_rle(GLIDER_RLE, margin=1), size, copies=max(size // SPARSE_SPACING, 1)
+    )
+    return workloads
+
+
+WORKLOADS = _workloads()
+
+
+def available_engines() -> List[str]:
+    """
+    Return the names of the registered engines that can be imported here.
+    """
+    names = []
+    for name in sorted(set(ENGINES) | set(ENGINE_MODULES)):
+        try:
+            get_engine(name)
+        except EngineError:
+            continue
+        names.append(name)
+    return names
+
+
+def case_id(workload: str, size: int, ruleset_name: str, engine_name: str) -> str:
+    """
+    Return the key that identifies a case in a baseline file.
+    """
+    return f"{workload}/{size}/{ruleset_name}/{engine_name}"
+
+
+def generations_for(cells: int, budget: int = CELL_BUDGET) -> int:
+    """
+    Return the number of generations to simulate on a board of `cells` cells.
+    """
+    return min(max(budget // cells, 2), MAX_GENERATIONS)
+
+
+def run_case(
+    board: Board,
+    ruleset_name: str,
+    engine_name: str,
+    budget: int = CELL_BUDGET,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """
+    Benchmark run_simulation on one board.
+
+    The fastest of `repeat` runs is reported. Peak memory is measured in
+    a separate short run with tracemalloc, so tracing does not slow down
+    the timed runs.
+
+    :return: Dict with generations, seconds, gens_per_sec, cells_per_sec
+             and peak_bytes.
+    """
+    cells = board.rows * board.cols
+    generations = generations_for(cells, budget)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_simulation(board, ruleset_name, generations, engine_name=engine_name)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run_simulation(board, ruleset_name, 2, engine_name=engine_name)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "generations": generations,
+        "seconds": best,
+        "gens_per_sec": generations / best,
+        "cells_per_sec": generations * cells / best,
+        "peak_bytes": peak,
+    }
+
+
+def _step_modes(board: Board, ruleset_name: str) -> Dict[str, Callable[[], None]]:
+    """
+    Return the two ways the python engine can step `board`, by name.
+
+    Each function advances its own copy of the board by one generation.
+    """
+    rule = get_ruleset(ruleset_name)
+    state = [board]
+
+    def allocate() -> None:
+        state[0] = next_generation(state[0], rule)
+
+    buffers = DoubleBuffer(board, rule)
+    return {"next_generation": allocate, "DoubleBuffer.step": buffers.step}
+
+
+def run_alloc_case(
+    board: Board,
+    ruleset_name: str,
+    budget: int = CELL_BUDGET,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Measure allocations and GC pauses of next_generation vs DoubleBuffer.step.
+
+    Each mode is run twice for the same number of generations: once with
+    a gc.callbacks hook that times every collection, and once under
+    tracemalloc, where the traced peak is reset before every step so
+    `alloc_bytes` adds up the memory each step allocated on top of what
+    was already live (a lower bound of the bytes allocated).
+
+    :return: {mode: {generations, collections, gc_pause_total, gc_pause_max,
+             alloc_bytes, alloc_bytes_per_gen}}.
+    """
+    generations = generations_for(board.rows * board.cols, budget)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for mode in ("next_generation", "DoubleBuffer.step"):
+        pauses: List[float] = []
+        started = [0.0]
+
+        def on_gc(phase: str, info: Dict[str, int]) -> None:
+            if phase == "start":
+                started[0] = time.perf_counter()
+            else:
+                pauses.append(time.perf_counter() - started[0])
+
+        step = _step_modes(board, ruleset_name)[mode]
+        gc.collect()
+        gc.callbacks.append(on_gc)
+        try:
+            for _ in range(generations):
+                step()
+        finally:
+            gc.callbacks.remove(on_gc)
+
+        step = _step_modes(board, ruleset_name)[mode]
+        allocated = 0
+        tracemalloc.start()
+        try:
+            for _ in range(generations):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                step()
+                allocated += tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+
+        results[mode] = {
+            "generations": generations,
+            "collections": len(pauses),
+            "gc_pause_total": sum(pauses),
+            "gc_pause_max": max(pauses, default=0.0),
+            "alloc_bytes": allocated,
+            "alloc_bytes_per_gen": allocated / generations,
+        }
+    return results
+
+
+def run_benchmarks(
+    workloads: Sequence[str],
+    sizes: Sequence[int],
+    rulesets: Sequence[str],
+    engines: Sequence[str],
+    budget: int = CELL_BUDGET,
+    repeat: int = 3,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    Run every (workload, size, ruleset, engine) combination.
+
+    :return: Baseline document: {"meta": {...}, "results": {case_id: {...}}}.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for workload in workloads:
+        for size in sizes:
+            board = WORKLOADS[workload](size, SEED)
+            for ruleset_name in rulesets:
+                for engine_name in engines:
+                    key = case_id(workload, size, ruleset_name, engine_name)
+                    try:
+                        result = run_case(
+                            board, ruleset_name, engine_name, budget, repeat
+                        )
+                    except GameOfLifeError as e:
+                        # e.g. a B0 rule on the sparse engine
+                        log(f"{key:<40} skipped: {e}")
+                        continue
+                    result.update(
+                        workload=workload,
+                        size=size,
+                        ruleset=ruleset_name,
+                        engine=engine_name,
+                    )
+                    results[key] = result
+                    log(
+                        f"{key:<40} {result['gens_per_sec']:>10.1f} gen/s "
+                        f"{result['cells_per_sec']:>14.0f} cells/s "
+                        f"{result['peak_bytes'] / 2**20:>8.1f} MiB"
+                    )
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "budget": budget,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """
+    Compare two baseline documents case by case.
+
+    A case regresses when its gens_per_sec dropped by more than
+    `threshold` (a fraction, 0.10 = 10%). Cases present in only one
+    of the documents are ignored.
+
+    :return: List of case ids that regressed.
+    """
+    regressions = []
+    for key, result in sorted(current["results"].items()):
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+
+        change = result["gens_per_sec"] / old["gens_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:<40} {old['gens_per_sec']:>10.1f} -> "
+            f"{result['gens_per_sec']:>10.1f} gen/s ({change:+.1%}){flag}"
+        )
+    return regressions
+
+
+def _load(filepath: str) -> Dict[str, Any]:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point, e.g.:
+
+        python benchmark.py run --out baseline.json
+        python benchmark.py run --sizes 4096 --engines numpy --compare baseline.json
+        python benchmark.py run --ltl --workloads soup-0.35 --sizes 256 1024
+        python benchmark.py compare baseline.json current.json --threshold 0.05
+        python benchmark.py alloc --workloads soup-0.35 --sizes 256
+
+    :return: Exit code (1 if a regression was found).
+    """
+    parser = argparse.ArgumentParser(description="Game of Life benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--workloads", nargs="+", default=list(WORKLOADS),
+                     choices=list(WORKLOADS))
+    run.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                     help=f"board sizes (standard: {list(SIZES)})")
+    run.add_argument("--rulesets", nargs="+", default=None,
+                     help="default: every registered 3x3 ruleset")
+    run.add_argument("--engines", nargs="+", default=None,
+                     help="default: every engine available here")
+    run.add_argument("--budget", type=int, default=CELL_BUDGET,
+                     help="cell updates per case (generations x cells)")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--ltl", action="store_true",
+                     help="benchmark the Larger than Life rules at range 1, 5 "
+                          "and 10 (LTL_RULESETS) on the ltl engine")
+    run.add_argument("--out", help="write the results as a JSON baseline")
+    run.add_argument("--compare", metavar="BASELINE",
+                     help="compare the results with a baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    cmp = commands.add_parser("compare", help="compare two JSON baselines")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    alloc = commands.add_parser(
+        "alloc",
+        help="GC pauses and allocations of next_generation vs DoubleBuffer.step",
+    )
+    alloc.add_argument("--workloads", nargs="+", default=["soup-0.35"],
+                       choices=list(WORKLOADS))
+    alloc.add_argument("--sizes", nargs="+", type=int, default=[64, 256])
+    alloc.add_argument("--rulesets", nargs="+", default=["classic"])
+    alloc.add_argument("--budget", type=int, default=CELL_BUDGET,
+                       help="cell updates per case (generations x cells)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "alloc":
+        for workload in args.workloads:
+            for size in args.sizes:
+                board = WORKLOADS[workload](size, SEED)
+                for ruleset_name in args.rulesets:
+                    cases = run_alloc_case(board, ruleset_name, args.budget)
+                    for mode, result in cases.items():
+                        key = f"{workload}/{size}/{ruleset_name}/{mode}"
+                        print(
+                            f"{key:<44} {result['collections']:>6} GCs "
+                            f"{result['gc_pause_total'] * 1000:>9.2f} ms "
+                            f"(max {result['gc_pause_max'] * 1000:.2f} ms) "
+                            f"{result['alloc_bytes_per_gen']:>12.0f} B/gen"
+                        )
+        return 0
+
+    if args.command == "compare":
+        regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+    else:
+        if args.ltl:
+            rulesets = args.rulesets or list(LTL_RULESETS)
+            engines = args.engines or list(LTL_ENGINES)
+        else:
+            rulesets = args.rulesets or [
+                name for name, rule in RULESETS.items() if not is_range_rule(rule)
+            ]
+            engines = args.engines or available_engines()
+        results = run_benchmarks(
+            args.workloads,
+            args.sizes,
+            rulesets,
+            engines,
+            budget=args.budget,
+            repeat=args.repeat,
+        )
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        regressions = []
+        if args.compare:
+            regressions = compare(_load(args.compare), results, args.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
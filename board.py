@@ -1,16 +1,104 @@
 # board.py
 
+from typing import Any, IO, Iterable, Iterator, List, Optional, Sequence, Union
+
 from errors import InvalidGridSizeError
 
+# Translation table from cell bytes (0/1) to the '0'/'1' log characters
+_CELLS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+# Translation table from cells (decoded as latin-1) to console characters
+_CELLS_TO_CHARS = str.maketrans("\x00\x01", ".█")
+
+
+def format_generation(generation: int, cols: int, cells: bytes) -> str:
+    """
+    Format one generation in the text log format used by save_to_file.
+
+    :param generation: Generation number (for the header line).
+    :param cols: Number of columns (length of one row).
+    :param cells: Cells in row-major order, one byte (0 or 1) per cell.
+    :return: Header line, one line of '0'/'1' per row and an empty line.
+    """
+    digits = cells.translate(_CELLS_TO_DIGITS).decode("ascii")
+    lines = [digits[i:i + cols] for i in range(0, len(digits), cols)]
+    return f"--- Generation {generation} ---\n" + "\n".join(lines) + "\n\n"
+
+
+class Grid:
+    """
+    Row-by-row view of a board's cell buffer, so that board.grid[row][col]
+    and `for row in board.grid` keep working.
+
+    Each row is a writable memoryview of `cols` bytes into the board's
+    bytearray: reading or writing through it goes straight to the buffer,
+    nothing is copied. Assigning a whole row (grid[r] = values) copies
+    the values into the buffer.
+    """
+
+    __slots__ = ("_view", "_rows", "_cols")
+
+    def __init__(self, cells: bytearray, rows: int, cols: int) -> None:
+        self._view = memoryview(cells)
+        self._rows = rows
+        self._cols = cols
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[memoryview, List[memoryview]]:
+        if isinstance(index, slice):
+            return [self[r] for r in range(*index.indices(self._rows))]
+        start = range(self._rows)[index] * self._cols
+        return self._view[start:start + self._cols]
+
+    def __setitem__(self, index: int, values: Iterable[int]) -> None:
+        self[index][:] = bytes(values)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        view, cols = self._view, self._cols
+        for start in range(0, self._rows * cols, cols):
+            yield view[start:start + cols]
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compare with another Grid or a 2D sequence of 0/1 values
+        (e.g. a list of lists), cell by cell.
+
+        Single rows are memoryviews: compare them as list(row) or
+        bytes(row), since a memoryview never equals a list.
+        """
+        if isinstance(other, Grid):
+            return (self._rows, self._cols) == (other._rows, other._cols) and (
+                self._view == other._view
+            )
+        try:
+            rows = [bytes(row) for row in other]
+        except (TypeError, ValueError):
+            return NotImplemented
+        return len(rows) == self._rows and all(
+            len(row) == self._cols for row in rows
+        ) and b"".join(rows) == self._view
+
+    # Compared by value and mutable, so not hashable
+    __hash__ = None
+
 
 class Board:
     """
     Represents the grid for Conway's Game of Life.
 
-    Internally the grid is stored as a 2D list of integers:
-    0 = dead cell, 1 = alive cell.
+    Internally the cells are stored in one contiguous bytearray, `cells`,
+    in row-major order, one byte per cell: 0 = dead cell, 1 = alive cell.
+    `grid` gives the familiar 2D access on top of it (see Grid), and
+    view() a 2D memoryview, so renderers, log writers and NumPy read the
+    cells without a per-cell copy.
     """
 
+    __slots__ = ("rows", "cols", "cells")
+
     def __init__(self, rows: int, cols: int) -> None:
         """
         Initialize a new empty board with the given dimensions.
@@ -26,8 +114,44 @@ class Board:
 
         self.rows = rows
         self.cols = cols
-        # 2D list filled with zeros (all cells dead)
-        self.grid = [[0 for _ in range(cols)] for _ in range(rows)]
+        # One zero byte per cell (all cells dead)
+        self.cells = bytearray(rows * cols)
+
+    @property
+    def grid(self) -> Grid:
+        """
+        The cells as a sequence of rows (writable views into `cells`).
+        """
+        return Grid(self.cells, self.rows, self.cols)
+
+    @grid.setter
+    def grid(self, rows: Iterable[Sequence[int]]) -> None:
+        """
+        Copy a 2D sequence of 0/1 values (e.g. a list of lists) into the board.
+
+        :raises ValueError: If the number of cells does not match rows x cols.
+        """
+        cells = b"".join(bytes(row) for row in rows)
+        if len(cells) != len(self.cells):
+            raise ValueError(
+                f"Expected {len(self.cells)} cells for a {self.rows}x{self.cols} "
+                f"board, got {len(cells)}"
+            )
+        self.cells[:] = cells
+
+    def view(self) -> memoryview:
+        """
+        Return a writable 2D memoryview (rows x cols, format "B") of the
+        cells, without copying: view()[row, col], numpy.asarray(view())
+        and other buffer consumers all share the board's memory.
+
+        The board also supports the buffer protocol directly
+        (memoryview(board)) on Python 3.12 and later.
+        """
+        return memoryview(self.cells).cast("B", (self.rows, self.cols))
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.view()
 
     def set_cell(self, row: int, col: int, alive: bool = True) -> None:
         """
@@ -43,7 +167,7 @@ class Board:
                 f"Cell ({row}, {col}) is out of bounds for board {self.rows}x{self.cols}"
             )
 
-        self.grid[row][col] = 1 if alive else 0
+        self.cells[row * self.cols + col] = 1 if alive else 0
 
     def get_cell(self, row: int, col: int) -> int:
         """
@@ -58,25 +182,69 @@ class Board:
         if not (0 <= row < self.rows and 0 <= col < self.cols):
             return 0
 
-        return self.grid[row][col]
+        return self.cells[row * self.cols + col]
 
     def clear(self) -> None:
         """
-        Reset the board by setting all cells to dead (0).
+        Reset the board by setting all cells to dead (0), in one bulk write.
         """
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.grid[r][c] = 0
+        self.cells[:] = bytes(len(self.cells))
+
+    def copy_from(self, other: "Board") -> None:
+        """
+        Overwrite this board with the cells of another board of the same size.
+
+        The cells are copied buffer to buffer in one operation, so nothing
+        is allocated. The target must store its cells in a buffer (Board,
+        ArrayBoard, TiledBoard), not compute them on access.
+
+        :param other: Source board (any Board variant).
+        :raises ValueError: If the boards have different sizes.
+        """
+        if (other.rows, other.cols) != (self.rows, self.cols):
+            raise ValueError(
+                f"Cannot copy a {other.rows}x{other.cols} board "
+                f"into {self.rows}x{self.cols}"
+            )
+
+        self.view().cast("B")[:] = other.view().cast("B")
+
+    def to_bytes(self) -> bytes:
+        """
+        Return all cells in row-major order, one byte (0 or 1) per cell.
+
+        This is the compact, immutable snapshot used by the log writers
+        (a single copy of `cells`).
+        """
+        return bytes(self.cells)
+
+    @classmethod
+    def from_bytes(cls, rows: int, cols: int, cells: bytes) -> "Board":
+        """
+        Create a board from row-major cell bytes (see to_bytes).
+
+        :raises ValueError: If the number of cells does not match rows x cols.
+        """
+        if len(cells) != rows * cols:
+            raise ValueError(
+                f"Expected {rows * cols} cells for a {rows}x{cols} board, "
+                f"got {len(cells)}"
+            )
+
+        board = Board(rows, cols)
+        board.cells[:] = cells
+        return board
 
     def print(self) -> None:
         """
         Print the board to the console.
 
-        Alive cells are shown as '█', dead cells as '.'.
+        Alive cells are shown as '█', dead cells as '.'. The whole board
+        is translated in one pass and printed with a single call.
         """
-        for row in self.grid:
-            line = "".join("█" if cell else "." for cell in row)
-            print(line)
+        chars = self.to_bytes().decode("latin-1").translate(_CELLS_TO_CHARS)
+        cols = self.cols
+        print("\n".join(chars[i:i + cols] for i in range(0, len(chars), cols)))
 
     def save_to_file(self, filepath: str, generation: int) -> None:
         """
@@ -89,8 +257,77 @@ class Board:
         :param generation: Current generation number (for logging).
         """
         with open(filepath, "a", encoding="utf-8") as f:
-            f.write(f"--- Generation {generation} ---\n")
-            for row in self.grid:
-                line = "".join("1" if cell else "0" for cell in row)
-                f.write(line + "\n")
-            f.write("\n")
+            self.write_to(f, generation)
+
+    def write_to(self, f: IO[str], generation: int) -> None:
+        """
+        Write the current board state to an already open text file,
+        in the same format as save_to_file.
+
+        :param f: Text file object opened for writing.
+        :param generation: Current generation number (for logging).
+        """
+        f.write(format_generation(generation, self.cols, self.to_bytes()))
+
+
+class BoardHistory:
+    """
+    Fixed-size ring of previous generations, used for undo.
+
+    All boards are allocated up front; push() copies a board into the
+    oldest slot, so keeping history does not allocate per generation.
+    When the ring is full, the oldest generation is dropped.
+    """
+
+    def __init__(self, rows: int, cols: int, size: int) -> None:
+        """
+        :param rows: Number of rows of the stored boards.
+        :param cols: Number of columns of the stored boards.
+        :param size: Maximum number of generations kept (must be > 0).
+        :raises ValueError: If size is not positive.
+        """
+        if size <= 0:
+            raise ValueError(f"History size must be a positive integer, got {size}")
+
+        self._slots: List[Board] = [Board(rows, cols) for _ in range(size)]
+        # Index of the most recent entry and number of stored entries
+        self._head = -1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, board: Board) -> None:
+        """
+        Store a copy of the board as the most recent entry.
+        """
+        self._head = (self._head + 1) % len(self._slots)
+        self._slots[self._head].copy_from(board)
+        self._count = min(self._count + 1, len(self._slots))
+
+    def pop_into(self, board: Board) -> bool:
+        """
+        Remove the most recent entry and copy it into `board`.
+
+        :return: True if an entry was restored, False if the history is empty.
+        """
+        if self._count == 0:
+            return False
+
+        board.copy_from(self._slots[self._head])
+        self._head = (self._head - 1) % len(self._slots)
+        self._count -= 1
+        return True
+
+    def pop(self) -> Optional[Board]:
+        """
+        Remove the most recent entry and return it as a new Board
+        (or None if the history is empty).
+        """
+        if self._count == 0:
+            return None
+
+        slot = self._slots[self._head]
+        board = Board(slot.rows, slot.cols)
+        self.pop_into(board)
+        return board
@@ -0,0 +1,300 @@
+# cache.py
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from board import Board
+from checkpoint import load_checkpoint, save_checkpoint
+from engine import run_simulation
+from errors import CheckpointError
+from rules import get_ruleset, rulestring
+from simlog import pack_cells
+
+# Default size budget of a cache directory
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Extension of the entry files (each one is a checkpoint, see checkpoint.py)
+ENTRY_EXTENSION = ".ckpt"
+
+
+def cache_key(board: Board, ruleset_name: str) -> str:
+    """
+    Return the content address of a run: a SHA-256 of everything that
+    decides the generations that follow a board, i.e. its size and cells,
+    the rule and the edge mode.
+
+    The rule is identified by its canonical rulestring, so "classic" and
+    "B3/S23" share entries. The number of steps is not part of the key:
+    entries of one key are stored per generation, so a longer run can
+    start from a shorter one's result.
+    """
+    if hasattr(board, "bounded") and not board.bounded:
+        # An infinite SparseBoard: the window is only a view, the cells
+        # are all the alive cells, wherever they are
+        edge: Any = ["unbounded", sorted(board.live)]
+        cells = b""
+    else:
+        edge = "bounded"
+        cells = pack_cells(board.to_bytes())
+
+    h = hashlib.sha256()
+    h.update(json.dumps([
+        board.rows, board.cols, rulestring(get_ruleset(ruleset_name)), edge,
+    ]).encode("utf-8"))
+    h.update(cells)
+    return h.hexdigest()
+
+
+class CacheStats:
+    """
+    Hit/miss counters of a ResultCache.
+
+    - hits: the requested generation was stored.
+    - partial_hits: an earlier generation was stored and the run resumed
+      from it.
+    - misses: nothing was stored, the run started from the initial board.
+    - generations_saved / generations_run: generations skipped thanks to
+      the cache / computed.
+    - evictions: entries removed to stay under the size budget.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.generations_saved = 0
+        self.generations_run = 0
+        self.evictions = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.partial_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "generations_saved": self.generations_saved,
+            "generations_run": self.generations_run,
+            "evictions": self.evictions,
+        }
+
+
+class ResultCache:
+    """
+    On-disk cache of simulation results in front of run_simulation.
+
+    Each entry is the board at one generation of one run, stored as a
+    checkpoint file named <key>-<generation>.ckpt (see cache_key), so it
+    is written atomically and checked with a CRC when read. A query for
+    generation M starts from the nearest stored generation <= M of the
+    same key: an exact hit returns it directly, otherwise only the
+    missing generations are computed.
+
+    Entries are evicted least recently used first once the files exceed
+    `max_bytes`. The recency order is the files' modification times
+    (touched on every hit), so it survives restarts and is shared by
+    processes using the same directory; an entry evicted by another
+    process is simply a miss.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        :param directory: Cache directory (created if missing).
+        :param max_bytes: Size budget of all entry files.
+        :raises ValueError: If max_bytes is not positive.
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"Cache size budget must be positive, got {max_bytes}")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+
+        # file name -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        # key -> stored generations
+        self._generations: Dict[str, Set[int]] = {}
+        self.size = 0
+        self._scan()
+        self._evict()
+
+    def _scan(self) -> None:
+        found = []
+        for entry in os.scandir(self.directory):
+            parsed = _parse_name(entry.name)
+            if parsed is None or not entry.is_file():
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime_ns, entry.name, stat.st_size, parsed))
+        for _, name, size, (key, generation) in sorted(found):
+            self._add(name, size, key, generation)
+
+    def _add(self, name: str, size: int, key: str, generation: int) -> None:
+        self._entries[name] = size
+        self._generations.setdefault(key, set()).add(generation)
+        self.size += size
+
+    def _remove(self, name: str) -> None:
+        size = self._entries.pop(name)
+        self.size -= size
+        key, generation = _parse_name(name)
+        generations = self._generations[key]
+        generations.discard(generation)
+        if not generations:
+            del self._generations[key]
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def generations(self, board: Board, ruleset_name: str) -> Tuple[int, ...]:
+        """
+        Return the generations stored for this board and rule, ascending.
+        """
+        key = cache_key(board, ruleset_name)
+        return tuple(sorted(self._generations.get(key, ())))
+
+    def get(self, key: str, generation: int) -> Optional[Board]:
+        """
+        Return the stored board of a key at a generation, or None. A
+        missing or corrupt entry file is dropped and reported as None.
+        """
+        name = _entry_name(key, generation)
+        if name not in self._entries:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            checkpoint = load_checkpoint(path)
+            os.utime(path)
+        except (CheckpointError, OSError):
+            self._remove(name)
+            return None
+        if checkpoint.run.get("key") != key or checkpoint.generation != generation:
+            self._remove(name)
+            return None
+        self._entries.move_to_end(name)
+        return checkpoint.board
+
+    def put(
+        self, key: str, generation: int, board: Board, ruleset_name: str,
+        engine_name: str,
+    ) -> None:
+        """
+        Store a board, then evict the least recently used entries until
+        the cache fits its budget again (the new entry is kept).
+        """
+        name = _entry_name(key, generation)
+        path = os.path.join(self.directory, name)
+        save_checkpoint(
+            path, board, generation, ruleset_name, engine_name, run={"key": key}
+        )
+        # Replacing an entry: only its old size leaves the total
+        self.size -= self._entries.pop(name, 0)
+        self._add(name, os.path.getsize(path), key, generation)
+        self._evict()
+
+    def _evict(self) -> None:
+        # The most recent entry stays even if it alone exceeds the budget
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def run(
+        self,
+        board: Board,
+        ruleset_name: str,
+        steps: int,
+        engine_name: str = "python",
+        checkpoint_every: int = 0,
+    ) -> Board:
+        """
+        Cached equivalent of run_simulation(board, ruleset_name, steps,
+        engine_name=engine_name): return the board after `steps`
+        generations, computing only the generations past the nearest
+        stored one. The result is stored.
+
+        :param checkpoint_every: Also store every N-th generation computed
+                                 along the way (0 = only the final one),
+                                 so later queries for generations in
+                                 between resume close to them.
+        :raises ValueError: If steps or checkpoint_every is negative.
+        """
+        if steps < 0:
+            raise ValueError(f"Number of steps must be non-negative, got {steps}")
+        if checkpoint_every < 0:
+            raise ValueError(
+                f"Checkpoint interval must be non-negative, got {checkpoint_every}"
+            )
+
+        key = cache_key(board, ruleset_name)
+        start, current = 0, board
+        for generation in sorted(self._generations.get(key, ()), reverse=True):
+            if generation > steps:
+                continue
+            cached = self.get(key, generation)
+            if cached is not None:
+                start, current = generation, cached
+                break
+
+        if start == steps:
+            self.stats.hits += 1
+            self.stats.generations_saved += steps
+            return current
+        if start:
+            self.stats.partial_hits += 1
+            self.stats.generations_saved += start
+        else:
+            self.stats.misses += 1
+
+        # Run up to each intermediate checkpoint, then to the end
+        while start < steps:
+            target = steps
+            if checkpoint_every:
+                target = min(steps, (start // checkpoint_every + 1) * checkpoint_every)
+            current = run_simulation(
+                current, ruleset_name, target - start, engine_name=engine_name
+            )
+            self.stats.generations_run += target - start
+            start = target
+            if target < steps:
+                self.put(key, target, current, ruleset_name, engine_name)
+        self.put(key, steps, current, ruleset_name, engine_name)
+        return current
+
+    def clear(self) -> None:
+        """
+        Remove every entry (the statistics are kept).
+        """
+        for name in list(self._entries):
+            self._remove(name)
+
+
+def _entry_name(key: str, generation: int) -> str:
+    return f"{key}-{generation}{ENTRY_EXTENSION}"
+
+
+def _parse_name(name: str) -> Optional[Tuple[str, int]]:
+    """
+    Split an entry file name into (key, generation); None for other files.
+    """
+    if not name.endswith(ENTRY_EXTENSION):
+        return None
+    key, _, generation = name[:-len(ENTRY_EXTENSION)].rpartition("-")
+    if len(key) != 64 or not generation.isdigit():
+        return None
+    return key, int(generation)
@@ -0,0 +1,670 @@
+# census.py
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from multiprocessing import Pool
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence,
+    Set, Tuple,
+)
+
+import numpy as np
+
+from board import Board
+from engine_ensemble import DEFAULT_MAX_PERIOD, EXTINCT, RUNNING, Ensemble
+from engine_sparse import SparseBoard, next_generation
+from errors import GameOfLifeError
+from rules import get_ruleset, rulestring
+
+# Default soup search: 16x16 soups at density 0.5 (the usual soup search
+# setting), in the middle of a dead margin of 48 cells on every side
+DEFAULT_SOUP_SIZE = 16
+DEFAULT_DENSITY = 0.5
+DEFAULT_MARGIN = 48
+DEFAULT_MAX_GENERATIONS = 6000
+# Soups stepped together in one Ensemble (and sent to a worker as one task)
+DEFAULT_BATCH = 256
+
+# Kinds of objects found in a census. "unknown" objects did not repeat
+# within the longest detected period (usually two objects close enough
+# to be taken for one, or an object broken by the board edge).
+OBJECT_KINDS = ("still", "oscillator", "spaceship", "unknown")
+
+# Objects near the board edge with at most this many cells are checked
+# for being spaceships of period up to ESCAPEE_MAX_PERIOD (glider and the
+# light/middle/heavyweight spaceships) and removed while their soup is
+# still running
+ESCAPEE_MAX_CELLS = 40
+ESCAPEE_MAX_PERIOD = 4
+
+# Two alive cells belong to the same object if they are at most this many
+# cells apart in both directions (their neighborhoods overlap)
+OBJECT_DISTANCE = 2
+
+# Digits of the extended Wechsler format (see wechsler)
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Type aliases: one alive cell (row, col), an object's cells, and one
+# soup search task (JSON-serializable, sent to the workers)
+Cell = Tuple[int, int]
+Shape = FrozenSet[Cell]
+Task = Dict[str, Any]
+
+# Well-known objects of the classic rules (B3/S23), as plain text rows.
+# Any phase and orientation will do: the index is keyed by canonical code.
+KNOWN_OBJECTS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("block", ("oo", "oo")),
+    ("beehive", (".oo.", "o..o", ".oo.")),
+    ("loaf", (".oo.", "o..o", ".o.o", "..o.")),
+    ("boat", ("oo.", "o.o", ".o.")),
+    ("ship", ("oo.", "o.o", ".oo")),
+    ("tub", (".o.", "o.o", ".o.")),
+    ("pond", (".oo.", "o..o", "o..o", ".oo.")),
+    ("barge", (".o..", "o.o.", ".o.o", "..o.")),
+    ("long boat", ("oo..", "o.o.", ".o.o", "..o.")),
+    ("mango", (".oo..", "o..o.", ".o..o", "..oo.")),
+    ("eater 1", ("oo..", "o.o.", "..o.", "..oo")),
+    ("snake", ("oo.o", "o.oo")),
+    ("bi-block", ("oo.oo", "oo.oo")),
+    ("aircraft carrier", ("oo..", "o..o", "..oo")),
+    ("shillelagh", ("oo.", "o..", ".o.", "..o", ".oo")),
+    ("integral sign", ("...oo", "..o.o", "..o..", "o.o..", "oo...")),
+    ("boat-tie", ("oo...", "o.o..", ".o.o.", "..o.o", "...oo")),
+    ("blinker", ("ooo",)),
+    ("toad", (".ooo", "ooo.")),
+    ("beacon", ("oo..", "oo..", "..oo", "..oo")),
+    ("traffic light", (
+        "....o....", "....o....", "....o....", ".........", "ooo...ooo",
+        ".........", "....o....", "....o....", "....o....",
+    )),
+    ("pulsar", (
+        "..ooo...ooo..",
+        ".............",
+        "o....o.o....o",
+        "o....o.o....o",
+        "o....o.o....o",
+        "..ooo...ooo..",
+        ".............",
+        "..ooo...ooo..",
+        "o....o.o....o",
+        "o....o.o....o",
+        "o....o.o....o",
+        ".............",
+        "..ooo...ooo..",
+    )),
+    ("pentadecathlon", ("..o....o..", "oo.oooo.oo", "..o....o..")),
+    ("glider", (".o.", "..o", "ooo")),
+    ("lightweight spaceship", (".o..o", "o....", "o...o", "oooo.")),
+    ("middleweight spaceship", ("...o..", ".o...o", "o.....", "o....o", "ooooo.")),
+    ("heavyweight spaceship", (
+        "...oo..", ".o....o", "o......", "o.....o", "oooooo.",
+    )),
+)
+
+
+def wechsler(cells: Iterable[Cell]) -> str:
+    """
+    Encode a normalized shape (smallest row and column are 0) in the
+    extended Wechsler format used by apgcodes: the rows are cut into
+    strips of 5, each column of a strip is one base-32 digit (top row =
+    bit 0), strips are separated by "z", trailing empty columns are
+    dropped and runs of empty columns are shortened ("w" = 2, "x" = 3,
+    "y" + digit = 4 to 39).
+    """
+    cells = list(cells)
+    if not cells:
+        return ""
+    rows = max(r for r, _ in cells) + 1
+    cols = max(c for _, c in cells) + 1
+    strips = [[0] * cols for _ in range(0, rows, 5)]
+    for r, c in cells:
+        strips[r // 5][c] |= 1 << (r % 5)
+    return "z".join(_compress(strip) for strip in strips)
+
+
+def _compress(values: List[int]) -> str:
+    while values and not values[-1]:
+        values.pop()
+    out = []
+    i = 0
+    while i < len(values):
+        if values[i]:
+            out.append(_DIGITS[values[i]])
+            i += 1
+            continue
+        run = 1
+        while not values[i + run]:
+            run += 1
+        i += run
+        while run >= 4:
+            n = min(run, 39)
+            out.append("y" + _DIGITS[n - 4])
+            run -= n
+        out.append(("", "0", "w", "x")[run])
+    return "".join(out)
+
+
+def normalize(cells: Iterable[Cell]) -> Tuple[Shape, Cell]:
+    """
+    Translate cells so that the smallest row and column are 0.
+
+    :return: (normalized shape, (row, col) offset that was removed).
+    """
+    cells = list(cells)
+    r0 = min(r for r, _ in cells)
+    c0 = min(c for _, c in cells)
+    return frozenset((r - r0, c - c0) for r, c in cells), (r0, c0)
+
+
+def _orientations(shape: Shape) -> Iterator[Shape]:
+    """
+    The 8 rotations and reflections of a shape, each normalized.
+    """
+    for swap in (False, True):
+        for flip_r in (1, -1):
+            for flip_c in (1, -1):
+                if swap:
+                    moved = ((flip_r * c, flip_c * r) for r, c in shape)
+                else:
+                    moved = ((flip_r * r, flip_c * c) for r, c in shape)
+                yield normalize(moved)[0]
+
+
+def canonical_code(phases: Iterable[Shape]) -> str:
+    """
+    Return the Wechsler code of an object that does not depend on its
+    position, orientation or phase: the shortest (then alphabetically
+    first) code over every phase in every rotation and reflection.
+    """
+    best = ""
+    for phase in phases:
+        for shape in _orientations(phase):
+            code = wechsler(shape)
+            if not best or (len(code), code) < (len(best), best):
+                best = code
+    return best
+
+
+@lru_cache(maxsize=1 << 16)
+def classify(
+    ruleset_name: str, shape: Shape, max_period: int = DEFAULT_MAX_PERIOD
+) -> Tuple[str, str, int]:
+    """
+    Identify one object by evolving it alone on an infinite plane until
+    it comes back to its own shape (results are cached per shape).
+
+    The code follows the apgcode naming: "xs<population>_" for still
+    lifes, "xp<period>_" for oscillators and "xq<period>_" for
+    spaceships, followed by canonical_code of all its phases. Objects
+    that do not repeat within max_period generations get "zz_" and the
+    code of the given phase only.
+
+    :param ruleset_name: Name of the ruleset or a rulestring (3x3 rules).
+    :param shape: Normalized alive cells of the object (see normalize).
+    :param max_period: Longest period that is detected.
+    :return: (code, kind, period), kind being one of OBJECT_KINDS
+             (period 0 for unknown objects).
+    """
+    rule = get_ruleset(ruleset_name)
+    board = SparseBoard(1, 1, bounded=False)
+    board.live = set(shape)
+    phases = [shape]
+    for period in range(1, max_period + 1):
+        board = next_generation(board, rule)
+        if not board.live:
+            break
+        phase, offset = normalize(board.live)
+        if phase == shape:
+            if offset != (0, 0):
+                kind, prefix = "spaceship", f"xq{period}"
+            elif period == 1:
+                kind, prefix = "still", f"xs{len(shape)}"
+            else:
+                kind, prefix = "oscillator", f"xp{period}"
+            return f"{prefix}_{canonical_code(phases)}", kind, period
+        phases.append(phase)
+    return f"zz_{canonical_code([shape])}", "unknown", 0
+
+
+@lru_cache(maxsize=None)
+def known_objects() -> Dict[str, str]:
+    """
+    Return the index of KNOWN_OBJECTS: canonical code -> name
+    (built once per process).
+    """
+    index = {}
+    for name, rows in KNOWN_OBJECTS:
+        shape = frozenset(
+            (r, c) for r, row in enumerate(rows) for c, ch in enumerate(row)
+            if ch == "o"
+        )
+        index[classify("classic", shape)[0]] = name
+    return index
+
+
+def object_name(code: str, ruleset_name: str) -> Optional[str]:
+    """
+    Return the common name of an object code, if it is a known object
+    of the classic rules and the census used them.
+    """
+    if rulestring(get_ruleset(ruleset_name)) != "B3/S23":
+        return None
+    return known_objects().get(code)
+
+
+def split_objects(
+    cells: Set[Cell],
+    distance: int = OBJECT_DISTANCE,
+    starts: Optional[Iterable[Cell]] = None,
+) -> List[Set[Cell]]:
+    """
+    Split alive cells into objects: groups of cells connected through
+    cells at most `distance` apart in both directions.
+
+    :param starts: Only return the objects containing these cells
+                   (default: all objects).
+    """
+    offsets = [
+        (dr, dc)
+        for dr in range(-distance, distance + 1)
+        for dc in range(-distance, distance + 1)
+        if (dr, dc) != (0, 0)
+    ]
+    left = set(cells)
+    pending = set(cells if starts is None else starts)
+    objects = []
+    while pending:
+        start = pending.pop()
+        if start not in left:
+            continue
+        left.discard(start)
+        group = {start}
+        queue = deque([start])
+        while queue:
+            r, c = queue.popleft()
+            for dr, dc in offsets:
+                cell = (r + dr, c + dc)
+                if cell in left:
+                    left.remove(cell)
+                    group.add(cell)
+                    queue.append(cell)
+        objects.append(group)
+    return objects
+
+
+def soup_cells(seed: int, index: int, size: int, density: float) -> np.ndarray:
+    """
+    Return soup number `index` of a search as a (size, size) uint8
+    array: each cell is alive with probability `density`. Every soup
+    has its own random stream, so it does not depend on how the search
+    was split into batches.
+    """
+    rng = np.random.default_rng([seed, index])
+    return (rng.random((size, size)) < density).view(np.uint8)
+
+
+def soup_board(
+    seed: int,
+    index: int,
+    size: int = DEFAULT_SOUP_SIZE,
+    density: float = DEFAULT_DENSITY,
+    margin: int = DEFAULT_MARGIN,
+) -> Board:
+    """
+    Rebuild the board a soup of a search started from (e.g. to look at
+    the soup where an object was first seen).
+    """
+    side = size + 2 * margin
+    cells = np.zeros((side, side), dtype=np.uint8)
+    cells[margin:margin + size, margin:margin + size] = soup_cells(
+        seed, index, size, density
+    )
+    return Board.from_bytes(side, side, cells.tobytes())
+
+
+class Census:
+    """
+    Object tallies of a soup search, mergeable across workers.
+
+    - objects: code -> number of occurrences.
+    - kinds: code -> (kind, period) (see classify).
+    - first_soup: code -> lowest soup index it was seen in.
+    - soups / stabilized / extinct: soups searched, soups that ended
+      still or periodic (including extinct ones), soups that died out.
+    - unstabilized: indexes of soups still active after the generation
+      limit (not censused).
+    - generations: generations stepped over all soups.
+    - seconds: wall-clock time of the search.
+    """
+
+    def __init__(self) -> None:
+        self.objects: Counter = Counter()
+        self.kinds: Dict[str, Tuple[str, int]] = {}
+        self.first_soup: Dict[str, int] = {}
+        self.soups = 0
+        self.stabilized = 0
+        self.extinct = 0
+        self.unstabilized: List[int] = []
+        self.generations = 0
+        self.seconds = 0.0
+
+    def add(self, code: str, kind: str, period: int, soup: int) -> None:
+        self.objects[code] += 1
+        self.kinds[code] = (kind, period)
+        if soup < self.first_soup.get(code, soup + 1):
+            self.first_soup[code] = soup
+
+    def merge(self, other: "Census") -> None:
+        """
+        Add another census (e.g. of another worker's batch) to this one.
+        """
+        self.objects.update(other.objects)
+        self.kinds.update(other.kinds)
+        for code, soup in other.first_soup.items():
+            if soup < self.first_soup.get(code, soup + 1):
+                self.first_soup[code] = soup
+        self.soups += other.soups
+        self.stabilized += other.stabilized
+        self.extinct += other.extinct
+        self.unstabilized.extend(other.unstabilized)
+        self.generations += other.generations
+
+    @property
+    def soups_per_second(self) -> float:
+        return self.soups / self.seconds if self.seconds else 0.0
+
+    def as_dict(self, ruleset_name: str = "classic") -> Dict[str, Any]:
+        return {
+            "soups": self.soups,
+            "stabilized": self.stabilized,
+            "extinct": self.extinct,
+            "unstabilized": sorted(self.unstabilized),
+            "generations": self.generations,
+            "seconds": self.seconds,
+            "soups_per_second": self.soups_per_second,
+            "objects": [
+                {
+                    "code": code,
+                    "name": object_name(code, ruleset_name),
+                    "kind": self.kinds[code][0],
+                    "period": self.kinds[code][1],
+                    "count": count,
+                    "first_soup": self.first_soup[code],
+                }
+                for code, count in self.objects.most_common()
+            ],
+        }
+
+    def report(self, ruleset_name: str = "classic", limit: int = 20) -> str:
+        """
+        Return the most common objects as a text table.
+        """
+        total = sum(self.objects.values())
+        lines = [f"{'count':>9} {'share':>7}  {'kind':<10} {'code':<24} name"]
+        for code, count in self.objects.most_common(limit):
+            kind, period = self.kinds[code]
+            if kind in ("oscillator", "spaceship"):
+                kind = f"{kind[:5]} p{period}"
+            lines.append(
+                f"{count:>9} {count / total:>7.2%}  {kind:<10} {code:<24} "
+                f"{object_name(code, ruleset_name) or ''}"
+            )
+        if len(self.objects) > limit:
+            lines.append(f"... {len(self.objects) - limit} more object(s)")
+        return "\n".join(lines)
+
+
+def _phases(cells: Set[Cell], ruleset_name: str, period: int) -> Set[Cell]:
+    """
+    Return the union of the cells over `period` generations, so that
+    oscillators whose parts separate in some phases stay one object.
+    """
+    rule = get_ruleset(ruleset_name)
+    board = SparseBoard(1, 1, bounded=False)
+    board.live = set(cells)
+    union = set(cells)
+    for _ in range(period - 1):
+        board = next_generation(board, rule)
+        union |= board.live
+    return union
+
+
+def _census_soup(
+    census: Census, cells: np.ndarray, period: int, soup: int, task: Task
+) -> None:
+    """
+    Split a stabilized soup into objects and count them.
+    """
+    live = set(zip(*np.nonzero(cells)))
+    live = {(int(r), int(c)) for r, c in live}
+    for group in split_objects(_phases(live, task["ruleset"], period)):
+        shape, _ = normalize(group & live)
+        census.add(*classify(task["ruleset"], shape, task["max_period"]), soup)
+
+
+def _remove_escapees(
+    census: Census, cells: np.ndarray, soup: int, task: Task
+) -> None:
+    """
+    Count and erase the spaceships in the outer half of the margin,
+    before they reach the board edge (where the dead boundary would
+    break them up) and so that the soup can stabilize without them.
+    """
+    zone = task["margin"] // 2
+    live = {(int(r), int(c)) for r, c in zip(*np.nonzero(cells))}
+    last = cells.shape[0] - zone
+    outside = [
+        (r, c) for r, c in live if r < zone or c < zone or r >= last or c >= last
+    ]
+    for group in split_objects(live, starts=outside):
+        if len(group) > ESCAPEE_MAX_CELLS:
+            continue
+        shape, _ = normalize(group)
+        code, kind, period = classify(task["ruleset"], shape, ESCAPEE_MAX_PERIOD)
+        if kind == "spaceship":
+            census.add(code, kind, period, soup)
+            for r, c in group:
+                cells[r, c] = 0
+
+
+def search_batch(task: Task) -> Census:
+    """
+    Run one batch of soups (task["first"] .. + task["count"] - 1) to
+    stabilization and count the objects they end with.
+
+    The soups are stepped together in an Ensemble, in rounds of
+    margin - 8 generations. After each round, members that died out or
+    repeat a state are censused and dropped; in the others, spaceships
+    that reached the outer half of the margin are counted and erased.
+    A c/2 spaceship (the fastest in the classic rules) cannot cross that
+    zone within one round, so it is caught before it hits the edge.
+    """
+    size, margin = task["size"], task["margin"]
+    side = size + 2 * margin
+    rounds = margin - 8
+    max_period = task["max_period"]
+    soups = np.arange(task["first"], task["first"] + task["count"])
+
+    cells = np.zeros((len(soups), side, side), dtype=np.uint8)
+    for i, soup in enumerate(soups):
+        cells[i, margin:margin + size, margin:margin + size] = soup_cells(
+            task["seed"], int(soup), size, task["density"]
+        )
+
+    census = Census()
+    census.soups = len(soups)
+    # Near-edge cells, to skip the escapee check for most members
+    edge = np.ones((side, side), dtype=bool)
+    edge[margin // 2:side - margin // 2, margin // 2:side - margin // 2] = False
+
+    generation = 0
+    while len(soups) and generation < task["max_generations"]:
+        steps = min(rounds, task["max_generations"] - generation)
+        result = Ensemble(cells).run(
+            task["ruleset"], steps, max_period=min(max_period, steps)
+        )
+        done = result.kind != RUNNING
+        for i in np.flatnonzero(done):
+            census.stabilized += 1
+            census.generations += generation + int(result.generation[i])
+            if result.kind[i] == EXTINCT:
+                census.extinct += 1
+                continue
+            _census_soup(
+                census, result.cells[i], int(result.period[i]), int(soups[i]), task
+            )
+
+        generation += steps
+        cells, soups = result.cells[~done], soups[~done]
+        for i in np.flatnonzero(cells[:, edge].any(axis=1)):
+            _remove_escapees(census, cells[i], int(soups[i]), task)
+
+    census.generations += generation * len(soups)
+    census.unstabilized = [int(soup) for soup in soups]
+    return census
+
+
+def build_tasks(
+    soups: int,
+    ruleset_name: str = "classic",
+    seed: int = 0,
+    batch: int = DEFAULT_BATCH,
+    size: int = DEFAULT_SOUP_SIZE,
+    density: float = DEFAULT_DENSITY,
+    margin: int = DEFAULT_MARGIN,
+    max_generations: int = DEFAULT_MAX_GENERATIONS,
+    max_period: int = DEFAULT_MAX_PERIOD,
+) -> List[Task]:
+    """
+    Cut a search of `soups` soups into tasks of `batch` soups.
+
+    :raises ValueError: If a count or size is not positive, the margin is
+                        below 16 or the density is not between 0 and 1.
+    """
+    if min(soups, batch, size, max_generations, max_period) <= 0:
+        raise ValueError(
+            "Soups, batch, size, max_generations and max_period must be positive"
+        )
+    if margin < 16:
+        raise ValueError(f"Margin must be at least 16 cells, got {margin}")
+    if not 0.0 <= density <= 1.0:
+        raise ValueError(f"Density must be between 0 and 1, got {density}")
+    get_ruleset(ruleset_name)
+
+    return [
+        {
+            "ruleset": ruleset_name,
+            "seed": seed,
+            "first": first,
+            "count": min(batch, soups - first),
+            "size": size,
+            "density": density,
+            "margin": margin,
+            "max_generations": max_generations,
+            "max_period": max_period,
+        }
+        for first in range(0, soups, batch)
+    ]
+
+
+def run_census(
+    tasks: Sequence[Task],
+    workers: int = 1,
+    log: Optional[Callable[[str], None]] = None,
+) -> Census:
+    """
+    Run the tasks and merge their tallies as they finish.
+
+    With workers > 1 the batches are spread over a process pool; each
+    worker sends back only its Census, never boards.
+
+    :param log: Called with a progress line after every batch.
+    """
+    census = Census()
+    total = sum(task["count"] for task in tasks)
+    start = time.perf_counter()
+
+    def batches() -> Iterator[Census]:
+        if workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield search_batch(task)
+            return
+        with Pool(processes=min(workers, len(tasks))) as pool:
+            # chunksize 1: batches differ in length, keep workers busy
+            yield from pool.imap_unordered(search_batch, tasks, chunksize=1)
+
+    for result in batches():
+        census.merge(result)
+        census.seconds = time.perf_counter() - start
+        if log is not None:
+            log(
+                f"[{census.soups}/{total}] {sum(census.objects.values())} objects, "
+                f"{census.soups_per_second:.1f} soups/s"
+            )
+    census.seconds = time.perf_counter() - start
+    return census
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point, e.g.:
+
+        python main.py census --soups 10000 --workers 8
+        python main.py census --soups 2000 --rule B36/S23 --out census.json
+
+    :return: Exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py census",
+        description="Search random soups and count the objects they leave",
+    )
+    parser.add_argument("--soups", type=int, default=1000, help="number of soups")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rule", default="classic",
+                        help="ruleset name or rulestring (e.g. B36/S23)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SOUP_SIZE,
+                        help="soup side in cells")
+    parser.add_argument("--density", type=float, default=DEFAULT_DENSITY)
+    parser.add_argument("--margin", type=int, default=DEFAULT_MARGIN,
+                        help="dead cells around each soup")
+    parser.add_argument("--max-generations", type=int,
+                        default=DEFAULT_MAX_GENERATIONS)
+    parser.add_argument("--max-period", type=int, default=DEFAULT_MAX_PERIOD)
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH,
+                        help="soups stepped together per task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=20, help="objects to list")
+    parser.add_argument("--out", help="write the full census as JSON here")
+
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = build_tasks(
+            args.soups, args.rule, args.seed, args.batch, args.size, args.density,
+            args.margin, args.max_generations, args.max_period,
+        )
+    except (ValueError, GameOfLifeError) as e:
+        parser.error(str(e))
+
+    census = run_census(tasks, args.workers, log=print)
+    print(f"\n{census.report(args.rule, args.top)}")
+    print(
+        f"\n{census.soups} soups in {census.seconds:.1f} s "
+        f"({census.soups_per_second:.1f} soups/s): {census.stabilized} stabilized "
+        f"({census.extinct} extinct), {len(census.unstabilized)} unstabilized"
+    )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(census.as_dict(args.rule), f, indent=2)
+        print(f"Census written to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+# checkpoint.py
+
+import argparse
+import importlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, Optional, Sequence
+
+from board import Board
+from errors import CheckpointError, GameOfLifeError
+from simlog import pack_cells, unpack_cells
+
+# --- Checkpoint layout ---
+#
+# Header:
+#   magic       6 bytes  b"GOLCKP"
+#   version     uint8
+#   (padding)   1 byte
+#   rows        uint32
+#   cols        uint32
+#   generation  uint64
+#   meta_len    uint32, followed by the metadata (UTF-8 JSON): ruleset,
+#               engine, run_simulation parameters, log resume state,
+#               cycle detector state and board-type state
+# Cells: zlib-compressed, packed 8 per byte (see simlog.pack_cells)
+# CRC32 of everything above (uint32)
+#
+# A checkpoint is written to a temporary file that replaces the previous
+# checkpoint only once it is complete and on disk, so a crash while
+# checkpointing leaves the previous checkpoint intact.
+
+MAGIC = b"GOLCKP"
+VERSION = 1
+HEADER = struct.Struct("<6sBxIIQI")
+CRC = struct.Struct("<I")
+
+# Board variants a checkpoint can restore, by class name: (module, class).
+# Engine modules are only imported when a checkpoint of their board is
+# loaded.
+BOARD_TYPES = {
+    "Board": ("board", "Board"),
+    "ArrayBoard": ("engine_numpy", "ArrayBoard"),
+    "BitBoard": ("engine_bitboard", "BitBoard"),
+    "SparseBoard": ("engine_sparse", "SparseBoard"),
+    "TiledBoard": ("engine_tiled", "TiledBoard"),
+}
+
+
+def board_state(board: Board) -> Dict[str, Any]:
+    """
+    Return the engine-specific state of a board that its cells alone do
+    not capture: the board type, the alive cells outside the window of an
+    infinite SparseBoard and the active tiles of a TiledBoard.
+    """
+    state: Dict[str, Any] = {"type": type(board).__name__}
+    if hasattr(board, "bounded"):
+        state["bounded"] = board.bounded
+        if not board.bounded:
+            state["live"] = sorted(board.live)
+    if hasattr(board, "tile_size"):
+        state["tile_size"] = board.tile_size
+        active = board.active
+        state["active"] = sorted(active) if active is not None else None
+    return state
+
+
+def restore_board(rows: int, cols: int, cells: bytes, state: Dict[str, Any]) -> Board:
+    """
+    Rebuild a board of the checkpointed type from its cells and the
+    state returned by board_state().
+
+    :raises CheckpointError: If the board type is unknown or its engine
+                             module cannot be imported here.
+    """
+    board = Board.from_bytes(rows, cols, cells)
+    kind = state.get("type", "Board")
+    if kind == "Board":
+        return board
+    if kind not in BOARD_TYPES:
+        raise CheckpointError(f"Unknown board type in checkpoint: {kind}")
+
+    module_name, class_name = BOARD_TYPES[kind]
+    try:
+        cls = getattr(importlib.import_module(module_name), class_name)
+    except ImportError as e:
+        raise CheckpointError(
+            f"Cannot restore a {kind} checkpoint: {e}"
+        ) from e
+
+    if "bounded" in state:
+        board = cls.from_board(board, bounded=state["bounded"])
+        if "live" in state:
+            board.live = {(r, c) for r, c in state["live"]}
+    elif "tile_size" in state:
+        board = cls.from_board(board, tile_size=state["tile_size"])
+        if state["active"] is not None:
+            board.active = {(tr, tc) for tr, tc in state["active"]}
+    else:
+        board = cls.from_board(board)
+    return board
+
+
+class Checkpoint:
+    """
+    A loaded checkpoint: the board at `generation` plus everything needed
+    to continue the run exactly where it stopped.
+
+    - run: the run_simulation parameters of the checkpointed run
+      (steps, log file and format, checkpoint interval, ...).
+    - log_state: resume state of the simulation log (None without log).
+    - detector_state: CycleDetector state (None without detector).
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        generation: int,
+        ruleset_name: str,
+        engine_name: str,
+        run: Dict[str, Any],
+        log_state: Optional[Dict[str, Any]] = None,
+        detector_state: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.board = board
+        self.generation = generation
+        self.ruleset_name = ruleset_name
+        self.engine_name = engine_name
+        self.run = run
+        self.log_state = log_state
+        self.detector_state = detector_state
+
+    def log_resume(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the `resume` argument for simlog.open_log: the log state
+        plus the cells of the last logged generation, when that is the
+        checkpointed one (binary logs continue their deltas from it).
+        """
+        if self.log_state is None:
+            return None
+        previous = None
+        if self.log_state["generation"] == self.generation:
+            previous = self.board.to_bytes()
+        return dict(self.log_state, previous=previous)
+
+
+def save_checkpoint(
+    filepath: str,
+    board: Board,
+    generation: int,
+    ruleset_name: str,
+    engine_name: str,
+    run: Optional[Dict[str, Any]] = None,
+    log_state: Optional[Dict[str, Any]] = None,
+    detector_state: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Atomically write a checkpoint (see the layout above).
+
+    The data goes to `filepath`.tmp, is flushed and fsynced, and then
+    replaces `filepath` with os.replace, so readers only ever see a
+    complete checkpoint.
+    """
+    meta = json.dumps({
+        "ruleset": ruleset_name,
+        "engine": engine_name,
+        "run": run or {},
+        "log": log_state,
+        "detector": detector_state,
+        "board": board_state(board),
+    }).encode("utf-8")
+    data = (
+        HEADER.pack(MAGIC, VERSION, board.rows, board.cols, generation, len(meta))
+        + meta
+        + zlib.compress(pack_cells(board.to_bytes()))
+    )
+
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.write(CRC.pack(zlib.crc32(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+    # Make the rename itself durable (not available on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(os.path.abspath(filepath)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def load_checkpoint(filepath: str) -> Checkpoint:
+    """
+    Read a checkpoint written by save_checkpoint.
+
+    :raises CheckpointError: If the file is missing, truncated, corrupt
+                             (CRC mismatch) or of an unknown version.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise CheckpointError(f"Cannot read checkpoint {filepath}: {e}") from e
+
+    if len(data) < HEADER.size + CRC.size:
+        raise CheckpointError(f"Checkpoint {filepath} is truncated")
+    body, (crc,) = data[:-CRC.size], CRC.unpack(data[-CRC.size:])
+    magic, version, rows, cols, generation, meta_len = HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise CheckpointError(f"{filepath} is not a checkpoint")
+    if version != VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version: {version}")
+    if zlib.crc32(body) != crc:
+        raise CheckpointError(f"Checkpoint {filepath} is corrupt (CRC mismatch)")
+
+    meta = json.loads(body[HEADER.size:HEADER.size + meta_len].decode("utf-8"))
+    cells = unpack_cells(
+        zlib.decompress(body[HEADER.size + meta_len:]), rows * cols
+    )
+    return Checkpoint(
+        board=restore_board(rows, cols, cells, meta["board"]),
+        generation=generation,
+        ruleset_name=meta["ruleset"],
+        engine_name=meta["engine"],
+        run=meta["run"],
+        log_state=meta["log"],
+        detector_state=meta["detector"],
+    )
+
+
+class Checkpointer:
+    """
+    Writes checkpoints while run_simulation runs: every `every`
+    generations and/or every `seconds` seconds of wall time, whichever
+    comes first. due() is called once per generation and only compares
+    two numbers, so checking costs nothing measurable.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        every: int = 0,
+        seconds: Optional[float] = None,
+        run: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param filepath: Path of the checkpoint file (replaced each time).
+        :param every: Checkpoint every N generations (0 = off).
+        :param seconds: Checkpoint every T seconds (None = off).
+        :param run: run_simulation parameters stored in each checkpoint.
+        :raises CheckpointError: If both intervals are off or negative.
+        """
+        if every < 0 or (seconds is not None and seconds <= 0):
+            raise CheckpointError(
+                f"Checkpoint intervals must be positive, got {every} / {seconds}"
+            )
+        if not every and seconds is None:
+            raise CheckpointError(
+                "Give a checkpoint interval in generations or seconds"
+            )
+
+        self.filepath = filepath
+        self.every = every
+        self.seconds = seconds
+        self.run = run or {}
+        self.saved = 0
+        self._deadline = self._next_deadline()
+
+    def _next_deadline(self) -> float:
+        if self.seconds is None:
+            return float("inf")
+        return time.monotonic() + self.seconds
+
+    def due(self, generation: int) -> bool:
+        if self.every and generation % self.every == 0:
+            return True
+        return self._deadline != float("inf") and time.monotonic() >= self._deadline
+
+    def save(
+        self,
+        board: Board,
+        generation: int,
+        ruleset_name: str,
+        engine_name: str,
+        writer: Any = None,
+        detector: Any = None,
+    ) -> None:
+        """
+        Flush the log (if any) and write a checkpoint of this generation.
+        """
+        log_state = writer.checkpoint_state() if writer is not None else None
+        detector_state = detector.get_state() if detector is not None else None
+        save_checkpoint(
+            self.filepath, board, generation, ruleset_name, engine_name,
+            run=self.run, log_state=log_state, detector_state=detector_state,
+        )
+        self.saved += 1
+        self._deadline = self._next_deadline()
+
+
+def resume_simulation(
+    filepath: str,
+    steps: Optional[int] = None,
+    observers: Optional[Sequence[Any]] = None,
+    detector: Any = None,
+) -> Board:
+    """
+    Continue a run_simulation run from its last checkpoint.
+
+    The board, generation number, ruleset, engine, log file (truncated to
+    the checkpointed offset and appended to) and cycle detector state are
+    restored, and checkpoints keep being written to the same file, so the
+    final board and the log are the same as those of an uninterrupted run.
+
+    :param filepath: Checkpoint file of the interrupted run.
+    :param steps: Total number of generations (default: the original
+                  run's steps); may be larger to extend a finished run.
+    :param observers: Optional observers for the remaining generations.
+    :param detector: CycleDetector to restore into; by default one is
+                     created if the original run used one.
+    :return: Final board.
+    :raises CheckpointError: If the checkpoint cannot be loaded.
+    """
+    # Imported here: engine.py imports this module
+    from cycles import CycleDetector
+    from engine import run_simulation
+
+    checkpoint = load_checkpoint(filepath)
+    run = checkpoint.run
+    if detector is None and checkpoint.detector_state is not None:
+        detector = CycleDetector()
+
+    return run_simulation(
+        board=checkpoint.board,
+        ruleset_name=checkpoint.ruleset_name,
+        steps=run.get("steps", checkpoint.generation) if steps is None else steps,
+        log_file=run.get("log_file"),
+        engine_name=checkpoint.engine_name,
+        log_format=run.get("log_format", "text"),
+        log_compression=run.get("log_compression"),
+        log_async=run.get("log_async", False),
+        log_policy=run.get("log_policy", "block"),
+        log_sample_every=run.get("log_sample_every", 1),
+        detector=detector,
+        observers=observers,
+        checkpoint_file=filepath,
+        checkpoint_every=run.get("checkpoint_every", 0),
+        checkpoint_seconds=run.get("checkpoint_seconds"),
+        resume=checkpoint,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point, e.g.:
+
+        python main.py resume logs/run.ckpt
+        python main.py resume logs/run.ckpt --steps 2000000
+
+    :return: Exit code (1 if the checkpoint could not be resumed).
+    """
+    # Imported here: metrics is only needed by the command line
+    from metrics import SummaryObserver
+
+    parser = argparse.ArgumentParser(
+        prog="main.py resume", description="Resume a simulation from a checkpoint"
+    )
+    parser.add_argument("checkpoint")
+    parser.add_argument("--steps", type=int,
+                        help="total generations (default: those of the original run)")
+    args = parser.parse_args(argv)
+
+    summary = SummaryObserver()
+    try:
+        checkpoint = load_checkpoint(args.checkpoint)
+        print(
+            f"Resuming {checkpoint.ruleset_name} / {checkpoint.engine_name} "
+            f"from generation {checkpoint.generation}..."
+        )
+        resume_simulation(args.checkpoint, steps=args.steps, observers=[summary])
+    except GameOfLifeError as e:
+        # CheckpointError, or e.g. LogFormatError if the log is missing
+        print(f"Cannot resume: {e}")
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# cycles.py
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from board import Board
+from simlog import changed_cells
+
+# Kinds of end states a CycleDetector can report
+CYCLE_KINDS = ("extinct", "still", "oscillator")
+
+# Default number of (hash -> generation) entries kept by a CycleDetector.
+# Cycles with a period up to this number are detected.
+DEFAULT_MAX_ENTRIES = 4096
+
+_MASK64 = (1 << 64) - 1
+
+
+def cell_key(index: int) -> int:
+    """
+    Return the 64-bit Zobrist key of a cell (by row-major index).
+
+    The key is derived from the index with the splitmix64 mixing function
+    instead of being looked up in a table of random numbers, so the keys
+    cost no memory, whatever the board size.
+    """
+    z = (index * 0x9E3779B97F4A7C15 + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class CycleResult:
+    """
+    End state found by a CycleDetector.
+
+    - kind: "extinct" (no alive cells), "still" (period 1)
+      or "oscillator" (period > 1).
+    - generation: generation at which the repetition was detected.
+    - period: number of generations between two identical states.
+    - first_generation: first generation of the repeating state
+      (generation - period; for "extinct", the first empty generation).
+    """
+
+    def __init__(
+        self, kind: str, generation: int, period: int, first_generation: int
+    ) -> None:
+        self.kind = kind
+        self.generation = generation
+        self.period = period
+        self.first_generation = first_generation
+
+    def __repr__(self) -> str:
+        return (
+            f"CycleResult(kind={self.kind!r}, generation={self.generation}, "
+            f"period={self.period}, first_generation={self.first_generation})"
+        )
+
+
+class CycleDetector:
+    """
+    Detects extinction, still lifes and oscillators while a simulation runs.
+
+    Each generation is summarized by a Zobrist hash: the XOR of the keys
+    of all alive cells. When a cell flips, its key is XORed in or out, so
+    update() only touches the cells that changed since the previous
+    generation instead of rehashing the whole grid. The population is
+    kept the same way.
+
+    The last max_entries (hash, population) -> generation pairs are kept
+    in a bounded table (oldest dropped first). When a generation's hash is
+    already in the table, the board has returned to an earlier state and
+    the period is the difference between the two generations.
+
+    With 64-bit hashes, a false match after n generations has a probability
+    of about n^2 / 2^65, far below anything a simulation will run into.
+
+    Moving patterns (spaceships on an unbounded board) never repeat the
+    same cells, so they are not reported.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """
+        :param max_entries: Size of the hash table, i.e. the longest period
+                            that can be detected (must be > 0).
+        :raises ValueError: If max_entries is not positive.
+        """
+        if max_entries <= 0:
+            raise ValueError(
+                f"max_entries must be a positive integer, got {max_entries}"
+            )
+
+        self.max_entries = max_entries
+        self.result: Optional[CycleResult] = None
+        self.hash = 0
+        self.population = 0
+        self._cells: Optional[bytes] = None
+        self._seen: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+
+    def reset(self) -> None:
+        """
+        Forget all generations seen so far (e.g. after the board was edited).
+        """
+        self.result = None
+        self.hash = 0
+        self.population = 0
+        self._cells = None
+        self._seen.clear()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return the hash table and running hash as a JSON-serializable dict
+        (for checkpoints; the board itself is not included).
+        """
+        return {
+            "max_entries": self.max_entries,
+            "hash": self.hash,
+            "population": self.population,
+            "seen": [[h, p, g] for (h, p), g in self._seen.items()],
+        }
+
+    def set_state(self, state: Dict[str, Any], board: Board) -> None:
+        """
+        Restore a state from get_state(); `board` is the board of the
+        last generation passed to update() before the state was taken.
+        """
+        self.reset()
+        self.max_entries = state["max_entries"]
+        self.hash = state["hash"]
+        self.population = state["population"]
+        self._cells = board.to_bytes()
+        for h, p, g in state["seen"]:
+            self._seen[(h, p)] = g
+
+    def update(self, board: Board, generation: int) -> Optional[CycleResult]:
+        """
+        Record one generation.
+
+        :param board: Board state of this generation (any Board variant).
+        :param generation: Generation number (increasing between calls).
+        :return: A CycleResult if the board is empty or repeats an earlier
+                 generation, otherwise None. The result is also kept in
+                 self.result.
+        :raises ValueError: If the board size changed between calls.
+        """
+        cells = board.to_bytes()
+        previous = self._cells
+        if previous is None:
+            previous = bytes(len(cells))
+        elif len(previous) != len(cells):
+            raise ValueError("Board size changed while detecting cycles")
+        self._cells = cells
+
+        # XOR in/out the keys of the cells that flipped
+        h = self.hash
+        population = self.population
+        for index in changed_cells(previous, cells):
+            h ^= cell_key(index)
+            population += 1 if cells[index] else -1
+        self.hash = h
+        self.population = population
+
+        if population == 0:
+            self.result = CycleResult("extinct", generation, 1, generation)
+            return self.result
+
+        key = (h, population)
+        first = self._seen.get(key)
+        if first is not None:
+            period = generation - first
+            kind = "still" if period == 1 else "oscillator"
+            self.result = CycleResult(kind, generation, period, first)
+            return self.result
+
+        self._seen[key] = generation
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return None
@@ -1,9 +1,83 @@
 # engine.py
 
-from typing import Optional
+import importlib
+import time
+from typing import Callable, Dict, MutableSequence, Optional, Sequence
 
-from board import Board
-from rules import get_ruleset, RuleFunc
+from board import Board, BoardHistory
+from checkpoint import Checkpoint, Checkpointer
+from cycles import CycleDetector
+from metrics import GenerationStats, Observer
+from errors import EngineError
+from rules import get_ruleset, neighborhood_table, RuleFunc
+from simlog import AsyncLogWriter, open_log
+
+# Type alias for an engine step function:
+# takes (board, rule) and returns the board for the next generation.
+# Every engine also accepts an optional third argument, a GenerationStats
+# that it fills in while stepping (population, births, deaths, bbox).
+StepFunc = Callable[..., Board]
+
+# Registry for all available stepping engines.
+# Keys: engine name (str)
+# Values: step function (StepFunc)
+ENGINES: Dict[str, StepFunc] = {}
+
+# Engines that live in their own module (for example because they need an
+# optional dependency). The module is imported the first time the engine
+# is requested and registers itself with @engine.
+ENGINE_MODULES: Dict[str, str] = {
+    "numpy": "engine_numpy",
+    "bitboard": "engine_bitboard",
+    "sparse": "engine_sparse",
+    "tiled": "engine_tiled",
+    "ltl": "engine_ltl",
+}
+
+
+def engine(name: str) -> Callable[[StepFunc], StepFunc]:
+    """
+    Decorator that registers a step function under a given name.
+
+    Works the same way as @ruleset in rules.py:
+
+        @engine("python")
+        def next_generation(board, rule, stats=None):
+            ...
+    """
+    def decorator(func: StepFunc) -> StepFunc:
+        ENGINES[name] = func
+        return func
+
+    return decorator
+
+
+def get_engine(name: str) -> StepFunc:
+    """
+    Retrieve an engine step function by name.
+
+    Engines listed in ENGINE_MODULES are imported on first use.
+
+    :param name: Name of the engine (e.g. "python", "numpy").
+    :return: A step function (board, rule) -> Board.
+    :raises EngineError: If the engine does not exist or its module
+                         (or one of its dependencies) cannot be imported.
+    """
+    if name not in ENGINES and name in ENGINE_MODULES:
+        try:
+            importlib.import_module(ENGINE_MODULES[name])
+        except ImportError as e:
+            raise EngineError(
+                f"Engine '{name}' is not available: {e}"
+            ) from e
+
+    try:
+        return ENGINES[name]
+    except KeyError as e:
+        available = sorted(set(ENGINES) | set(ENGINE_MODULES))
+        raise EngineError(
+            f"Unknown engine: {name}. Available engines: {available}"
+        ) from e
 
 
 def count_neighbors(board: Board, row: int, col: int) -> int:
@@ -35,30 +109,190 @@ def count_neighbors(board: Board, row: int, col: int) -> int:
     return neighbors
 
 
-def next_generation(board: Board, rule: RuleFunc) -> Board:
+@engine("python")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> Board:
     """
     Compute the next generation for the given board using the provided rule.
 
     The function does not modify the original board. Instead, it creates
     and returns a new Board instance with updated cell states.
 
+    The rule is applied through its compiled 512-entry neighborhood table
+    (see rules.neighborhood_table): each row is scanned with a sliding
+    3x3 window whose 9-bit index is updated with one shift and one OR per
+    cell, instead of calling count_neighbors and the rule for every cell.
+    Cells outside the board are treated as dead, as in Board.get_cell().
+
     :param board: Current board (current generation).
     :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats to fill in while stepping.
     :return: New Board instance representing the next generation.
     """
     new_board = Board(board.rows, board.cols)
+    next_generation_into(board, new_board, rule, stats)
+    return new_board
+
 
-    for r in range(board.rows):
-        for c in range(board.cols):
-            is_alive = board.get_cell(r, c)
-            neighbors = count_neighbors(board, r, c)
-            new_state = rule(is_alive, neighbors)
+def next_generation_into(
+    board: Board, out: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> None:
+    """
+    Compute the next generation of `board` into an existing board.
 
-            # We can safely write directly into new_board.grid
-            # because we know indices are valid.
-            new_board.grid[r][c] = new_state
+    Same result as next_generation(), but the cells are written into the
+    rows of `out` instead of a newly allocated Board, so a simulation
+    loop can reuse two buffers forever (see DoubleBuffer).
 
-    return new_board
+    :param board: Current board (current generation). Not modified.
+    :param out: Plain Board of the same size that receives the next
+                generation. Must not be the same object as `board`.
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats; each finished row is added to
+                  it (population, births, deaths, bounding box).
+    :raises ValueError: If `out` is `board` or has a different size.
+    """
+    if out is board:
+        raise ValueError("Cannot compute the next generation in place: out is board")
+    if (out.rows, out.cols) != (board.rows, board.cols):
+        raise ValueError(
+            f"Output board is {out.rows}x{out.cols}, expected {board.rows}x{board.cols}"
+        )
+
+    table = neighborhood_table(rule)
+    rows, cols = board.rows, board.cols
+
+    grid = board.grid
+    out_grid = out.grid
+    zeros = bytes(cols)
+    for r in range(rows):
+        up = grid[r - 1] if r > 0 else zeros
+        down = grid[r + 1] if r + 1 < rows else zeros
+
+        # We can safely write directly into out.grid
+        # because we know indices are valid.
+        step_row(up, grid[r], down, table, out_grid[r])
+        if stats is not None:
+            stats.record_row(r, grid[r], out_grid[r])
+
+
+def step_row(
+    up: Sequence[int],
+    row: Sequence[int],
+    down: Sequence[int],
+    table: bytes,
+    out: MutableSequence[int],
+) -> None:
+    """
+    Compute the next state of one row from the rows around it.
+
+    Cells to the left and right of the row are treated as dead; pass a
+    row of zeros as `up` or `down` for the first and last rows.
+
+    :param up: Row above (current generation).
+    :param row: The row itself (current generation).
+    :param down: Row below (current generation).
+    :param table: 512-entry neighborhood table (rules.neighborhood_table).
+    :param out: Row to write the next generation into (same length as row).
+    """
+    # One 3-bit code per column (up=4, centre=2, down=1), plus a dead
+    # column to the right of the board. The rows are read as big-endian
+    # ints (one byte per cell), so the codes of the whole row come from
+    # three shifts and two ORs; no byte can carry into the next.
+    n = len(row)
+    codes = (
+        (int.from_bytes(up, "big") << 2)
+        | (int.from_bytes(row, "big") << 1)
+        | int.from_bytes(down, "big")
+    ).to_bytes(n, "big") + b"\x00"
+
+    # Left (outside, dead) and first column; the row is built in a local
+    # buffer and written to `out` with one slice assignment
+    index = codes[0]
+    new = bytearray(n)
+    for c in range(n):
+        index = ((index << 3) & 0o777) | codes[c + 1]
+        new[c] = table[index]
+    out[:] = new
+
+
+class DoubleBuffer:
+    """
+    Allocation-free stepping with two preallocated boards.
+
+    Every step() writes the next generation into the back buffer and then
+    swaps front and back, so no Board or row list is allocated per
+    generation.
+
+    Ownership rules:
+        - The board passed to the constructor is copied and never modified.
+        - `current` is the front buffer. A reference to it stays valid for
+          exactly one more step(): after the second step() the same object
+          is overwritten with a newer generation. Use snapshot() to keep a
+          generation for longer.
+        - Modifying `current` (set_cell, clear) before step() is allowed;
+          this is how the Pygame UI edits the board.
+
+    With history > 0, the last `history` generations are kept in a
+    fixed-size ring (BoardHistory) and undo() steps back through them.
+    """
+
+    def __init__(self, board: Board, rule: RuleFunc, history: int = 0) -> None:
+        """
+        :param board: Initial board state (copied).
+        :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+        :param history: Number of previous generations to keep for undo().
+        """
+        self.rule = rule
+        self.generation = 0
+        self._front = Board(board.rows, board.cols)
+        self._front.copy_from(board)
+        self._back = Board(board.rows, board.cols)
+        self.history: Optional[BoardHistory] = (
+            BoardHistory(board.rows, board.cols, history) if history > 0 else None
+        )
+
+    @property
+    def current(self) -> Board:
+        """
+        The current generation (the front buffer).
+        """
+        return self._front
+
+    def step(self, stats: Optional[GenerationStats] = None) -> Board:
+        """
+        Advance one generation and return the new front buffer.
+
+        :param stats: Optional GenerationStats to fill in while stepping.
+        """
+        if self.history is not None:
+            self.history.push(self._front)
+
+        next_generation_into(self._front, self._back, self.rule, stats)
+        self._front, self._back = self._back, self._front
+        self.generation += 1
+        return self._front
+
+    def undo(self) -> bool:
+        """
+        Go back one generation, if the history still has it.
+
+        :return: True if a generation was restored, False otherwise.
+        """
+        if self.history is None or not self.history.pop_into(self._front):
+            return False
+
+        self.generation -= 1
+        return True
+
+    def snapshot(self) -> Board:
+        """
+        Return an independent copy of the current generation.
+        """
+        board = Board(self._front.rows, self._front.cols)
+        board.copy_from(self._front)
+        return board
 
 
 def run_simulation(
@@ -66,6 +300,18 @@ def run_simulation(
     ruleset_name: str,
     steps: int,
     log_file: Optional[str] = None,
+    engine_name: str = "python",
+    log_format: str = "text",
+    log_compression: Optional[str] = None,
+    log_async: bool = False,
+    log_policy: str = "block",
+    log_sample_every: int = 1,
+    detector: Optional[CycleDetector] = None,
+    observers: Optional[Sequence[Observer]] = None,
+    checkpoint_file: Optional[str] = None,
+    checkpoint_every: int = 0,
+    checkpoint_seconds: Optional[float] = None,
+    resume: Optional[Checkpoint] = None,
 ) -> Board:
     """
     Run the Game of Life simulation for a given number of steps.
@@ -74,24 +320,138 @@ def run_simulation(
         - The board may be written to a log file (if log_file is provided).
         - The next generation is computed using the chosen ruleset.
 
+    With the default "python" engine the simulation runs on a DoubleBuffer,
+    so no Board is allocated per generation. The board passed in is never
+    modified.
+
     :param board: Initial board state.
     :param ruleset_name: Name of the ruleset (e.g. "classic", "highlife").
     :param steps: Number of generations to simulate (must be >= 0).
     :param log_file: Optional path to a log file. If provided, each
-                     generation (including the final one) will be appended.
-    :return: Board instance representing the final state after all steps.
+                     generation (including the final one) will be written
+                     through one open, buffered file handle.
+    :param engine_name: Name of the stepping engine (e.g. "python", "numpy").
+    :param log_format: "text" (appended, same format as Board.save_to_file),
+                       "binary" (compact keyframe + delta log, see simlog.py)
+                       or "archive" (fixed-size frames with O(1) seek,
+                       see archive.py).
+    :param log_compression: Binary logs only: None, "zlib" or "lzma".
+    :param log_async: Write the log on a background thread (AsyncLogWriter),
+                      so the simulation does not wait for the disk.
+    :param log_policy: With log_async, what to do when the writer falls
+                       behind: "block", "drop" or "sample".
+    :param log_sample_every: With log_policy="sample", log every N-th
+                             generation (the last one is always logged).
+    :param detector: Optional CycleDetector. Every generation is passed to
+                     it, and the simulation stops early as soon as the board
+                     dies out or repeats; detector.result then holds the
+                     kind, period and generation (None if all steps ran).
+    :param observers: Optional observers (see metrics.py). Each step is
+                      timed and the engine fills in population, births,
+                      deaths and bounding box while stepping; the stats
+                      are passed to every observer. Without observers the
+                      loop does no extra work.
+    :param checkpoint_file: Optional path of a checkpoint file (see
+                            checkpoint.py), rewritten atomically every
+                            `checkpoint_every` generations and/or every
+                            `checkpoint_seconds` seconds.
+    :param checkpoint_every: Checkpoint interval in generations (0 = off).
+    :param checkpoint_seconds: Checkpoint interval in seconds (None = off).
+    :param resume: Loaded checkpoint to continue from (use
+                   checkpoint.resume_simulation): `board` is then the
+                   checkpointed board, the log is continued at its
+                   checkpointed offset and the detector state is restored.
+    :return: Board instance representing the final state after all steps
+             (or at the generation where a cycle was detected).
     """
     rule = get_ruleset(ruleset_name)
+    step = get_engine(engine_name)
+    first = resume.generation if resume is not None else 0
+
+    checkpointer = None
+    if checkpoint_file is not None:
+        checkpointer = Checkpointer(
+            checkpoint_file,
+            every=checkpoint_every,
+            seconds=checkpoint_seconds,
+            run={
+                "steps": steps,
+                "log_file": log_file,
+                "log_format": log_format,
+                "log_compression": log_compression,
+                "log_async": log_async,
+                "log_policy": log_policy,
+                "log_sample_every": log_sample_every,
+                "checkpoint_every": checkpoint_every,
+                "checkpoint_seconds": checkpoint_seconds,
+            },
+        )
 
-    # Log the initial state as generation 0 (optional)
+    writer = None
     if log_file is not None:
-        board.save_to_file(log_file, generation=0)
+        writer = open_log(
+            log_file, log_format, board, ruleset_name, compression=log_compression,
+            resume=resume.log_resume() if resume is not None else None,
+        )
+        if log_async:
+            writer = AsyncLogWriter(
+                writer, policy=log_policy, sample_every=log_sample_every
+            )
+
+    observers = list(observers or ())
+
+    try:
+        for observer in observers:
+            observer.start(board, ruleset_name, engine_name)
+
+        # Log the initial state as generation 0 (optional; a resumed log
+        # already holds the generations up to the checkpoint)
+        if writer is not None and resume is None:
+            writer.write(board, generation=0)
+
+        if detector is not None:
+            if resume is not None and resume.detector_state is not None:
+                detector.set_state(resume.detector_state, board)
+            else:
+                detector.reset()
+                if detector.update(board, first) is not None:
+                    return board
+
+        buffers = None
+        if step is next_generation:
+            buffers = DoubleBuffer(board, rule)
+
+        # Perform the requested number of steps
+        for gen in range(first + 1, steps + 1):
+            if observers:
+                stats = GenerationStats(gen)
+                start = time.perf_counter()
+                if buffers is not None:
+                    board = buffers.step(stats)
+                else:
+                    board = step(board, rule, stats)
+                stats.seconds = time.perf_counter() - start
+                for observer in observers:
+                    observer.on_generation(stats)
+            elif buffers is not None:
+                board = buffers.step()
+            else:
+                board = step(board, rule)
+
+            if writer is not None:
+                writer.write(board, generation=gen)
 
-    # Perform the requested number of steps
-    for gen in range(1, steps + 1):
-        board = next_generation(board, rule)
+            if detector is not None and detector.update(board, gen) is not None:
+                break
 
-        if log_file is not None:
-            board.save_to_file(log_file, generation=gen)
+            if checkpointer is not None and checkpointer.due(gen):
+                checkpointer.save(
+                    board, gen, ruleset_name, engine_name, writer, detector
+                )
+    finally:
+        if writer is not None:
+            writer.close()
+        for observer in observers:
+            observer.close()
 
     return board
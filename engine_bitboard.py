@@ -0,0 +1,253 @@
+# engine_bitboard.py
+
+from typing import List, Optional
+
+from board import Board
+from engine import engine
+from errors import InvalidGridSizeError
+from metrics import GenerationStats
+from rules import RuleFunc, rule_table
+
+# Translation tables between cell bytes (0/1) and binary digit characters
+_CELLS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGITS_TO_CELLS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class BitBoard(Board):
+    """
+    Board variant that packs each row into a single Python int.
+
+    Bit `c` of `bits[r]` is the state of cell (r, c), so one row of any
+    width costs one (big) int instead of `cols` list slots. Whole rows are
+    updated with bitwise operations, 64+ cells per machine operation.
+
+    `grid` is still available for print(), save_to_file() and other
+    read-only users, but it is rebuilt on every access: use get_cell and
+    set_cell to read and modify single cells.
+    """
+
+    __slots__ = ("mask", "bits")
+
+    def __init__(self, rows: int, cols: int) -> None:
+        """
+        Initialize a new empty bit-packed board.
+
+        :param rows: Number of rows in the grid (must be > 0).
+        :param cols: Number of columns in the grid (must be > 0).
+        :raises InvalidGridSizeError: If rows or cols are not positive.
+        """
+        if rows <= 0 or cols <= 0:
+            raise InvalidGridSizeError(
+                f"Rows and columns must be positive integers, got {rows}x{cols}"
+            )
+
+        self.rows = rows
+        self.cols = cols
+        # Mask with one bit set for every column of a row
+        self.mask = (1 << cols) - 1
+        self.bits: List[int] = [0] * rows
+
+    @classmethod
+    def from_board(cls, board: Board) -> "BitBoard":
+        """
+        Create a bit-packed copy of any board.
+
+        :param board: Source board.
+        :return: New BitBoard with the same cells.
+        """
+        new_board = cls(board.rows, board.cols)
+        if isinstance(board, BitBoard):
+            new_board.bits = list(board.bits)
+            return new_board
+
+        for r, row in enumerate(board.grid):
+            # Column 0 must end up as the lowest bit, so the digit string
+            # is reversed before parsing it as a binary number.
+            digits = bytes(row)[::-1].translate(_CELLS_TO_DIGITS)
+            new_board.bits[r] = int(digits, 2)
+        return new_board
+
+    def to_board(self) -> Board:
+        """
+        Convert back to a plain bytearray-backed Board.
+        """
+        return Board.from_bytes(self.rows, self.cols, self.to_bytes())
+
+    @property
+    def grid(self) -> List[List[int]]:
+        """
+        Unpacked copy of the board as a 2D list (0 = dead, 1 = alive).
+        """
+        return [list(row) for row in self._unpacked_rows()]
+
+    def _unpacked_rows(self) -> List[bytes]:
+        width = self.cols
+        return [
+            format(bits, f"0{width}b")[::-1].encode().translate(_DIGITS_TO_CELLS)
+            for bits in self.bits
+        ]
+
+    def to_bytes(self) -> bytes:
+        """
+        Return all cells in row-major order, one byte (0 or 1) per cell.
+        """
+        return b"".join(self._unpacked_rows())
+
+    def view(self) -> memoryview:
+        """
+        Return a read-only 2D memoryview of an unpacked copy of the cells
+        (the rows are ints, not a byte buffer).
+        """
+        return memoryview(self.to_bytes()).cast("B", (self.rows, self.cols))
+
+    def set_cell(self, row: int, col: int, alive: bool = True) -> None:
+        """
+        Set the state of a single cell on the board.
+
+        :param row: Row index of the cell.
+        :param col: Column index of the cell.
+        :param alive: True to set the cell as alive, False as dead.
+        :raises IndexError: If (row, col) is outside the board boundaries.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(
+                f"Cell ({row}, {col}) is out of bounds for board {self.rows}x{self.cols}"
+            )
+
+        if alive:
+            self.bits[row] |= 1 << col
+        else:
+            self.bits[row] &= ~(1 << col)
+
+    def get_cell(self, row: int, col: int) -> int:
+        """
+        Return the value of a cell (0 outside the board).
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return 0
+
+        return (self.bits[row] >> col) & 1
+
+    def clear(self) -> None:
+        """
+        Reset the board by setting all cells to dead (0).
+        """
+        self.bits = [0] * self.rows
+
+
+@engine("bitboard")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> BitBoard:
+    """
+    Compute the next generation one whole row at a time.
+
+    For every row, the eight neighbor rows (the rows above and below,
+    shifted left/right, and the current row shifted left/right) are added
+    with full-adder logic into four bit planes (1s, 2s, 4s and 8s of the
+    neighbor count). The rule table then selects which counts give birth
+    or survival, so classic, HighLife and any other (state, neighbors)
+    rule from the registry are supported.
+
+    Bits shifted past column 0 or the last column are discarded, which
+    matches the "outside the board is dead" behavior of Board.get_cell.
+
+    :param board: Current board (any Board; plain boards are converted).
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats, filled in from the new and
+                  old row ints with bit_count (one popcount per row).
+    :return: New BitBoard representing the next generation.
+    """
+    if not isinstance(board, BitBoard):
+        board = BitBoard.from_board(board)
+
+    table = rule_table(rule)
+    born_counts = [n for n in range(9) if table[0][n]]
+    survive_counts = [n for n in range(9) if table[1][n]]
+
+    mask = board.mask
+    rows = board.rows
+    old = board.bits
+    new_bits = [0] * rows
+
+    above = 0
+    current = old[0]
+    for r in range(rows):
+        below = old[r + 1] if r + 1 < rows else 0
+
+        # Row above: west, centre, east neighbors -> 2-bit sum (s_a, c_a)
+        w = (above << 1) & mask
+        e = above >> 1
+        s_a = w ^ above ^ e
+        c_a = (w & above) | (e & (w ^ above))
+
+        # Row below: same as above -> (s_c, c_c)
+        w = (below << 1) & mask
+        e = below >> 1
+        s_c = w ^ below ^ e
+        c_c = (w & below) | (e & (w ^ below))
+
+        # Current row: only west and east neighbors -> (s_b, c_b)
+        w = (current << 1) & mask
+        e = current >> 1
+        s_b = w ^ e
+        c_b = w & e
+
+        # Add the three 1s bits
+        ones = s_a ^ s_b ^ s_c
+        k1 = (s_a & s_b) | (s_c & (s_a ^ s_b))
+
+        # Add the four 2s bits (c_a, c_b, c_c and the carry k1)
+        t = c_a ^ c_b ^ c_c
+        k2 = (c_a & c_b) | (c_c & (c_a ^ c_b))
+        twos = t ^ k1
+        k3 = t & k1
+
+        # Add the two 4s bits
+        fours = k2 ^ k3
+        eights = k2 & k3
+
+        born = _count_mask(born_counts, ones, twos, fours, eights, mask)
+        survive = _count_mask(survive_counts, ones, twos, fours, eights, mask)
+        new = (born & (mask ^ current)) | (survive & current)
+        new_bits[r] = new
+
+        if stats is not None and new | current:
+            stats.population += new.bit_count()
+            stats.births += (new & ~current).bit_count()
+            stats.deaths += (current & ~new).bit_count()
+            if new:
+                # Bit c is column c
+                first = (new & -new).bit_length() - 1
+                stats.include(r, first, r, new.bit_length() - 1)
+
+        above = current
+        current = below
+
+    new_board = BitBoard(rows, board.cols)
+    new_board.bits = new_bits
+    return new_board
+
+
+def _count_mask(
+    counts: List[int], ones: int, twos: int, fours: int, eights: int, mask: int
+) -> int:
+    """
+    Return a row mask of the cells whose neighbor count is in `counts`.
+
+    The count of each cell is spread over four bit planes
+    (count = ones + 2*twos + 4*fours + 8*eights).
+    """
+    result = 0
+    for n in counts:
+        if n == 8:
+            # 8 is the only count with the 8s bit set
+            result |= eights
+            continue
+
+        m = mask ^ eights
+        m &= ones if n & 1 else mask ^ ones
+        m &= twos if n & 2 else mask ^ twos
+        m &= fours if n & 4 else mask ^ fours
+        result |= m
+    return result
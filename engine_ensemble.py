@@ -0,0 +1,321 @@
+# engine_ensemble.py
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from board import Board
+from errors import InvalidGridSizeError
+from rules import get_ruleset, rule_table, RuleTable
+
+# End states of ensemble members, by code (see EnsembleResult.kind).
+# The names match cycles.CYCLE_KINDS.
+KINDS = ("running", "extinct", "still", "oscillator")
+RUNNING, EXTINCT, STILL, OSCILLATOR = range(len(KINDS))
+
+# Number of past generations compared with the current one, i.e. the
+# longest oscillator period that stops a member
+DEFAULT_MAX_PERIOD = 64
+
+# Seed of the random hash keys (fixed, so results are reproducible)
+_HASH_SEED = 0x5EED
+
+
+class EnsembleResult:
+    """
+    Outcome of Ensemble.run, one entry per member, as NumPy arrays:
+
+    - kind: end state code, index into KINDS (RUNNING if all steps ran).
+    - generation: generation at which the member stopped (or steps).
+    - period: oscillator period (1 for still lifes and extinction,
+      0 while running).
+    - initial_population / population: alive cells at generation 0 and
+      in the final state.
+    - cells: final states, shape (n, rows, cols).
+    - history: population per generation, shape (steps + 1, n), -1 after
+      a member stopped (only if the run recorded it, else None).
+    """
+
+    def __init__(
+        self,
+        kind: np.ndarray,
+        generation: np.ndarray,
+        period: np.ndarray,
+        initial_population: np.ndarray,
+        population: np.ndarray,
+        cells: np.ndarray,
+        history: Optional[np.ndarray] = None,
+    ) -> None:
+        self.kind = kind
+        self.generation = generation
+        self.period = period
+        self.initial_population = initial_population
+        self.population = population
+        self.cells = cells
+        self.history = history
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def board(self, index: int) -> Board:
+        """
+        Build a Board of one member's final state (only when needed).
+        """
+        _, rows, cols = self.cells.shape
+        return Board.from_bytes(rows, cols, self.cells[index].tobytes())
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return aggregate statistics over all members as a dict.
+        """
+        counts = np.bincount(self.kind, minlength=len(KINDS))
+        oscillators = self.period[self.kind == OSCILLATOR]
+        return {
+            "members": len(self),
+            **{name: int(count) for name, count in zip(KINDS, counts)},
+            "mean_final_population": float(self.population.mean()),
+            "max_final_population": int(self.population.max()),
+            "mean_generations": float(self.generation.mean()),
+            "periods": dict(zip(
+                *(a.tolist() for a in np.unique(oscillators, return_counts=True))
+            )),
+        }
+
+
+class Ensemble:
+    """
+    N independent boards of the same size, stacked into one
+    (n, rows, cols) uint8 array and stepped in one vectorized pass.
+
+    Members stop on their own: each generation every member is reduced
+    to a 64-bit hash (a weighted sum of its packed cells), which is
+    compared with the hashes of the last `max_period` generations. A
+    member that died out or repeats an earlier state is copied out and
+    removed from the working array, so later generations only step the
+    members still running.
+
+    No Board is built per member; the results are NumPy arrays
+    (see EnsembleResult).
+
+    Neighbors are counted with two separable 3-cell sums over the whole
+    stack, and the rule is applied as a few vectorized comparisons (one
+    per neighbor count that gives birth or survival) instead of a
+    per-element table lookup.
+    """
+
+    def __init__(self, cells: np.ndarray) -> None:
+        """
+        :param cells: Array of shape (n, rows, cols) with 0/1 values
+                      (copied as uint8).
+        :raises InvalidGridSizeError: If the array is not 3D or empty.
+        """
+        if cells.ndim != 3 or 0 in cells.shape:
+            raise InvalidGridSizeError(
+                f"Ensemble needs an (n, rows, cols) array, got shape {cells.shape}"
+            )
+        self.cells = np.array(cells, dtype=np.uint8)
+
+    @classmethod
+    def random(
+        cls, n: int, rows: int, cols: int, density: float, seed: Optional[int] = None
+    ) -> "Ensemble":
+        """
+        Create n random soups where each cell is alive with probability
+        `density`. The same seed always gives the same ensemble.
+        """
+        if n <= 0 or rows <= 0 or cols <= 0:
+            raise InvalidGridSizeError(
+                f"Ensemble size must be positive, got {n} x {rows}x{cols}"
+            )
+        rng = np.random.default_rng(seed)
+        return cls((rng.random((n, rows, cols)) < density).view(np.uint8))
+
+    @classmethod
+    def from_boards(cls, boards: Sequence[Board]) -> "Ensemble":
+        """
+        Stack same-sized boards (any Board variant) into an ensemble.
+
+        :raises InvalidGridSizeError: If the boards differ in size.
+        """
+        if not boards:
+            raise InvalidGridSizeError("Ensemble needs at least one board")
+        rows, cols = boards[0].rows, boards[0].cols
+        if any((b.rows, b.cols) != (rows, cols) for b in boards):
+            raise InvalidGridSizeError(
+                "All boards of an ensemble must have the same size"
+            )
+        data = b"".join(b.to_bytes() for b in boards)
+        cells = np.frombuffer(data, dtype=np.uint8)
+        return cls(cells.reshape(len(boards), rows, cols))
+
+    def __len__(self) -> int:
+        return self.cells.shape[0]
+
+    def run(
+        self,
+        ruleset_name: str,
+        steps: int,
+        stop: bool = True,
+        max_period: int = DEFAULT_MAX_PERIOD,
+        record_history: bool = False,
+    ) -> EnsembleResult:
+        """
+        Step every member up to `steps` generations.
+
+        :param ruleset_name: Name of the ruleset or a rulestring
+                             (3x3 rules; Larger than Life range rules
+                             are not supported here).
+        :param steps: Number of generations (must be >= 0).
+        :param stop: Stop members that die out or repeat a state within
+                     the last `max_period` generations.
+        :param max_period: Longest period that is detected.
+        :param record_history: Keep the population of every member for
+                               every generation (EnsembleResult.history).
+        :return: EnsembleResult; self.cells is left unchanged.
+        :raises ValueError: If steps is negative or max_period is not
+                            positive.
+        :raises RuleSetError: If the ruleset is unknown or a range rule.
+        """
+        if steps < 0:
+            raise ValueError(f"Number of steps must be non-negative, got {steps}")
+        if max_period <= 0:
+            raise ValueError(f"max_period must be positive, got {max_period}")
+
+        table = rule_table(get_ruleset(ruleset_name))
+        n, rows, cols = self.cells.shape
+
+        kind = np.zeros(n, dtype=np.uint8)
+        generation = np.full(n, steps, dtype=np.int64)
+        period = np.zeros(n, dtype=np.int64)
+        final = np.empty_like(self.cells)
+        history = None
+        if record_history:
+            history = np.full((steps + 1, n), -1, dtype=np.int32)
+
+        work = self.cells.copy()
+        ids = np.arange(n)
+        population = work.sum(axis=(1, 2), dtype=np.int64)
+        initial_population = population.copy()
+        final_population = population.copy()
+        keys = _hash_keys(rows, cols)
+
+        # Ring of the hashes of the last max_period generations
+        seen = np.zeros((n, max_period), dtype=np.uint64)
+        seen_generation = np.full(max_period, -1, dtype=np.int64)
+
+        for gen in range(steps + 1):
+            if gen > 0:
+                work = _apply_rule(table, work, _neighbor_counts(work))
+                population = work.sum(axis=(1, 2), dtype=np.int64)
+            if history is not None:
+                history[gen, ids] = population
+            if not stop:
+                continue
+
+            h = _hash(work, keys) + population.astype(np.uint64)
+            matches = (seen == h[:, None]) & (seen_generation >= 0)
+            extinct = population == 0
+            repeated = matches.any(axis=1) & ~extinct
+            done = extinct | repeated
+
+            if done.any():
+                # Most recent matching generation -> shortest period
+                last = np.where(matches, seen_generation, -1).max(axis=1)
+                done_ids = ids[done]
+                kind[done_ids] = np.where(
+                    extinct[done], EXTINCT,
+                    np.where(gen - last[done] == 1, STILL, OSCILLATOR),
+                )
+                period[done_ids] = np.where(extinct[done], 1, gen - last[done])
+                generation[done_ids] = gen
+                final[done_ids] = work[done]
+                final_population[done_ids] = population[done]
+
+                keep = ~done
+                work, ids, h, seen = work[keep], ids[keep], h[keep], seen[keep]
+                if not len(ids):
+                    break
+
+            column = gen % max_period
+            seen[:, column] = h
+            seen_generation[column] = gen
+
+        # Members still running at the end
+        final[ids] = work
+        final_population[ids] = work.sum(axis=(1, 2), dtype=np.int64)
+        return EnsembleResult(
+            kind, generation, period, initial_population, final_population,
+            final, history,
+        )
+
+
+def _neighbor_counts(cells: np.ndarray) -> np.ndarray:
+    """
+    Alive neighbors of every cell of every member, dead outside the
+    boards: a vertical then a horizontal 3-cell sum, minus the cell.
+    """
+    padded = np.pad(cells, ((0, 0), (1, 1), (1, 1)))
+    vertical = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    return (
+        vertical[:, :, :-2] + vertical[:, :, 1:-1] + vertical[:, :, 2:] - cells
+    )
+
+
+def _apply_rule(table: RuleTable, cells: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Next states from the (state, neighbors) table: a cell is alive if its
+    count gives birth (dead cells), survival (alive cells) or both.
+    """
+    alive = cells.view(bool)
+    dead = ~alive
+    new = np.zeros(cells.shape, dtype=bool)
+    for neighbors in range(9):
+        birth, survival = table[0][neighbors], table[1][neighbors]
+        if not (birth or survival):
+            continue
+        hit = counts == neighbors
+        if not (birth and survival):
+            hit &= alive if survival else dead
+        new |= hit
+    return new.view(np.uint8)
+
+
+def _hash_keys(rows: int, cols: int) -> np.ndarray:
+    """
+    Random odd 64-bit weights, one per 64-bit word of a packed board.
+    """
+    words = -(-rows * ((cols + 7) // 8) // 8)
+    rng = np.random.default_rng(_HASH_SEED)
+    return rng.integers(0, 2**64, size=words, dtype=np.uint64) | np.uint64(1)
+
+
+def _hash(cells: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    64-bit hash of each member: its cells packed into 64-bit words,
+    multiplied by the keys and summed (arithmetic wraps modulo 2^64).
+    """
+    packed = np.packbits(cells, axis=-1).reshape(len(cells), -1)
+    padding = len(keys) * 8 - packed.shape[1]
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    words = packed.view(np.uint64)
+    return (words * keys).sum(axis=1, dtype=np.uint64)
+
+
+def run_ensemble(
+    ruleset_name: str,
+    n: int,
+    rows: int,
+    cols: int,
+    density: float,
+    steps: int,
+    seed: Optional[int] = None,
+    **kwargs: Any,
+) -> EnsembleResult:
+    """
+    Convenience wrapper: run n random soups of the given size and density.
+    Extra keyword arguments are passed to Ensemble.run.
+    """
+    return Ensemble.random(n, rows, cols, density, seed).run(
+        ruleset_name, steps, **kwargs
+    )
@@ -0,0 +1,235 @@
+# engine_ltl.py
+
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from board import Board
+from engine import engine
+from metrics import GenerationStats
+from rules import LargerThanLifeRule, RuleFunc
+
+try:
+    # Vectorized summed-area tables if NumPy is installed
+    import numpy as np
+    from engine_numpy import ArrayBoard
+except ImportError:
+    np = None
+
+# Flat indices into the rotated summed-area table used for von Neumann
+# neighborhoods (cell positions and the four rectangle corners of every
+# cell), cached per (rows, cols, radius)
+_ROTATIONS: Dict[Tuple[int, int, int], Tuple[int, Any, Tuple[Any, ...]]] = {}
+
+
+def _shape(rule: RuleFunc) -> Tuple[int, str, int]:
+    """
+    Return (radius, neighborhood, number of neighbors) of any rule; rules
+    that are not LargerThanLifeRule use the range-1 Moore neighborhood.
+    """
+    if isinstance(rule, LargerThanLifeRule):
+        return rule.radius, rule.neighborhood, rule.size
+    return 1, "M", 8
+
+
+def _transition_table(rule: RuleFunc, size: int) -> List[bytes]:
+    """
+    Evaluate the rule for every (state, neighbor count) pair:
+    table[is_alive][neighbors] for neighbors in 0..size.
+    """
+    return [bytes(rule(state, n) for n in range(size + 1)) for state in (0, 1)]
+
+
+def moore_counts(grid, radius: int):
+    """
+    Count the alive cells in the (2r+1) x (2r+1) square around every cell
+    (the cell itself included) with one summed-area table.
+
+    The grid is padded with `radius` dead cells on every side and
+    S[i, j] holds the sum of all cells above and left of (i, j), so each
+    square sum is S[bottom, right] - S[top, right] - S[bottom, left]
+    + S[top, left]: four lookups per cell whatever the radius.
+
+    :param grid: 2D uint8 NumPy array of 0/1 cell states.
+    :return: 2D int32 array of counts, same shape as grid.
+    """
+    rows, cols = grid.shape
+    width = 2 * radius + 1
+    sat = np.zeros((rows + width, cols + width), dtype=np.int32)
+    padded = sat[1:, 1:]
+    padded[radius:radius + rows, radius:radius + cols] = grid
+    np.cumsum(padded, axis=0, out=padded)
+    np.cumsum(padded, axis=1, out=padded)
+    return (
+        sat[width:, width:] - sat[:-width, width:]
+        - sat[width:, :-width] + sat[:-width, :-width]
+    )
+
+
+def von_neumann_counts(grid, radius: int):
+    """
+    Count the alive cells in the diamond |dr| + |dc| <= r around every cell
+    (the cell itself included) with a rotated summed-area table.
+
+    Cell (i, j) is moved to (u, v) = (i + j, i - j + cols - 1). In these
+    coordinates the diamond is the square |du| <= r, |dv| <= r, so the
+    same four-lookup rectangle sum as moore_counts applies. The rotated
+    grid has (rows + cols - 1)^2 positions; the ones that are not a cell
+    stay 0.
+
+    :param grid: 2D uint8 NumPy array of 0/1 cell states.
+    :return: 2D int32 array of counts, same shape as grid.
+    """
+    rows, cols = grid.shape
+    key = (rows, cols, radius)
+    if key not in _ROTATIONS:
+        _ROTATIONS[key] = _rotation(rows, cols, radius)
+    width, cells, (br, tr, bl, tl) = _ROTATIONS[key]
+
+    sat = np.zeros((width, width), dtype=np.int32)
+    flat = sat.reshape(-1)
+    flat[cells] = grid.reshape(-1)
+    np.cumsum(sat, axis=0, out=sat)
+    np.cumsum(sat, axis=1, out=sat)
+    counts = flat.take(br) - flat.take(tr) - flat.take(bl) + flat.take(tl)
+    return counts.reshape(rows, cols)
+
+
+def _rotation(rows: int, cols: int, radius: int) -> Tuple[int, Any, Tuple[Any, ...]]:
+    """
+    Precompute the flat indices used by von_neumann_counts: the width of
+    the rotated table, where each cell goes and the four corners of its
+    rectangle (bottom-right, top-right, bottom-left, top-left).
+    """
+    i, j = np.indices((rows, cols)).reshape(2, -1)
+    # Row 0 / column 0 of the table are zeros, then `radius` of padding
+    # so the rectangles of cells near the edges stay inside the table
+    u = i + j + radius + 1
+    v = i - j + cols - 1 + radius + 1
+    width = rows + cols - 1 + 2 * radius + 1
+    top, bottom = u - radius - 1, u + radius
+    left, right = v - radius - 1, v + radius
+    corners = (
+        bottom * width + right, top * width + right,
+        bottom * width + left, top * width + left,
+    )
+    return width, u * width + v, corners
+
+
+def _sat_rows(grid: List[List[int]], pad_rows: int, pad_cols: int) -> List[List[int]]:
+    """
+    Pure-Python summed-area table of a list grid surrounded by dead
+    cells: row 0 and column 0 are zeros, then pad_rows / pad_cols of
+    padding on each side.
+    """
+    cols = len(grid[0]) if grid else 0
+    width = cols + 2 * pad_cols + 1
+    empty = [0] * width
+    sat = [empty]
+    previous = empty
+    pad = [0] * pad_cols
+    for r in range(len(grid) + 2 * pad_rows):
+        source = r - pad_rows
+        if 0 <= source < len(grid):
+            row_sums = list(accumulate([0] + pad + list(grid[source]) + pad))
+        else:
+            row_sums = empty
+        previous = [a + b for a, b in zip(previous, row_sums)]
+        sat.append(previous)
+    return sat
+
+
+def _counts_python(board: Board, radius: int, neighborhood: str) -> List[List[int]]:
+    """
+    Same as moore_counts / von_neumann_counts on a list-of-lists board.
+    """
+    rows, cols = board.rows, board.cols
+    width = 2 * radius + 1
+    if neighborhood == "M":
+        sat = _sat_rows(board.grid, radius, radius)
+        counts = []
+        for r in range(rows):
+            top, bottom = sat[r], sat[r + width]
+            counts.append([
+                bottom[c + width] - top[c + width] - bottom[c] + top[c]
+                for c in range(cols)
+            ])
+        return counts
+
+    diagonal = rows + cols - 1
+    rotated = [[0] * diagonal for _ in range(diagonal)]
+    for i, row in enumerate(board.grid):
+        for j, cell in enumerate(row):
+            if cell:
+                rotated[i + j][i - j + cols - 1] = 1
+    sat = _sat_rows(rotated, radius, radius)
+    counts = []
+    for i in range(rows):
+        out = []
+        for j in range(cols):
+            u = i + j + radius
+            v = i - j + cols - 1 + radius
+            top, bottom = sat[u - radius], sat[u + radius + 1]
+            out.append(
+                bottom[v + radius + 1] - top[v + radius + 1]
+                - bottom[v - radius] + top[v - radius]
+            )
+        counts.append(out)
+    return counts
+
+
+@engine("ltl")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> Board:
+    """
+    Compute the next generation of any rule, including Larger than Life
+    rules with a range-r Moore or von Neumann neighborhood.
+
+    Neighbor counts come from a summed-area table (rotated by 45 degrees
+    for von Neumann neighborhoods), so the cost per cell is the same for
+    every radius. With NumPy the tables are built with cumsum and the
+    result is an ArrayBoard; without it, with Python lists.
+
+    :param board: Current board (any Board).
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats to fill in while stepping.
+    :return: New board representing the next generation.
+    """
+    radius, neighborhood, size = _shape(rule)
+    table = _transition_table(rule, size)
+
+    if np is not None:
+        if not isinstance(board, ArrayBoard):
+            board = ArrayBoard.from_board(board)
+        grid = board.grid
+        if neighborhood == "M":
+            counts = moore_counts(grid, radius)
+        else:
+            counts = von_neumann_counts(grid, radius)
+        # Counts include the cell itself: neighbors = counts - grid
+        lut = np.frombuffer(table[0] + table[1], dtype=np.uint8).reshape(2, size + 1)
+        new_board = ArrayBoard(board.rows, board.cols)
+        new_board.grid = lut[grid, counts - grid]
+
+        if stats is not None:
+            old, new = grid, new_board.grid
+            stats.population = int(np.count_nonzero(new))
+            stats.births = int(np.count_nonzero(new > old))
+            stats.deaths = int(np.count_nonzero(old > new))
+            if stats.population:
+                rows = np.flatnonzero(new.any(axis=1))
+                cols = np.flatnonzero(new.any(axis=0))
+                stats.bbox = (int(rows[0]), int(cols[0]), int(rows[-1]), int(cols[-1]))
+        return new_board
+
+    counts = _counts_python(board, radius, neighborhood)
+    dead, alive = table
+    new_board = Board(board.rows, board.cols)
+    for r, (row, count_row) in enumerate(zip(board.grid, counts)):
+        new_row = [
+            alive[n - 1] if cell else dead[n] for cell, n in zip(row, count_row)
+        ]
+        new_board.grid[r] = new_row
+        if stats is not None:
+            stats.record_row(r, row, new_row)
+    return new_board
@@ -0,0 +1,165 @@
+# engine_numpy.py
+
+from typing import Optional
+
+import numpy as np
+
+from board import Board
+from engine import engine
+from errors import InvalidGridSizeError
+from metrics import GenerationStats
+from rules import RuleFunc, rule_table
+
+
+class ArrayBoard(Board):
+    """
+    Board variant backed by a 2D NumPy uint8 array instead of a list of lists.
+
+    The array is stored in `grid`, so code that indexes the board as
+    board.grid[row][col] or iterates over its rows (print, save_to_file,
+    the Pygame UI) keeps working unchanged.
+    """
+
+    __slots__ = ("grid",)
+
+    def __init__(self, rows: int, cols: int) -> None:
+        """
+        Initialize a new empty array-backed board.
+
+        :param rows: Number of rows in the grid (must be > 0).
+        :param cols: Number of columns in the grid (must be > 0).
+        :raises InvalidGridSizeError: If rows or cols are not positive.
+        """
+        if rows <= 0 or cols <= 0:
+            raise InvalidGridSizeError(
+                f"Rows and columns must be positive integers, got {rows}x{cols}"
+            )
+
+        self.rows = rows
+        self.cols = cols
+        self.grid = np.zeros((rows, cols), dtype=np.uint8)
+
+    @classmethod
+    def from_board(cls, board: Board) -> "ArrayBoard":
+        """
+        Create an array-backed copy of any board.
+
+        :param board: Source board.
+        :return: New ArrayBoard with the same cells.
+        """
+        new_board = cls(board.rows, board.cols)
+        new_board.grid[:, :] = board.view()
+        return new_board
+
+    def to_board(self) -> Board:
+        """
+        Convert back to a plain bytearray-backed Board.
+        """
+        return Board.from_bytes(self.rows, self.cols, self.grid.tobytes())
+
+    def view(self) -> memoryview:
+        """
+        Return a writable 2D memoryview of the array (no copy).
+        """
+        if not self.grid.flags.c_contiguous:
+            self.grid = np.ascontiguousarray(self.grid)
+        return memoryview(self.grid)
+
+    def set_cell(self, row: int, col: int, alive: bool = True) -> None:
+        """
+        Set the state of a single cell on the board.
+
+        :raises IndexError: If (row, col) is outside the board boundaries.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(
+                f"Cell ({row}, {col}) is out of bounds for board {self.rows}x{self.cols}"
+            )
+
+        self.grid[row, col] = 1 if alive else 0
+
+    def get_cell(self, row: int, col: int) -> int:
+        """
+        Return the value of a cell (0 outside the board), as a Python int.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return 0
+
+        return int(self.grid[row, col])
+
+    def clear(self) -> None:
+        """
+        Reset the board by setting all cells to dead (0).
+        """
+        self.grid.fill(0)
+
+    def to_bytes(self) -> bytes:
+        """
+        Return all cells in row-major order, one byte (0 or 1) per cell.
+        """
+        return self.grid.tobytes()
+
+
+def neighbor_counts(grid: np.ndarray) -> np.ndarray:
+    """
+    Count alive neighbors for every cell at once.
+
+    The grid is padded with a one-cell border of dead cells (the same
+    out-of-board behavior as Board.get_cell), and the eight shifted
+    views of the padded array are summed.
+
+    :param grid: 2D uint8 array of 0/1 cell states.
+    :return: 2D uint8 array with the number of alive neighbors (0–8).
+    """
+    rows, cols = grid.shape
+    padded = np.pad(grid, 1)
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            # Skip the cell itself
+            if dr == 1 and dc == 1:
+                continue
+
+            counts += padded[dr:dr + rows, dc:dc + cols]
+
+    return counts
+
+
+@engine("numpy")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> ArrayBoard:
+    """
+    Compute the next generation with vectorized NumPy operations.
+
+    The rule is evaluated once for all 18 (state, neighbors) combinations
+    and applied to the whole board as a table lookup, so any rule from
+    the RULESETS registry gives the same result as engine.next_generation.
+
+    :param board: Current board (any Board; plain boards are converted).
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats, filled in with vectorized
+                  counts on the old and new arrays.
+    :return: New ArrayBoard representing the next generation.
+    """
+    if not isinstance(board, ArrayBoard):
+        board = ArrayBoard.from_board(board)
+
+    table = np.array(rule_table(rule), dtype=np.uint8)
+    counts = neighbor_counts(board.grid)
+
+    new_board = ArrayBoard(board.rows, board.cols)
+    new_board.grid = table[board.grid, counts]
+
+    if stats is not None:
+        old, new = board.grid, new_board.grid
+        stats.population = int(np.count_nonzero(new))
+        stats.births = int(np.count_nonzero(new > old))
+        stats.deaths = int(np.count_nonzero(old > new))
+        if stats.population:
+            rows = np.flatnonzero(new.any(axis=1))
+            cols = np.flatnonzero(new.any(axis=0))
+            stats.bbox = (int(rows[0]), int(cols[0]), int(rows[-1]), int(cols[-1]))
+
+    return new_board
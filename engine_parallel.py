@@ -0,0 +1,199 @@
+# engine_parallel.py
+
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Tuple
+
+from board import Board
+from engine import step_row
+from errors import EngineError
+from rules import get_ruleset, neighborhood_table, rule_table, RuleFunc, RuleTable
+
+try:
+    # Vectorized band kernel if NumPy is installed
+    import numpy as np
+    from engine_numpy import neighbor_counts
+except ImportError:
+    np = None
+
+# Per-worker state, filled in by _init_worker:
+# (shared memory blocks, rows, cols, rule table, neighborhood table)
+_WORKER: Optional[Tuple[List[SharedMemory], int, int, RuleTable, bytes]] = None
+
+
+def _init_worker(
+    names: List[str], rows: int, cols: int, table: RuleTable, neighborhood: bytes
+) -> None:
+    """
+    Pool initializer: attach to both grid buffers once per worker.
+    """
+    global _WORKER
+    # Pool workers share the parent's resource tracker, so attaching here
+    # does not take ownership: the parent still unlinks the blocks.
+    blocks = [SharedMemory(name=name) for name in names]
+    _WORKER = (blocks, rows, cols, table, neighborhood)
+
+
+def _step_band(task: Tuple[int, int, int]) -> None:
+    """
+    Compute rows r0..r1-1 of the next generation.
+
+    Reads the band plus one halo row above and below from the source
+    buffer and writes only its own rows into the other buffer, so bands
+    never write to the same memory. Rows outside the board are dead.
+
+    :param task: (index of the source buffer, first row, end row).
+    """
+    assert _WORKER is not None, "worker was not initialized"
+    blocks, rows, cols, table, neighborhood = _WORKER
+    src_index, r0, r1 = task
+    src = blocks[src_index].buf
+    dst = blocks[1 - src_index].buf
+
+    if np is not None:
+        grid = np.ndarray((rows, cols), dtype=np.uint8, buffer=src)
+        out = np.ndarray((rows, cols), dtype=np.uint8, buffer=dst)
+        lut = np.array(table, dtype=np.uint8)
+
+        # Band with halo rows; neighbor_counts pads the outside with dead cells
+        h0 = max(r0 - 1, 0)
+        h1 = min(r1 + 1, rows)
+        counts = neighbor_counts(grid[h0:h1])[r0 - h0:r1 - h0]
+        out[r0:r1] = lut[grid[r0:r1], counts]
+        return
+
+    zeros = bytes(cols)
+    for r in range(r0, r1):
+        up = src[(r - 1) * cols:r * cols] if r > 0 else zeros
+        row = src[r * cols:(r + 1) * cols]
+        down = src[(r + 1) * cols:(r + 2) * cols] if r + 1 < rows else zeros
+        new_row = bytearray(cols)
+        step_row(up, row, down, neighborhood, new_row)
+        dst[r * cols:(r + 1) * cols] = new_row
+
+
+class ParallelEngine:
+    """
+    Multi-process engine that steps horizontal bands of the board in parallel.
+
+    The grid lives in two shared memory buffers (one byte per cell) that
+    are swapped every generation. Each worker reads its band plus one halo
+    row on each side from the current buffer and writes its band into the
+    other one; the pool map acts as the barrier between generations. Only
+    (buffer, first row, end row) tuples are sent to the workers, the grid
+    itself is never pickled.
+
+    Results are identical to engine.next_generation, including the
+    "outside the board is dead" edge behavior.
+
+    Use as a context manager (or call close()) to stop the workers and
+    free the shared memory.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        rule: RuleFunc,
+        workers: Optional[int] = None,
+        bands: Optional[int] = None,
+    ) -> None:
+        """
+        Copy the board into shared memory and start the worker pool.
+
+        :param board: Initial board state.
+        :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+        :param workers: Number of worker processes (default: CPU count).
+        :param bands: Number of horizontal bands (default: one per worker).
+        :raises EngineError: If workers or bands is not positive.
+        """
+        workers = workers or os.cpu_count() or 1
+        bands = bands or workers
+        if workers <= 0 or bands <= 0:
+            raise EngineError(
+                f"Workers and bands must be positive, got {workers} and {bands}"
+            )
+
+        self.rows = board.rows
+        self.cols = board.cols
+        self.generation = 0
+        size = self.rows * self.cols
+
+        self._blocks = [SharedMemory(create=True, size=size) for _ in range(2)]
+        self._current = 0
+        self._blocks[0].buf[:size] = board.to_bytes()
+
+        bands = min(bands, self.rows)
+        bounds = [self.rows * i // bands for i in range(bands + 1)]
+        self._bands = list(zip(bounds[:-1], bounds[1:]))
+
+        self._pool: Any = Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(
+                [block.name for block in self._blocks],
+                self.rows,
+                self.cols,
+                rule_table(rule),
+                neighborhood_table(rule),
+            ),
+        )
+
+    def step(self, generations: int = 1) -> None:
+        """
+        Advance the board by the given number of generations.
+        """
+        for _ in range(generations):
+            src = self._current
+            self._pool.map(_step_band, [(src, r0, r1) for r0, r1 in self._bands])
+            self._current = 1 - src
+            self.generation += 1
+
+    def to_board(self) -> Board:
+        """
+        Return a copy of the current generation as a plain Board.
+        """
+        buf = self._blocks[self._current].buf
+        return Board.from_bytes(self.rows, self.cols, buf[:self.rows * self.cols])
+
+    def close(self) -> None:
+        """
+        Stop the worker pool and release the shared memory.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "ParallelEngine":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def run_parallel(
+    board: Board,
+    ruleset_name: str,
+    steps: int,
+    workers: Optional[int] = None,
+) -> Board:
+    """
+    Run the simulation for a given number of steps on a worker pool.
+
+    :param board: Initial board state.
+    :param ruleset_name: Name of the ruleset (e.g. "classic", "highlife").
+    :param steps: Number of generations to simulate (must be >= 0).
+    :param workers: Number of worker processes (default: CPU count).
+    :return: Board instance representing the final state after all steps.
+    """
+    rule = get_ruleset(ruleset_name)
+
+    with ParallelEngine(board, rule, workers=workers) as parallel:
+        parallel.step(steps)
+        return parallel.to_board()
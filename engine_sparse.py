@@ -0,0 +1,234 @@
+# engine_sparse.py
+
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+from board import Board
+from engine import engine
+from errors import InvalidGridSizeError, RuleSetError
+from metrics import GenerationStats
+from rules import RuleFunc, rule_table
+
+# Offsets of the 8 neighbors (the cell itself is not included)
+NEIGHBOR_OFFSETS: Tuple[Tuple[int, int], ...] = tuple(
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)
+)
+
+
+class SparseBoard(Board):
+    """
+    Board variant that stores only the coordinates of alive cells.
+
+    Memory and stepping cost depend on the number of alive cells, not on
+    rows * cols. Two edge modes are supported:
+
+    - bounded=True (default): the same semantics as Board. Cells outside
+      0..rows-1 / 0..cols-1 are always dead.
+    - bounded=False: an infinite plane. rows and cols only describe the
+      window that is shown by grid, print() and save_to_file(); cells may
+      live (and be set) at any coordinates, including negative ones.
+
+    `grid` is rebuilt from the alive cells on every access, so use
+    get_cell and set_cell for single cells.
+    """
+
+    __slots__ = ("bounded", "live")
+
+    def __init__(self, rows: int, cols: int, bounded: bool = True) -> None:
+        """
+        Initialize a new empty sparse board.
+
+        :param rows: Number of rows in the grid / window (must be > 0).
+        :param cols: Number of columns in the grid / window (must be > 0).
+        :param bounded: False for an infinite plane (see class docstring).
+        :raises InvalidGridSizeError: If rows or cols are not positive.
+        """
+        if rows <= 0 or cols <= 0:
+            raise InvalidGridSizeError(
+                f"Rows and columns must be positive integers, got {rows}x{cols}"
+            )
+
+        self.rows = rows
+        self.cols = cols
+        self.bounded = bounded
+        self.live: Set[Tuple[int, int]] = set()
+
+    @classmethod
+    def from_board(cls, board: Board, bounded: bool = True) -> "SparseBoard":
+        """
+        Create a sparse copy of any board.
+
+        :param board: Source board.
+        :param bounded: Edge mode of the new board (see class docstring).
+        :return: New SparseBoard with the same alive cells.
+        """
+        new_board = cls(board.rows, board.cols, bounded=bounded)
+        if isinstance(board, SparseBoard):
+            new_board.live = set(board.live)
+            if bounded:
+                new_board.live = {
+                    cell for cell in new_board.live if new_board._inside(*cell)
+                }
+            return new_board
+
+        new_board.live = {
+            (r, c)
+            for r, row in enumerate(board.grid)
+            for c, cell in enumerate(row)
+            if cell
+        }
+        return new_board
+
+    def to_board(self) -> Board:
+        """
+        Convert the board (or the window, for an infinite plane) back to
+        a plain bytearray-backed Board.
+        """
+        return Board.from_bytes(self.rows, self.cols, self.to_bytes())
+
+    @property
+    def grid(self) -> List[List[int]]:
+        """
+        Dense copy of the board / window as a 2D list (0 = dead, 1 = alive).
+        """
+        grid = [[0] * self.cols for _ in range(self.rows)]
+        for r, c in self.live:
+            if self._inside(r, c):
+                grid[r][c] = 1
+        return grid
+
+    def to_bytes(self) -> bytes:
+        """
+        Return the cells of the board / window in row-major order, one
+        byte (0 or 1) per cell.
+        """
+        cells = bytearray(self.rows * self.cols)
+        cols = self.cols
+        for r, c in self.live:
+            if self._inside(r, c):
+                cells[r * cols + c] = 1
+        return bytes(cells)
+
+    def view(self) -> memoryview:
+        """
+        Return a read-only 2D memoryview of a dense copy of the board /
+        window (the alive cells are a set, not a byte buffer).
+        """
+        return memoryview(self.to_bytes()).cast("B", (self.rows, self.cols))
+
+    @property
+    def population(self) -> int:
+        """
+        Number of alive cells (on the whole plane, not only the window).
+        """
+        return len(self.live)
+
+    def _inside(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def set_cell(self, row: int, col: int, alive: bool = True) -> None:
+        """
+        Set the state of a single cell on the board.
+
+        :param row: Row index of the cell.
+        :param col: Column index of the cell.
+        :param alive: True to set the cell as alive, False as dead.
+        :raises IndexError: If the board is bounded and (row, col) is
+                            outside the board boundaries.
+        """
+        if self.bounded and not self._inside(row, col):
+            raise IndexError(
+                f"Cell ({row}, {col}) is out of bounds for board {self.rows}x{self.cols}"
+            )
+
+        if alive:
+            self.live.add((row, col))
+        else:
+            self.live.discard((row, col))
+
+    def get_cell(self, row: int, col: int) -> int:
+        """
+        Return the value of a cell.
+
+        On a bounded board, cells outside the board return 0.
+        """
+        return 1 if (row, col) in self.live else 0
+
+    def clear(self) -> None:
+        """
+        Reset the board by removing all alive cells.
+        """
+        self.live.clear()
+
+
+def _neighbor_counts(live: Iterable[Tuple[int, int]]) -> Counter:
+    """
+    Count alive neighbors for every cell that has at least one.
+
+    Each alive cell adds 1 to its 8 neighbors, so the work is
+    8 * population and dead cells far away from the pattern are never
+    visited.
+    """
+    return Counter(
+        (r + dr, c + dc) for r, c in live for dr, dc in NEIGHBOR_OFFSETS
+    )
+
+
+@engine("sparse")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> SparseBoard:
+    """
+    Compute the next generation from the alive cells only.
+
+    Plain boards are converted to a bounded SparseBoard, so the result is
+    identical to engine.next_generation.
+
+    :param board: Current board (any Board; plain boards are converted).
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats, filled in with set operations
+                  on the old and new alive cells.
+    :return: New SparseBoard representing the next generation.
+    :raises RuleSetError: If the rule gives birth with 0 neighbors (B0),
+                          which would fill the whole (possibly infinite)
+                          empty space.
+    """
+    if not isinstance(board, SparseBoard):
+        board = SparseBoard.from_board(board)
+
+    table = rule_table(rule)
+    if table[0][0]:
+        raise RuleSetError(
+            "Rules with birth on 0 neighbors (B0) are not supported by the sparse engine"
+        )
+    born, survive = table
+
+    live = board.live
+    counts = _neighbor_counts(live)
+
+    new_live = {
+        cell
+        for cell, n in counts.items()
+        if (survive[n] if cell in live else born[n])
+    }
+    if survive[0]:
+        # Isolated alive cells do not appear in counts
+        new_live.update(cell for cell in live if cell not in counts)
+
+    if board.bounded:
+        rows, cols = board.rows, board.cols
+        new_live = {
+            (r, c) for r, c in new_live if 0 <= r < rows and 0 <= c < cols
+        }
+
+    if stats is not None:
+        stats.population = len(new_live)
+        stats.births = len(new_live - live)
+        stats.deaths = len(live - new_live)
+        if new_live:
+            cols = [c for _, c in new_live]
+            stats.bbox = (min(new_live)[0], min(cols), max(new_live)[0], max(cols))
+
+    new_board = SparseBoard(board.rows, board.cols, bounded=board.bounded)
+    new_board.live = new_live
+    return new_board
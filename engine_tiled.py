@@ -0,0 +1,284 @@
+# engine_tiled.py
+
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+from board import Board
+from engine import engine
+from metrics import BBox, GenerationStats
+from rules import RuleFunc, neighborhood_table
+
+# Default tile size (in cells) used when a plain Board is converted
+TILE_SIZE = 16
+
+# Number of generations kept in active_history (older entries are dropped,
+# so long runs use constant memory)
+ACTIVE_HISTORY_SIZE = 1024
+
+Tile = Tuple[int, int]
+
+
+class TiledBoard(Board):
+    """
+    Board variant that remembers which tiles may change in the next step.
+
+    The grid is split into square tiles of `tile_size` cells. A cell can
+    only change if something in its 3x3 neighborhood changed in the
+    previous generation, so only tiles that changed (and the tiles around
+    them) need to be recomputed. Everything else is copied as-is.
+
+    Use set_cell / clear / copy_from to modify the board: they mark the
+    affected tiles as active. Writing to `grid` directly is not tracked.
+
+    Each tile also keeps its population and bounding box (None = not known,
+    e.g. after set_cell), so the engine can report statistics by summing
+    the tiles instead of scanning every row.
+    """
+
+    __slots__ = (
+        "tile_size",
+        "tile_rows",
+        "tile_cols",
+        "active",
+        "active_history",
+        "tile_population",
+        "tile_bbox",
+    )
+
+    def __init__(self, rows: int, cols: int, tile_size: int = TILE_SIZE) -> None:
+        """
+        Initialize a new empty tiled board.
+
+        :param rows: Number of rows in the grid (must be > 0).
+        :param cols: Number of columns in the grid (must be > 0).
+        :param tile_size: Width and height of one tile in cells (must be > 0).
+        :raises InvalidGridSizeError: If rows or cols are not positive.
+        :raises ValueError: If tile_size is not positive.
+        """
+        super().__init__(rows, cols)
+
+        if tile_size <= 0:
+            raise ValueError(f"Tile size must be a positive integer, got {tile_size}")
+
+        self.tile_size = tile_size
+        self.tile_rows = (rows + tile_size - 1) // tile_size
+        self.tile_cols = (cols + tile_size - 1) // tile_size
+        # Tiles to recompute in the next step (None = all of them)
+        self.active: Optional[Set[Tile]] = None
+        # Number of tiles recomputed per generation, one entry per step
+        # (the last ACTIVE_HISTORY_SIZE steps). Shared by all boards
+        # produced from this one.
+        self.active_history: Deque[int] = deque(maxlen=ACTIVE_HISTORY_SIZE)
+        # Population and bounding box of every tile (index tr * tile_cols + tc);
+        # a new board is empty, so every tile is known
+        tiles = self.tile_rows * self.tile_cols
+        self.tile_population: List[Optional[int]] = [0] * tiles
+        self.tile_bbox: List[BBox] = [None] * tiles
+
+    @classmethod
+    def from_board(cls, board: Board, tile_size: int = TILE_SIZE) -> "TiledBoard":
+        """
+        Create a tiled copy of any board. All tiles start active.
+
+        :param board: Source board.
+        :param tile_size: Width and height of one tile in cells.
+        :return: New TiledBoard with the same cells.
+        """
+        new_board = cls(board.rows, board.cols, tile_size=tile_size)
+        new_board.copy_from(board)
+        return new_board
+
+    @property
+    def active_count(self) -> int:
+        """
+        Number of tiles recomputed to produce this generation
+        (all tiles for a board that was not produced by a step).
+        """
+        if self.active_history:
+            return self.active_history[-1]
+        return self.tile_rows * self.tile_cols
+
+    def _mark(self, row: int, col: int) -> None:
+        """
+        Mark the tile of a changed cell and its neighboring tiles as active.
+        """
+        tr, tc = row // self.tile_size, col // self.tile_size
+        self.tile_population[tr * self.tile_cols + tc] = None
+        if self.active is not None:
+            self.active.update(_around(tr, tc, self.tile_rows, self.tile_cols))
+
+    def set_cell(self, row: int, col: int, alive: bool = True) -> None:
+        """
+        Set the state of a single cell and mark its tiles as active.
+        """
+        super().set_cell(row, col, alive)
+        self._mark(row, col)
+
+    def clear(self) -> None:
+        """
+        Reset the board and mark every tile as active.
+        """
+        super().clear()
+        self.active = None
+        tiles = self.tile_rows * self.tile_cols
+        self.tile_population = [0] * tiles
+        self.tile_bbox = [None] * tiles
+
+    def copy_from(self, other: Board) -> None:
+        """
+        Overwrite this board with the cells of another board of the same
+        size, marking every tile as active and its statistics as unknown.
+        """
+        super().copy_from(other)
+        self.active = None
+        self.tile_population = [None] * (self.tile_rows * self.tile_cols)
+
+    def _count_tile(self, tr: int, tc: int) -> None:
+        """
+        Recompute the population and bounding box of one tile.
+        """
+        size, cols, cells = self.tile_size, self.cols, self.cells
+        c0 = tc * size
+        c1 = min(c0 + size, cols)
+        population = 0
+        bbox: BBox = None
+        for r in range(tr * size, min(tr * size + size, self.rows)):
+            row = cells[r * cols + c0:r * cols + c1]
+            count = row.count(1)
+            if not count:
+                continue
+            population += count
+            first = c0 + row.find(1)
+            last = c0 + row.rfind(1)
+            if bbox is None:
+                bbox = (r, first, r, last)
+            else:
+                bbox = (bbox[0], min(bbox[1], first), r, max(bbox[3], last))
+
+        index = tr * self.tile_cols + tc
+        self.tile_population[index] = population
+        self.tile_bbox[index] = bbox
+
+    def count_into(self, stats: GenerationStats) -> None:
+        """
+        Add the population and bounding box of the board to `stats`,
+        summed over the tiles (only tiles with unknown statistics are
+        scanned).
+        """
+        tile_population = self.tile_population
+        tile_bbox = self.tile_bbox
+        for index, population in enumerate(tile_population):
+            if population is None:
+                self._count_tile(*divmod(index, self.tile_cols))
+                population = tile_population[index]
+            if population:
+                stats.population += population
+                stats.include(*tile_bbox[index])
+
+
+def _around(tr: int, tc: int, tile_rows: int, tile_cols: int) -> List[Tile]:
+    """
+    Return the tile (tr, tc) and its existing neighbor tiles.
+    """
+    return [
+        (r, c)
+        for r in range(max(tr - 1, 0), min(tr + 2, tile_rows))
+        for c in range(max(tc - 1, 0), min(tc + 2, tile_cols))
+    ]
+
+
+@engine("tiled")
+def next_generation(
+    board: Board, rule: RuleFunc, stats: Optional[GenerationStats] = None
+) -> TiledBoard:
+    """
+    Compute the next generation, recomputing only the active tiles.
+
+    Per-generation cost is a C-level copy of the grid plus Python work
+    proportional to the number of active tiles. The number of recomputed
+    tiles is appended to active_history of the returned board (which
+    keeps the last ACTIVE_HISTORY_SIZE generations).
+
+    :param board: Current board (any Board; plain boards are converted
+                  and fully recomputed once).
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :param stats: Optional GenerationStats. Births and deaths are counted
+                  when active tiles change; population and bounding box
+                  are summed from the per-tile statistics, which are only
+                  recounted for tiles that changed.
+    :return: New TiledBoard representing the next generation.
+    """
+    if not isinstance(board, TiledBoard):
+        board = TiledBoard.from_board(board)
+
+    table = neighborhood_table(rule)
+    rows, cols, size = board.rows, board.cols, board.tile_size
+    tile_rows, tile_cols = board.tile_rows, board.tile_cols
+
+    active = board.active
+    if active is None:
+        active = {(tr, tc) for tr in range(tile_rows) for tc in range(tile_cols)}
+
+    new_board = TiledBoard(rows, cols, tile_size=size)
+    # Tile statistics carry over; changed tiles are invalidated below
+    new_board.tile_population = board.tile_population[:]
+    new_board.tile_bbox = board.tile_bbox[:]
+    cells = board.cells
+    new_cells = new_board.cells
+    # Static tiles are copied as-is (one buffer copy)
+    new_cells[:] = cells
+    changed: Set[Tile] = set()
+    births = deaths = 0
+
+    for tr, tc in active:
+        c0 = tc * size
+        c1 = min(c0 + size, cols)
+        tile_changed = False
+
+        # Columns c0-1 .. c1 (one extra on each side), dead outside the board
+        lo = max(c0 - 1, 0)
+        hi = min(c1 + 1, cols)
+        pad_left = b"\x00" if c0 == 0 else b""
+        pad_right = b"\x00" if c1 == cols else b""
+        zeros = bytes(hi - lo)
+
+        for r in range(tr * size, min(tr * size + size, rows)):
+            base = r * cols
+            up = cells[base - cols + lo:base - cols + hi] if r > 0 else zeros
+            down = cells[base + cols + lo:base + cols + hi] if r + 1 < rows else zeros
+
+            # Same sliding 3x3 window (and row-wide codes) as engine.step_row
+            codes = pad_left + (
+                (int.from_bytes(up, "big") << 2)
+                | (int.from_bytes(cells[base + lo:base + hi], "big") << 1)
+                | int.from_bytes(down, "big")
+            ).to_bytes(hi - lo, "big") + pad_right
+            index = (codes[0] << 3) | codes[1]
+            for i, c in enumerate(range(base + c0, base + c1)):
+                index = ((index << 3) & 0o777) | codes[i + 2]
+                new_state = table[index]
+                if new_state != cells[c]:
+                    new_cells[c] = new_state
+                    tile_changed = True
+                    if new_state:
+                        births += 1
+                    else:
+                        deaths += 1
+
+        if tile_changed:
+            changed.add((tr, tc))
+            new_board.tile_population[tr * tile_cols + tc] = None
+
+    next_active: Set[Tile] = set()
+    for tr, tc in changed:
+        next_active.update(_around(tr, tc, tile_rows, tile_cols))
+
+    if stats is not None:
+        stats.births += births
+        stats.deaths += deaths
+        new_board.count_into(stats)
+
+    new_board.active = next_active
+    new_board.active_history = board.active_history
+    new_board.active_history.append(len(active))
+    return new_board
@@ -27,3 +27,35 @@ class RuleSetError(GameOfLifeError):
     Raised when there is an issue with a ruleset.
     """
     pass
+
+
+class EngineError(GameOfLifeError):
+    """
+    Raised when a simulation engine is unknown or cannot be used
+    (for example, because an optional dependency is not installed).
+    """
+    pass
+
+
+class LogFormatError(GameOfLifeError):
+    """
+    Raised when a simulation log cannot be written or read
+    (unknown format, corrupt or truncated file, etc.).
+    """
+    pass
+
+
+class SessionLimitError(GameOfLifeError):
+    """
+    Raised when the simulation server already holds its maximum number
+    of sessions.
+    """
+    pass
+
+
+class CheckpointError(GameOfLifeError):
+    """
+    Raised when a checkpoint cannot be read or a simulation cannot be
+    resumed from it (missing, corrupt or incompatible file).
+    """
+    pass
@@ -0,0 +1,483 @@
+# hashlife.py
+
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from errors import RuleSetError
+from rules import get_ruleset, rule_table, RuleFunc, RuleTable
+
+# Default limit for the number of canonical nodes kept in memory.
+# One node costs roughly 200 bytes (object + intern table entry + memo
+# entry), so the default cap is about 200 MB.
+DEFAULT_MAX_NODES = 1_000_000
+
+
+class Node:
+    """
+    A square block of 2**level x 2**level cells in the quadtree.
+
+    Level 0 nodes are single cells. Higher-level nodes are made of four
+    children of the level below (nw, ne, sw, se). Nodes are immutable and
+    canonical: within one HashLife instance, two blocks with the same
+    contents are the same Node object, so identity can be used as the key
+    for memoized results.
+    """
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(
+        self,
+        level: int,
+        nw: Optional["Node"],
+        ne: Optional["Node"],
+        sw: Optional["Node"],
+        se: Optional["Node"],
+        population: int,
+    ) -> None:
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLife:
+    """
+    HashLife simulator on an infinite plane.
+
+    The pattern is stored as a canonical quadtree. The future of every
+    node (its centre, 2**j generations later) is memoized, so repetitive
+    patterns can be advanced by huge numbers of generations in a few
+    steps (for example, a glider to generation 10**9).
+
+    Memory is capped by `max_nodes`: when the intern table grows past the
+    cap, all caches are dropped and only the nodes that are still reachable
+    from the current pattern are kept.
+
+    Note: the plane is unbounded. Unlike Board, cells near the border of
+    the original board do not die because of the edge.
+    """
+
+    def __init__(self, rule: RuleFunc, max_nodes: int = DEFAULT_MAX_NODES) -> None:
+        """
+        Create an empty simulator for the given rule.
+
+        :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+        :param max_nodes: Maximum number of canonical nodes kept in memory.
+        :raises RuleSetError: If the rule gives birth with 0 neighbors (B0),
+                              which cannot be simulated on an infinite plane.
+        """
+        table = rule_table(rule)
+        if table[0][0]:
+            raise RuleSetError(
+                "Rules with birth on 0 neighbors (B0) are not supported by HashLife"
+            )
+
+        self.table: RuleTable = table
+        self.max_nodes = max_nodes
+        self.generation = 0
+        # Number of times the caches were collected (for diagnostics)
+        self.collections = 0
+
+        self._off = Node(0, None, None, None, None, 0)
+        self._on = Node(0, None, None, None, None, 1)
+        self._nodes: Dict[Tuple[Node, Node, Node, Node], Node] = {}
+        self._results: Dict[Tuple[Node, int], Node] = {}
+        self._empty: List[Node] = [self._off]
+
+        # The pattern: root node and the (row, col) of its top-left cell
+        self.root = self.empty(3)
+        self.top = 0
+        self.left = 0
+
+    # --- Node construction ---
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """
+        Return the canonical node with the given four children.
+        """
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            if len(self._nodes) >= self.max_nodes:
+                # Emergency collection in the middle of a computation:
+                # nodes that are still in use stay valid, they just lose
+                # sharing until the next full collection.
+                self._nodes.clear()
+                self._results.clear()
+                self.collections += 1
+
+            node = Node(
+                nw.level + 1, nw, ne, sw, se,
+                nw.population + ne.population + sw.population + se.population,
+            )
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> Node:
+        """
+        Return the canonical empty node of the given level.
+        """
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def centre(self, node: Node) -> Node:
+        """
+        Return a node one level higher with `node` in its centre.
+        """
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    # --- Evolution ---
+
+    def _life_4x4(self, node: Node) -> Node:
+        """
+        Base case: the centre 2x2 of a 4x4 node, one generation later.
+        """
+        quads = (node.nw, node.ne, node.sw, node.se)
+        cells = [[0] * 4 for _ in range(4)]
+        for i, q in enumerate(quads):
+            r0 = (i // 2) * 2
+            c0 = (i % 2) * 2
+            cells[r0][c0] = q.nw.population
+            cells[r0][c0 + 1] = q.ne.population
+            cells[r0 + 1][c0] = q.sw.population
+            cells[r0 + 1][c0 + 1] = q.se.population
+
+        table = self.table
+        result = []
+        for r in (1, 2):
+            for c in (1, 2):
+                neighbors = (
+                    cells[r - 1][c - 1] + cells[r - 1][c] + cells[r - 1][c + 1]
+                    + cells[r][c - 1] + cells[r][c + 1]
+                    + cells[r + 1][c - 1] + cells[r + 1][c] + cells[r + 1][c + 1]
+                )
+                state = table[cells[r][c]][neighbors]
+                result.append(self._on if state else self._off)
+
+        return self.join(*result)
+
+    def successor(self, node: Node, j: int) -> Node:
+        """
+        Return the centre of `node` (one level lower), 2**j generations later.
+
+        j is limited to node.level - 2, the largest jump whose result is
+        fully determined by the contents of the node.
+        """
+        level = node.level
+        j = min(j, level - 2)
+
+        if node.population == 0:
+            return self.empty(level - 1)
+
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if level == 2:
+            result = self._life_4x4(node)
+        else:
+            join = self.join
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+
+            # Nine overlapping sub-squares of level-1, advanced 2**j
+            # (or 2**(level-3) if j is the maximum) generations
+            c1 = self.successor(nw, j)
+            c2 = self.successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self.successor(ne, j)
+            c4 = self.successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self.successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self.successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self.successor(sw, j)
+            c8 = self.successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self.successor(se, j)
+
+            if j < level - 2:
+                # Already far enough in time: just crop the centre
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                # Second half of the jump
+                result = join(
+                    self.successor(join(c1, c2, c4, c5), j),
+                    self.successor(join(c2, c3, c5, c6), j),
+                    self.successor(join(c4, c5, c7, c8), j),
+                    self.successor(join(c5, c6, c8, c9), j),
+                )
+
+        self._results[key] = result
+        return result
+
+    def _is_padded(self, node: Node) -> bool:
+        """
+        Return True if all alive cells lie in the central half of the node.
+        """
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        return (
+            nw.population == nw.se.population
+            and ne.population == ne.sw.population
+            and sw.population == sw.ne.population
+            and se.population == se.nw.population
+        )
+
+    def _expand(self) -> None:
+        """
+        Grow the root one level, keeping the pattern in place.
+        """
+        half = 1 << (self.root.level - 1)
+        self.root = self.centre(self.root)
+        self.top -= half
+        self.left -= half
+
+    def _shrink(self) -> None:
+        """
+        Cut away empty border around the pattern (down to level 3).
+        """
+        root = self.root
+        while root.level > 3 and self._is_padded(root):
+            quarter = 1 << (root.level - 2)
+            root = self.join(root.nw.se, root.ne.sw, root.sw.ne, root.se.nw)
+            self.top += quarter
+            self.left += quarter
+        self.root = root
+
+    def step(self, generations: int) -> None:
+        """
+        Advance the pattern by the given number of generations.
+
+        The number is split into powers of two; each power 2**j is done
+        by a single memoized successor() call on a root of level >= j+2.
+
+        :param generations: Number of generations to advance (>= 0).
+        :raises ValueError: If generations is negative.
+        """
+        if generations < 0:
+            raise ValueError(
+                f"Number of generations must be non-negative, got {generations}"
+            )
+
+        j = 0
+        while generations:
+            if generations & 1:
+                while self.root.level < j + 2 or not self._is_padded(self.root):
+                    self._expand()
+
+                # The successor of the centred root covers exactly the
+                # same square as the root, so the origin does not move.
+                self.root = self.successor(self.centre(self.root), j)
+                self.generation += 1 << j
+                self._shrink()
+                self._maybe_collect()
+
+            generations >>= 1
+            j += 1
+
+    def _maybe_collect(self) -> None:
+        """
+        Run collect() if the caches have grown past max_nodes.
+        """
+        if len(self._nodes) + len(self._results) > self.max_nodes:
+            self.collect()
+
+    def collect(self) -> None:
+        """
+        Drop all caches and keep only the nodes reachable from the root.
+
+        The root is re-canonicalized bottom-up, which also removes the
+        duplicates that an emergency collection inside join() can create.
+        """
+        self._nodes = {}
+        self._results = {}
+        self._empty = [self._off]
+        self.collections += 1
+
+        canonical: Dict[int, Node] = {}
+
+        def rebuild(node: Node) -> Node:
+            if node.level == 0:
+                return self._on if node.population else self._off
+            if node.population == 0:
+                return self.empty(node.level)
+            known = canonical.get(id(node))
+            if known is None:
+                known = self.join(
+                    rebuild(node.nw), rebuild(node.ne),
+                    rebuild(node.sw), rebuild(node.se),
+                )
+                canonical[id(node)] = known
+            return known
+
+        self.root = rebuild(self.root)
+
+    # --- Conversion ---
+
+    @property
+    def population(self) -> int:
+        """
+        Number of alive cells in the pattern.
+        """
+        return self.root.population
+
+    @property
+    def node_count(self) -> int:
+        """
+        Number of canonical nodes currently held in the intern table.
+        """
+        return len(self._nodes)
+
+    def set_cells(self, cells: List[Tuple[int, int]]) -> None:
+        """
+        Replace the pattern with the given alive (row, col) cells.
+        """
+        self.root = self.empty(3)
+        self.top = 0
+        self.left = 0
+        if not cells:
+            return
+
+        top = min(r for r, _ in cells)
+        left = min(c for _, c in cells)
+        size = max(max(r for r, _ in cells) - top, max(c for _, c in cells) - left) + 1
+        level = max(3, (size - 1).bit_length())
+
+        self.root = self._build(
+            [(r - top, c - left) for r, c in cells], level
+        )
+        self.top = top
+        self.left = left
+
+    def _build(self, cells: List[Tuple[int, int]], level: int) -> Node:
+        """
+        Build a node of the given level from cells relative to its corner.
+        """
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return self._on
+
+        half = 1 << (level - 1)
+        quads: Tuple[List[Tuple[int, int]], ...] = ([], [], [], [])
+        for r, c in cells:
+            index = (2 if r >= half else 0) + (1 if c >= half else 0)
+            quads[index].append((r % half, c % half))
+
+        return self.join(*(self._build(q, level - 1) for q in quads))
+
+    def cells(
+        self,
+        top: Optional[int] = None,
+        left: Optional[int] = None,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        Return the alive (row, col) cells, optionally limited to a window.
+        """
+        if top is None or left is None or rows is None or cols is None:
+            window = None
+        else:
+            window = (top, left, top + rows, left + cols)
+
+        result: List[Tuple[int, int]] = []
+        stack = [(self.root, self.top, self.left)]
+        while stack:
+            node, r0, c0 = stack.pop()
+            if node.population == 0:
+                continue
+
+            size = 1 << node.level
+            if window is not None and (
+                r0 >= window[2] or c0 >= window[3]
+                or r0 + size <= window[0] or c0 + size <= window[1]
+            ):
+                continue
+
+            if node.level == 0:
+                result.append((r0, c0))
+                continue
+
+            half = size >> 1
+            stack.append((node.nw, r0, c0))
+            stack.append((node.ne, r0, c0 + half))
+            stack.append((node.sw, r0 + half, c0))
+            stack.append((node.se, r0 + half, c0 + half))
+
+        return result
+
+    @classmethod
+    def from_board(
+        cls, board: Board, rule: RuleFunc, max_nodes: int = DEFAULT_MAX_NODES
+    ) -> "HashLife":
+        """
+        Create a simulator with the alive cells of a board.
+        """
+        life = cls(rule, max_nodes=max_nodes)
+        life.set_cells([
+            (r, c)
+            for r in range(board.rows)
+            for c in range(board.cols)
+            if board.get_cell(r, c)
+        ])
+        return life
+
+    def to_board(self, rows: int, cols: int, top: int = 0, left: int = 0) -> Board:
+        """
+        Return a Board showing a window of the plane.
+
+        :param rows: Number of rows of the window.
+        :param cols: Number of columns of the window.
+        :param top: Plane row shown as board row 0.
+        :param left: Plane column shown as board column 0.
+        :return: New Board with the alive cells inside the window.
+        """
+        board = Board(rows, cols)
+        cells = board.cells
+        for r, c in self.cells(top, left, rows, cols):
+            cells[(r - top) * cols + c - left] = 1
+        return board
+
+
+def run_hashlife(
+    board: Board,
+    ruleset_name: str,
+    generations: int,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    window: Optional[Tuple[int, int, int, int]] = None,
+) -> Board:
+    """
+    Advance a board to a (possibly huge) target generation with HashLife.
+
+    The board is placed on an infinite plane, so unlike run_simulation,
+    cells leaving the board do not die at the edge.
+
+    :param board: Initial board state.
+    :param ruleset_name: Name of the ruleset (e.g. "classic", "highlife").
+    :param generations: Target generation (must be >= 0).
+    :param max_nodes: Maximum number of canonical nodes kept in memory.
+    :param window: Optional (top, left, rows, cols) of the plane to return.
+                   Defaults to the area of the initial board.
+    :return: Board instance with the window at the target generation.
+    """
+    rule = get_ruleset(ruleset_name)
+
+    life = HashLife.from_board(board, rule, max_nodes=max_nodes)
+    life.step(generations)
+
+    if window is None:
+        window = (0, 0, board.rows, board.cols)
+    top, left, rows, cols = window
+    return life.to_board(rows, cols, top=top, left=left)
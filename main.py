@@ -1,9 +1,12 @@
 # main.py
 
 import os
+import sys
 
 from board import Board
 from engine import run_simulation
+from cycles import CycleDetector
+from metrics import SummaryObserver
 from patterns import load_pattern
 from errors import GameOfLifeError
 
@@ -70,7 +73,8 @@ def choose_initial_board() -> Board:
 
     if choice == "1":
         filepath = input(
-            "Enter pattern file path (e.g. configs/glider.pattern): "
+            "Enter pattern file path "
+            "(e.g. configs/board_config, *.rle, *.cells, *.lif): "
         ).strip()
         board = load_pattern(filepath)
     else:
@@ -86,7 +90,7 @@ def main() -> None:
 
     This function:
         - chooses how to initialize the board (file or manual),
-        - asks for ruleset,
+        - asks for ruleset and engine,
         - optionally starts an interactive Pygame UI,
         - or runs a console-based simulation with logging.
     """
@@ -98,10 +102,17 @@ def main() -> None:
 
         # 2) Ask for ruleset name (default: classic)
         ruleset_name = input(
-            "Enter ruleset name (classic/highlife) [default: classic]: "
+            "Enter ruleset name (classic/highlife/bosco) or rulestring "
+            "(e.g. B36/S23, R5,C0,M1,S34..58,B34..45,NM) [default: classic]: "
         ).strip() or "classic"
 
-        # 3) Ask if user wants graphical interactive mode
+        # 3) Ask for engine name (default: python)
+        engine_name = input(
+            "Enter engine name (python/numpy/bitboard/sparse/tiled/ltl) "
+            "[default: python]: "
+        ).strip() or "python"
+
+        # 4) Ask if user wants graphical interactive mode
         use_pygame = input(
             "Run graphical interactive mode with Pygame? (y/n) [n]: "
         ).strip().lower() == "y"
@@ -116,9 +127,15 @@ def main() -> None:
                 print("  - LEFT MOUSE BUTTON: toggle a cell (alive/dead)")
                 print("  - SPACE: start/stop the simulation (pause/unpause)")
                 print("  - C: clear the board (all cells dead)")
+                print("  - LEFT ARROW: go back one generation (while paused)")
+                print("  - + / -: double / halve the simulation speed")
+                print("  - MOUSE WHEEL: zoom in/out at the cursor")
+                print("  - RIGHT MOUSE BUTTON drag: pan the view")
+                print("  - F: fit the whole board in the window")
+                print("  - D: zoomed out, show density instead of any alive cell")
                 print("  - ESC or window close: exit\n")
 
-                run_pygame(board, ruleset_name)
+                run_pygame(board, ruleset_name, engine_name)
                 # After the window is closed, we simply exit the program.
                 return
             except ImportError:
@@ -127,7 +144,7 @@ def main() -> None:
                     "Falling back to console mode.\n"
                 )
 
-        # 4) If we are here, run console (non-graphical) simulation
+        # 5) If we are here, run console (non-graphical) simulation
 
         # Ask for number of generations
         while True:
@@ -141,6 +158,11 @@ def main() -> None:
             except ValueError:
                 print("Please enter a valid integer for the number of generations.")
 
+        # Ask whether to stop early once the board dies out or repeats
+        stop_early = input(
+            "Stop early when the board dies out or repeats? (y/n) [n]: "
+        ).strip().lower() == "y"
+
         # Prepare log file path (create 'logs' directory if needed)
         logs_dir = "logs"
         os.makedirs(logs_dir, exist_ok=True)
@@ -148,17 +170,41 @@ def main() -> None:
 
         print("\nRunning simulation in console mode...\n")
 
+        detector = CycleDetector() if stop_early else None
+        summary = SummaryObserver()
         final_board = run_simulation(
             board=board,
             ruleset_name=ruleset_name,
             steps=steps,
             log_file=log_file,
+            engine_name=engine_name,
+            detector=detector,
+            observers=[summary],
         )
 
+        result = detector.result if detector is not None else None
+        if result is not None:
+            if result.kind == "extinct":
+                print(f"All cells died at generation {result.generation}.\n")
+            else:
+                print(
+                    f"Generation {result.generation} repeats generation "
+                    f"{result.first_generation} ({result.kind}, period "
+                    f"{result.period}); stopped early, the log ends there.\n"
+                )
+            # The board repeats every `period` generations: only the
+            # remainder is needed to reach the requested generation
+            remaining = (steps - result.generation) % result.period
+            if remaining:
+                final_board = run_simulation(
+                    final_board, ruleset_name, remaining, engine_name=engine_name
+                )
+
         print("Final board state:\n")
         final_board.print()
 
-        print(f"\nSimulation log has been written to: {log_file}")
+        print(f"\n{summary}")
+        print(f"Simulation log has been written to: {log_file}")
 
     except GameOfLifeError as e:
         # Any custom project-related error (patterns, rulesets, grid, etc.)
@@ -169,4 +215,24 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        # Non-interactive batch mode: python main.py run --help
+        from batch import main as batch_main
+
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "resume":
+        # Continue a checkpointed run: python main.py resume CHECKPOINT
+        from checkpoint import main as resume_main
+
+        sys.exit(resume_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # Local HTTP/WebSocket simulation server: python main.py serve --help
+        from server import main as serve_main
+
+        sys.exit(serve_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "census":
+        # Random soup search and object census: python main.py census --help
+        from census import main as census_main
+
+        sys.exit(census_main(sys.argv[2:]))
     main()
@@ -0,0 +1,306 @@
+# metrics.py
+
+import cProfile
+import csv
+import json
+import pstats
+import sys
+from typing import IO, Any, Dict, Optional, Sequence, Tuple
+
+from board import Board
+
+# Bounding box of the alive cells: (min_row, min_col, max_row, max_col),
+# all inclusive; None when the board is empty
+BBox = Optional[Tuple[int, int, int, int]]
+
+# Columns of the CSV / JSONL metrics streams
+FIELDS = (
+    "generation", "seconds", "population", "births", "deaths",
+    "min_row", "min_col", "max_row", "max_col",
+)
+
+
+class GenerationStats:
+    """
+    Per-generation measurements passed to observers.
+
+    Engines fill in population, births, deaths and the bounding box while
+    they step (see the `stats` argument of the engine step functions);
+    run_simulation adds the generation number and the wall time of the
+    step in seconds.
+    """
+
+    def __init__(self, generation: int = 0) -> None:
+        self.generation = generation
+        self.seconds = 0.0
+        self.population = 0
+        self.births = 0
+        self.deaths = 0
+        self.bbox: BBox = None
+
+    def include(self, min_row: int, min_col: int, max_row: int, max_col: int) -> None:
+        """
+        Grow the bounding box so that it contains the given rectangle.
+        """
+        if self.bbox is None:
+            self.bbox = (min_row, min_col, max_row, max_col)
+            return
+
+        r0, c0, r1, c1 = self.bbox
+        self.bbox = (
+            min(r0, min_row), min(c0, min_col), max(r1, max_row), max(c1, max_col)
+        )
+
+    def record_row(self, r: int, old: Sequence[int], new: Sequence[int]) -> None:
+        """
+        Add one row of a list-based engine: `old` is the row before the
+        step, `new` the row after it (cells are 0/1).
+
+        Only C-level operations over the row are used (bytes count and
+        index, an XOR of the rows read as ints), so this costs far less
+        than computing the row itself. Rows may be lists or byte buffers.
+        """
+        new = bytes(new)
+        population = new.count(1)
+        # Cells are 0/1 bytes: one bit of the XOR per changed cell
+        changes = (int.from_bytes(old, "big") ^ int.from_bytes(new, "big")).bit_count()
+        if changes:
+            # births - deaths is the change in population
+            delta = population - bytes(old).count(1)
+            self.births += (changes + delta) // 2
+            self.deaths += (changes - delta) // 2
+
+        if population:
+            self._add_row(r, new, population)
+
+    def count_row(self, r: int, row: Sequence[int]) -> None:
+        """
+        Add the population and bounding box of one row (no births/deaths),
+        for engines that count those themselves.
+        """
+        cells = bytes(row)
+        population = cells.count(1)
+        if population:
+            self._add_row(r, cells, population)
+
+    def _add_row(self, r: int, row: bytes, population: int) -> None:
+        self.population += population
+        self.include(r, row.index(1), r, row.rindex(1))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return the stats as a flat dict with the keys in FIELDS.
+        """
+        r0, c0, r1, c1 = self.bbox if self.bbox is not None else (None,) * 4
+        return {
+            "generation": self.generation,
+            "seconds": self.seconds,
+            "population": self.population,
+            "births": self.births,
+            "deaths": self.deaths,
+            "min_row": r0,
+            "min_col": c0,
+            "max_row": r1,
+            "max_col": c1,
+        }
+
+
+class Observer:
+    """
+    Base class for run_simulation observers.
+
+    run_simulation calls start() once before the first step, on_generation()
+    after every step and close() at the end (also when the run fails or
+    stops early). All methods do nothing by default.
+    """
+
+    def start(self, board: Board, ruleset_name: str, engine_name: str) -> None:
+        pass
+
+    def on_generation(self, stats: GenerationStats) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SummaryObserver(Observer):
+    """
+    Keeps running totals in memory: time, throughput, population range
+    and total births and deaths. Nothing is stored per generation.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.cells = 0
+        self.generations = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float("inf")
+        self.max_seconds = 0.0
+        self.births = 0
+        self.deaths = 0
+        self.initial_population = 0
+        self.population = 0
+        self.min_population = 0
+        self.max_population = 0
+
+    def start(self, board: Board, ruleset_name: str, engine_name: str) -> None:
+        self._reset()
+        self.cells = board.rows * board.cols
+        population = board.to_bytes().count(1)
+        self.initial_population = self.population = population
+        self.min_population = self.max_population = population
+
+    def on_generation(self, stats: GenerationStats) -> None:
+        self.generations += 1
+        self.total_seconds += stats.seconds
+        self.min_seconds = min(self.min_seconds, stats.seconds)
+        self.max_seconds = max(self.max_seconds, stats.seconds)
+        self.births += stats.births
+        self.deaths += stats.deaths
+        self.population = stats.population
+        self.min_population = min(self.min_population, stats.population)
+        self.max_population = max(self.max_population, stats.population)
+
+    @property
+    def gens_per_sec(self) -> float:
+        return self.generations / self.total_seconds if self.total_seconds else 0.0
+
+    @property
+    def cells_per_sec(self) -> float:
+        return self.gens_per_sec * self.cells
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the totals as a dict (e.g. for json.dumps).
+        """
+        return {
+            "generations": self.generations,
+            "total_seconds": self.total_seconds,
+            "min_seconds": self.min_seconds if self.generations else 0.0,
+            "max_seconds": self.max_seconds,
+            "gens_per_sec": self.gens_per_sec,
+            "cells_per_sec": self.cells_per_sec,
+            "births": self.births,
+            "deaths": self.deaths,
+            "initial_population": self.initial_population,
+            "final_population": self.population,
+            "min_population": self.min_population,
+            "max_population": self.max_population,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.generations} generations in {self.total_seconds:.3f} s "
+            f"({self.gens_per_sec:.1f} gen/s, {self.cells_per_sec:.0f} cells/s); "
+            f"population {self.initial_population} -> {self.population} "
+            f"(min {self.min_population}, max {self.max_population}), "
+            f"{self.births} births, {self.deaths} deaths"
+        )
+
+
+class CSVObserver(Observer):
+    """
+    Streams one CSV row per generation (columns: FIELDS) to a file.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._file: Optional[IO[str]] = None
+        self._writer: Any = None
+
+    def start(self, board: Board, ruleset_name: str, engine_name: str) -> None:
+        self._file = open(self.filepath, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def on_generation(self, stats: GenerationStats) -> None:
+        self._writer.writerow(stats.as_dict())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JSONLObserver(Observer):
+    """
+    Streams one JSON object per generation (keys: FIELDS) to a file.
+    The first line holds the run parameters.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._file: Optional[IO[str]] = None
+
+    def start(self, board: Board, ruleset_name: str, engine_name: str) -> None:
+        self._file = open(self.filepath, "w", encoding="utf-8")
+        header = {
+            "rows": board.rows,
+            "cols": board.cols,
+            "ruleset": ruleset_name,
+            "engine": engine_name,
+        }
+        self._file.write(json.dumps(header) + "\n")
+
+    def on_generation(self, stats: GenerationStats) -> None:
+        assert self._file is not None
+        self._file.write(json.dumps(stats.as_dict()) + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ProfileObserver(Observer):
+    """
+    Runs cProfile during the first `generations` generations.
+
+    On close() the profile is saved to `filepath` (for pstats / snakeviz)
+    or, without a file, the top `limit` functions are printed.
+    """
+
+    def __init__(
+        self,
+        generations: int = 10,
+        filepath: Optional[str] = None,
+        sort: str = "cumulative",
+        limit: int = 20,
+        stream: IO[str] = sys.stdout,
+    ) -> None:
+        self.generations = generations
+        self.filepath = filepath
+        self.sort = sort
+        self.limit = limit
+        self.stream = stream
+        self.profile: Optional[cProfile.Profile] = None
+        self._remaining = 0
+
+    def start(self, board: Board, ruleset_name: str, engine_name: str) -> None:
+        self._remaining = self.generations
+        self.profile = cProfile.Profile()
+        if self._remaining > 0:
+            self.profile.enable()
+
+    def on_generation(self, stats: GenerationStats) -> None:
+        if self._remaining <= 0:
+            return
+
+        self._remaining -= 1
+        if self._remaining == 0 and self.profile is not None:
+            self.profile.disable()
+
+    def close(self) -> None:
+        if self.profile is None:
+            return
+
+        self.profile.disable()
+        if self.filepath is not None:
+            self.profile.dump_stats(self.filepath)
+        else:
+            stats = pstats.Stats(self.profile, stream=self.stream)
+            stats.sort_stats(self.sort).print_stats(self.limit)
+        self.profile = None
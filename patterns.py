@@ -1,10 +1,14 @@
 # patterns.py
 
+import os
 import re
-from typing import List, Tuple
+from array import array
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from board import Board
-from errors import PatternParseError
+from errors import InvalidGridSizeError, PatternParseError, RuleSetError
+from rules import get_ruleset, rulestring
 
 # Regular expression for the SIZE line, e.g.:
 #   SIZE 10x20
@@ -14,6 +18,38 @@ SIZE_RE = re.compile(r"^SIZE\s+(\d+)x(\d+)\s*$")
 #   ALIVE 3,5
 ALIVE_RE = re.compile(r"^ALIVE\s+(\d+)\s*,\s*(\d+)\s*$")
 
+# Regular expression for the RLE header line, e.g.:
+#   x = 3, y = 3, rule = B3/S23
+RLE_HEADER_RE = re.compile(
+    r"^x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)\s*(?:,\s*rule\s*=\s*(\S+))?\s*$"
+)
+
+# One RLE item: optional run count followed by a tag (b, o, $, ! ...)
+RLE_ITEM_RE = re.compile(r"(\d*)(\D)")
+
+# Regular expression for a Life 1.06 cell line, e.g.:
+#   -3 12
+LIFE106_RE = re.compile(r"^(-?\d+)\s+(-?\d+)$")
+
+# Supported pattern formats
+PATTERN_FORMATS = ("native", "rle", "life106", "plaintext")
+
+# File extensions that select a format without looking at the content
+EXTENSIONS = {
+    ".rle": "rle",
+    ".lif": "life106",
+    ".life": "life106",
+    ".cells": "plaintext",
+}
+
+# Plaintext cell characters -> 0/1; anything else is mapped to 2 (invalid)
+_PLAINTEXT_CELLS = bytes(
+    1 if chr(i) in "O*" else 0 if chr(i) == "." else 2 for i in range(256)
+)
+
+# Maximum line length of written RLE files (as recommended for the format)
+RLE_LINE_LENGTH = 70
+
 
 def _strip_bom(line: str) -> str:
     """
@@ -29,81 +65,441 @@ def _strip_bom(line: str) -> str:
     return line
 
 
-def load_pattern(filepath: str) -> Board:
+def _error(line_no: int, message: str) -> PatternParseError:
+    """
+    Create a PatternParseError that points at a line of the pattern file.
+    """
+    return PatternParseError(f"Line {line_no}: {message}")
+
+
+def detect_format(filepath: str, head: Sequence[str]) -> str:
+    """
+    Guess the pattern format from the file extension or, failing that,
+    from the first lines of the file: a "#Life 1.06" or "!" first line,
+    else the first line that is not a '#' comment (an RLE "x = .."
+    header or a native SIZE / ALIVE line).
+
+    :param filepath: Path to the pattern file.
+    :param head: Non-empty lines (stripped) from the start of the file,
+                 up to and including the first non-comment line.
+    :return: One of PATTERN_FORMATS.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+
+    first_line = head[0] if head else ""
+    if first_line.startswith("#Life 1.06"):
+        return "life106"
+    if first_line.startswith("!"):
+        return "plaintext"
+    # '#' comments are shared by RLE and the native format
+    content = next((line for line in head if not line.startswith("#")), "")
+    if RLE_HEADER_RE.match(content):
+        return "rle"
+    return "native"
+
+
+def load_pattern(
+    filepath: str,
+    fmt: Optional[str] = None,
+    margin: int = 0,
+    max_cells: Optional[int] = None,
+) -> Board:
     """
     Load a pattern from a text file and return a Board instance.
 
-    Expected file format (lines):
+    Native file format (lines):
         # Comments start with '#'
         SIZE <rows>x<cols>
         ALIVE row,col
         ALIVE row,col
         ...
 
+    Also reads the common community formats:
+        - RLE (.rle): "x = <cols>, y = <rows>" header and run-length
+          encoded rows ("b" dead, "o" alive, "$" end of row, "!" end).
+          The board has the size given in the header; the rule in the
+          header is not applied (pass it as the ruleset instead).
+        - Life 1.06 (.lif, .life): "#Life 1.06" header and one
+          "x y" cell per line (coordinates may be negative).
+        - Plaintext (.cells): "!" comment lines and one row of
+          '.' (dead) / 'O' (alive) per line.
+
+    The file is parsed as a stream: alive cells are written straight
+    into the board's cells as they are read (runs of cells in RLE with a
+    single slice assignment), instead of being collected first.
+    Life 1.06 and plaintext have to keep their data until the end, since
+    the board size is not known before: coordinates in compact arrays,
+    plaintext rows as one bytes object each.
+
     Indexing:
         - Rows and columns are zero-based.
         - (0,0) is the top-left cell.
 
     :param filepath: Path to the pattern file.
+    :param fmt: Pattern format (see PATTERN_FORMATS); detected from the
+                file extension or the first line if not given.
+    :param margin: Number of dead cells added on every side of patterns
+                   whose format has no board size (RLE, Life 1.06,
+                   plaintext). Ignored for the native format.
+    :param max_cells: Largest allowed board (rows x cols, margin
+                      included), checked before the board is allocated.
     :return: A Board object with the specified alive cells.
     :raises PatternParseError: If the file is missing required lines,
                                contains malformed lines, or is not found.
+                               Messages include the line number.
+    :raises InvalidGridSizeError: If the board would exceed max_cells.
     """
-    rows = None
-    cols = None
-    alive_cells: List[Tuple[int, int]] = []
+    if fmt is not None and fmt not in PATTERN_FORMATS:
+        raise PatternParseError(
+            f"Unknown pattern format: {fmt}. Available: {list(PATTERN_FORMATS)}"
+        )
+    if margin < 0:
+        raise PatternParseError(f"Margin must be >= 0, got {margin}")
 
     try:
         with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                original_line = line  # Keep original for error messages
-
-                # First, strip trailing/leading whitespace
-                line = line.strip()
-                # Then, remove BOM if present
-                line = _strip_bom(line)
-
-                # Skip empty lines or comments
-                if not line or line.startswith("#"):
-                    continue
-
-                # Try to match SIZE line
-                m_size = SIZE_RE.match(line)
-                if m_size:
-                    rows = int(m_size.group(1))
-                    cols = int(m_size.group(2))
-                    continue
-
-                # Try to match ALIVE line
-                m_alive = ALIVE_RE.match(line)
-                if m_alive:
-                    r = int(m_alive.group(1))
-                    c = int(m_alive.group(2))
-                    alive_cells.append((r, c))
-                    continue
-
-                # If line does not match any known pattern, raise an error
-                raise PatternParseError(
-                    f"Cannot parse line in pattern file: {original_line.strip()}"
-                )
+            lines = _numbered_lines(f)
+
+            # Peek at the lines up to the first non-comment one to detect
+            # the format (only comment lines are buffered)
+            first: List[Tuple[int, str]] = []
+            for line_no, line in lines:
+                if line:
+                    first.append((line_no, line))
+                    if fmt is not None or not line.startswith("#"):
+                        break
+            if fmt is None:
+                fmt = detect_format(filepath, [line for _, line in first])
+
+            stream = chain(first, lines)
+            if fmt == "rle":
+                return _load_rle(stream, margin, max_cells)
+            if fmt == "life106":
+                return _load_life106(stream, margin, max_cells)
+            if fmt == "plaintext":
+                return _load_plaintext(stream, margin, max_cells)
+            return _load_native(stream, max_cells)
 
     except FileNotFoundError as e:
         # Wrap the built-in exception in our custom PatternParseError
         raise PatternParseError(f"Pattern file not found: {filepath}") from e
 
+
+def parse_rle(text: str, margin: int = 0, max_cells: Optional[int] = None) -> Board:
+    """
+    Create a board from RLE pattern text (for patterns kept in code).
+
+    :param text: RLE header and data, as in an .rle file.
+    :param margin: Number of dead cells added on every side.
+    :param max_cells: Largest allowed board (see load_pattern).
+    :raises PatternParseError: If the text is not a valid RLE pattern.
+    :raises InvalidGridSizeError: If the board would exceed max_cells.
+    """
+    if margin < 0:
+        raise PatternParseError(f"Margin must be >= 0, got {margin}")
+    return _load_rle(_numbered_lines(text.splitlines()), margin, max_cells)
+
+
+def _new_board(rows: int, cols: int, max_cells: Optional[int]) -> Board:
+    """
+    Allocate a board, refusing sizes above max_cells first (a header
+    can ask for far more memory than the file is long).
+    """
+    if max_cells is not None and rows * cols > max_cells:
+        raise InvalidGridSizeError(
+            f"Board {rows}x{cols} exceeds the limit of {max_cells} cells"
+        )
+    return Board(rows, cols)
+
+
+def _numbered_lines(f: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (line number, stripped line) for every line of a file,
+    with the BOM removed from the first line.
+    """
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if line_no == 1:
+            line = _strip_bom(line)
+        yield line_no, line
+
+
+def _load_native(
+    lines: Iterable[Tuple[int, str]], max_cells: Optional[int] = None
+) -> Board:
+    """
+    Parse the native SIZE / ALIVE format.
+    """
+    board: Optional[Board] = None
+    # ALIVE lines seen before SIZE (line number, row, col); usually empty
+    pending: List[Tuple[int, int, int]] = []
+
+    for line_no, line in lines:
+        # Skip empty lines or comments
+        if not line or line.startswith("#"):
+            continue
+
+        # ALIVE lines are by far the most common, so try them first
+        m_alive = ALIVE_RE.match(line)
+        if m_alive:
+            r = int(m_alive.group(1))
+            c = int(m_alive.group(2))
+            if board is None:
+                pending.append((line_no, r, c))
+            elif r < board.rows and c < board.cols:
+                board.cells[r * board.cols + c] = 1
+            else:
+                raise _error(
+                    line_no,
+                    f"Alive cell ({r}, {c}) is out of bounds "
+                    f"for board {board.rows}x{board.cols}",
+                )
+            continue
+
+        m_size = SIZE_RE.match(line)
+        if m_size:
+            if board is not None:
+                # A later SIZE line replaces the earlier one: the cells
+                # set so far are applied to the new board
+                pending = [
+                    (line_no, i // board.cols, i % board.cols)
+                    for i, alive in enumerate(board.cells)
+                    if alive
+                ]
+            rows = int(m_size.group(1))
+            cols = int(m_size.group(2))
+            board = _new_board(rows, cols, max_cells)
+            for pending_no, r, c in pending:
+                if not (r < rows and c < cols):
+                    raise _error(
+                        pending_no,
+                        f"Alive cell ({r}, {c}) is out of bounds "
+                        f"for board {rows}x{cols}",
+                    )
+                board.cells[r * cols + c] = 1
+            pending = []
+            continue
+
+        # If line does not match any known pattern, raise an error
+        raise _error(line_no, f"Cannot parse line in pattern file: {line}")
+
     # After reading the file, we must have SIZE defined
-    if rows is None or cols is None:
+    if board is None:
         raise PatternParseError("Missing SIZE line in pattern file")
 
-    # Create the board and apply all alive cells
-    board = Board(rows, cols)
-    for r, c in alive_cells:
-        try:
-            board.set_cell(r, c, True)
-        except IndexError as e:
-            # If coordinates are outside the board, report a clear error
-            raise PatternParseError(
-                f"Alive cell ({r}, {c}) is out of bounds for board {rows}x{cols}"
-            ) from e
+    return board
 
+
+def _load_rle(
+    lines: Iterable[Tuple[int, str]], margin: int, max_cells: Optional[int] = None
+) -> Board:
+    """
+    Parse an RLE pattern.
+    """
+    board: Optional[Board] = None
+    row = col = 0
+    # Run count split over two lines ("...2" / "3o...")
+    carry = ""
+    width = height = 0
+
+    for line_no, line in lines:
+        if not line or line.startswith("#"):
+            continue
+
+        if board is None:
+            m_header = RLE_HEADER_RE.match(line)
+            if not m_header:
+                raise _error(line_no, f"Expected RLE header 'x = .., y = ..': {line}")
+            width = int(m_header.group(1))
+            height = int(m_header.group(2))
+            if m_header.group(3):
+                try:
+                    get_ruleset(m_header.group(3))
+                except RuleSetError as e:
+                    raise _error(line_no, f"Invalid rule in RLE header: {e}") from e
+            board = _new_board(
+                max(height, 1) + 2 * margin, max(width, 1) + 2 * margin, max_cells
+            )
+            continue
+
+        data = carry + "".join(line.split())
+        end = len(data)
+        while end > 0 and data[end - 1].isdigit():
+            end -= 1
+        carry = data[end:]
+
+        cells, stride = board.cells, board.cols
+        for m in RLE_ITEM_RE.finditer(data, 0, end):
+            count = int(m.group(1)) if m.group(1) else 1
+            tag = m.group(2)
+
+            if tag == "o":
+                if row >= height or col + count > width:
+                    raise _error(
+                        line_no,
+                        f"Cells exceed the pattern size {width}x{height} "
+                        f"given in the header",
+                    )
+                start = (margin + row) * stride + margin + col
+                cells[start:start + count] = b"\x01" * count
+                col += count
+            elif tag == "b" or tag == ".":
+                col += count
+            elif tag == "$":
+                row += count
+                col = 0
+            elif tag == "!":
+                return board
+            else:
+                raise _error(line_no, f"Unsupported RLE tag '{tag}'")
+
+    if board is None:
+        raise PatternParseError("Missing RLE header line")
+    if carry:
+        raise PatternParseError(f"RLE data ends with a bare run count: {carry}")
+
+    # The terminating '!' is missing; accept what was read
     return board
+
+
+def _load_life106(
+    lines: Iterable[Tuple[int, str]], margin: int, max_cells: Optional[int] = None
+) -> Board:
+    """
+    Parse a Life 1.06 pattern. The board is sized to the bounding box
+    of the cells (plus the margin).
+    """
+    xs = array("q")
+    ys = array("q")
+
+    for line_no, line in lines:
+        if not line or line.startswith("#"):
+            continue
+
+        m = LIFE106_RE.match(line)
+        if not m:
+            raise _error(line_no, f"Cannot parse Life 1.06 cell: {line}")
+        xs.append(int(m.group(1)))
+        ys.append(int(m.group(2)))
+
+    if not xs:
+        raise PatternParseError(
+            "Life 1.06 pattern has no cells (cannot size the board)"
+        )
+
+    min_x, min_y = min(xs), min(ys)
+    board = _new_board(
+        max(ys) - min_y + 1 + 2 * margin,
+        max(xs) - min_x + 1 + 2 * margin,
+        max_cells,
+    )
+    cells, cols = board.cells, board.cols
+    dx, dy = margin - min_x, margin - min_y
+    for x, y in zip(xs, ys):
+        cells[(y + dy) * cols + x + dx] = 1
+
+    return board
+
+
+def _load_plaintext(
+    lines: Iterable[Tuple[int, str]], margin: int, max_cells: Optional[int] = None
+) -> Board:
+    """
+    Parse a plaintext (.cells) pattern. Each row is decoded to cell bytes
+    with one bytes.translate call and copied into the board's cells at
+    its row offset. The rows are kept as bytes until the end, since the
+    board width is the longest row.
+    """
+    rows: List[bytes] = []
+    width = 0
+
+    for line_no, line in lines:
+        if line.startswith("!"):
+            continue
+
+        cells = line.encode("latin-1", errors="replace").translate(_PLAINTEXT_CELLS)
+        if 2 in cells:
+            bad = line[cells.index(2)]
+            raise _error(line_no, f"Unexpected character '{bad}' in plaintext row")
+
+        rows.append(cells)
+        width = max(width, len(cells))
+
+    # Blank trailing lines are not rows
+    while rows and not rows[-1]:
+        rows.pop()
+    if not rows:
+        raise PatternParseError("Plaintext pattern has no rows")
+
+    board = _new_board(len(rows) + 2 * margin, width + 2 * margin, max_cells)
+    cells, cols = board.cells, board.cols
+    start = margin * cols + margin
+    for row in rows:
+        cells[start:start + len(row)] = row
+        start += cols
+    return board
+
+
+def _rle_items(cells: bytes, rows: int, cols: int) -> Iterator[str]:
+    """
+    Yield the RLE items ("3o", "2b", "4$", ...) of a board snapshot.
+
+    Runs are found with bytes.find, so long runs of the same state
+    are skipped in C instead of cell by cell.
+    """
+    # Row the RLE "cursor" is on; blank rows are skipped with one n$ item
+    current = 0
+    for r in range(rows):
+        row = cells[r * cols:(r + 1) * cols]
+        # Trailing dead cells are implied by the end of the row
+        row = row.rstrip(b"\x00")
+        if not row:
+            continue
+
+        newlines = r - current
+        if newlines:
+            yield f"{newlines}$" if newlines > 1 else "$"
+        current = r
+
+        pos = 0
+        while pos < len(row):
+            state = row[pos]
+            nxt = row.find(b"\x00" if state else b"\x01", pos)
+            if nxt == -1:
+                nxt = len(row)
+            count = nxt - pos
+            tag = "o" if state else "b"
+            yield f"{count}{tag}" if count > 1 else tag
+            pos = nxt
+
+
+def save_rle(board: Board, filepath: str, ruleset_name: str = "classic") -> None:
+    """
+    Write a board as an RLE pattern file.
+
+    The header uses the full board size (not the bounding box of the
+    alive cells), so load_pattern gives back a board of the same size.
+
+    :param board: Board to save (any Board variant).
+    :param filepath: Path to the output file (overwritten).
+    :param ruleset_name: Ruleset name or rulestring written to the header.
+    """
+    rule = rulestring(get_ruleset(ruleset_name))
+
+    lines = [f"x = {board.cols}, y = {board.rows}, rule = {rule}"]
+    line: List[str] = []
+    length = 0
+    items = _rle_items(board.to_bytes(), board.rows, board.cols)
+    for item in chain(items, ["!"]):
+        if length + len(item) > RLE_LINE_LENGTH:
+            lines.append("".join(line))
+            line = []
+            length = 0
+        line.append(item)
+        length += len(item)
+    lines.append("".join(line))
+
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
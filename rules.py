@@ -1,17 +1,130 @@
 # rules.py
 
-from typing import Callable, Dict
+import re
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
 from errors import RuleSetError
 
 # Type alias for a rule function:
 # takes (is_alive, neighbors) and returns 0 or 1
 RuleFunc = Callable[[int, int], int]
 
+# Type alias for a precomputed transition table:
+# table[is_alive][neighbors] -> 0 or 1 (2 rows x 9 neighbor counts)
+RuleTable = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
 # Registry for all available rulesets.
 # Keys: ruleset name (str)
 # Values: rule function (RuleFunc)
 RULESETS: Dict[str, RuleFunc] = {}
 
+# Compiled tables for every rule seen so far.
+# Keys: rule function
+# Values: (RuleTable, 512-entry 3x3 neighborhood table)
+_COMPILED: Dict[RuleFunc, Tuple[RuleTable, bytes]] = {}
+
+# Rules created from rulestrings, keyed by canonical "B.../S..." form,
+# so that the same rulestring always gives the same function (and table).
+_PARSED: Dict[str, RuleFunc] = {}
+
+# Regular expressions for rulestrings, e.g.:
+#   B36/S23     S23/B36     23/36 (survival/birth, old notation)
+BS_RE = re.compile(r"^B([0-8]*)/S([0-8]*)$", re.IGNORECASE)
+SB_RE = re.compile(r"^S([0-8]*)/B([0-8]*)$", re.IGNORECASE)
+PLAIN_RE = re.compile(r"^([0-8]*)/([0-8]*)$")
+
+# Larger than Life rulestrings (Golly notation), e.g. Bosco's rule:
+#   R5,C0,M1,S34..58,B34..45,NM
+# R = range, C = number of states (0 or 2: two states), M = 1 if the cell
+# itself is counted, S/B = survival/birth intervals, N = M (Moore) or
+# N (von Neumann) neighborhood.
+LTL_RE = re.compile(
+    r"^R(\d+),C(\d+),M([01]),S(\d+)\.\.(\d+),B(\d+)\.\.(\d+)(?:,N([MN]))?$",
+    re.IGNORECASE,
+)
+
+# Neighborhood shapes of Larger than Life rules
+NEIGHBORHOODS = ("M", "N")
+
+
+class LargerThanLifeRule:
+    """
+    Larger than Life rule: a range-`radius` Moore (square) or von Neumann
+    (diamond) neighborhood with birth and survival intervals.
+
+    Instances are rule functions like the others, (is_alive, neighbors)
+    -> 0 or 1, where `neighbors` is the number of alive cells in the
+    neighborhood without the cell itself; with include_center=True the
+    cell is added back before the intervals are checked (LtL "M1").
+
+    Only range-1 Moore rules fit the 3x3 tables used by most engines;
+    other ranges and shapes run on the "ltl" engine (engine_ltl.py),
+    which counts neighbors with summed-area tables.
+    """
+
+    def __init__(
+        self,
+        radius: int,
+        birth: Tuple[int, int],
+        survival: Tuple[int, int],
+        neighborhood: str = "M",
+        include_center: bool = False,
+    ) -> None:
+        """
+        :param radius: Range of the neighborhood (must be > 0).
+        :param birth: Inclusive (low, high) count interval for birth.
+        :param survival: Inclusive (low, high) count interval for survival.
+        :param neighborhood: "M" (Moore) or "N" (von Neumann).
+        :param include_center: Count the cell itself (LtL "M1").
+        :raises RuleSetError: If the radius or neighborhood is invalid.
+        """
+        if radius <= 0:
+            raise RuleSetError(f"Range must be a positive integer, got {radius}")
+        neighborhood = neighborhood.upper()
+        if neighborhood not in NEIGHBORHOODS:
+            raise RuleSetError(
+                f"Unknown neighborhood: {neighborhood}. "
+                f"Available: {list(NEIGHBORHOODS)}"
+            )
+
+        self.radius = radius
+        self.birth = birth
+        self.survival = survival
+        self.neighborhood = neighborhood
+        self.include_center = include_center
+        self.__name__ = (
+            f"R{radius},C0,M{int(include_center)},"
+            f"S{survival[0]}..{survival[1]},B{birth[0]}..{birth[1]},N{neighborhood}"
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Number of cells in the neighborhood, without the cell itself.
+        """
+        r = self.radius
+        if self.neighborhood == "M":
+            return (2 * r + 1) ** 2 - 1
+        return 2 * r * (r + 1)
+
+    def __call__(self, is_alive: int, neighbors: int) -> int:
+        count = neighbors + is_alive if self.include_center else neighbors
+        low, high = self.survival if is_alive else self.birth
+        return 1 if low <= count <= high else 0
+
+    def __repr__(self) -> str:
+        return f"LargerThanLifeRule({self.__name__})"
+
+
+def is_range_rule(rule: RuleFunc) -> bool:
+    """
+    Return True if a rule needs more than the 3x3 Moore neighborhood
+    (a Larger than Life rule with range > 1 or a von Neumann shape).
+    """
+    return (
+        isinstance(rule, LargerThanLifeRule)
+        and (rule.radius > 1 or rule.neighborhood != "M")
+    )
+
 
 def ruleset(name: str) -> Callable[[RuleFunc], RuleFunc]:
     """
@@ -25,14 +138,197 @@ def ruleset(name: str) -> Callable[[RuleFunc], RuleFunc]:
 
     After decoration, the function is stored in RULESETS[name],
     so it can be retrieved later with get_ruleset(name).
+    The rule is also compiled into lookup tables right away (except
+    range rules, which have no 3x3 tables).
+
+    Larger than Life rules are registered by applying the decorator to
+    an instance:
+
+        ruleset("bosco")(LargerThanLifeRule(5, (34, 45), (34, 58), "M", True))
     """
     def decorator(func: RuleFunc) -> RuleFunc:
+        if not is_range_rule(func):
+            _compile(func)
         RULESETS[name] = func
         return func
 
     return decorator
 
 
+def _compile(rule: RuleFunc) -> Tuple[RuleTable, bytes]:
+    """
+    Evaluate a rule once for every input and cache the resulting tables.
+
+    :raises RuleSetError: If the rule returns something other than 0/1
+                          (or True/False), or is a range rule.
+    """
+    compiled = _COMPILED.get(rule)
+    if compiled is not None:
+        return compiled
+
+    if is_range_rule(rule):
+        raise RuleSetError(
+            f"Rule {getattr(rule, '__name__', rule)} does not use the 3x3 Moore "
+            f"neighborhood; run it with the 'ltl' engine"
+        )
+
+    rows = []
+    for is_alive in (0, 1):
+        row = []
+        for neighbors in range(9):
+            state = rule(is_alive, neighbors)
+            if state not in (0, 1):
+                raise RuleSetError(
+                    f"Rule {getattr(rule, '__name__', rule)} returned {state!r} "
+                    f"for (is_alive={is_alive}, neighbors={neighbors}); expected 0 or 1"
+                )
+            row.append(int(state))
+        rows.append(tuple(row))
+    table: RuleTable = (rows[0], rows[1])
+
+    # 512-entry table indexed by the 3x3 neighborhood as a 9-bit number.
+    # Bits 8-6 are the left column, 5-3 the middle and 2-0 the right
+    # column; inside a column the values are up=4, centre=2, down=1.
+    # The cell itself is therefore bit 4.
+    neighborhood = bytes(
+        table[(index >> 4) & 1][bin(index).count("1") - ((index >> 4) & 1)]
+        for index in range(512)
+    )
+
+    compiled = (table, neighborhood)
+    _COMPILED[rule] = compiled
+    return compiled
+
+
+def rule_table(rule: RuleFunc) -> RuleTable:
+    """
+    Return the compiled (state, neighbors) transition table of a rule.
+
+    Vectorized and bitwise engines cannot call a Python function per cell,
+    so they work from this table instead. Because a rule only ever sees
+    0/1 and 0-8, the table gives exactly the same results as the function.
+    The rule is evaluated only the first time; later calls are cached.
+
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :return: Table indexed as table[is_alive][neighbors].
+    """
+    return _compile(rule)[0]
+
+
+def neighborhood_table(rule: RuleFunc) -> bytes:
+    """
+    Return the compiled 512-entry 3x3 neighborhood table of a rule.
+
+    The index is built from three columns of three cells (see _compile),
+    which lets an engine slide a window along a row with a shift and an OR
+    instead of counting neighbors for every cell.
+
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :return: 512 bytes, each 0 or 1.
+    """
+    return _compile(rule)[1]
+
+
+def rulestring(rule: RuleFunc) -> str:
+    """
+    Return the canonical "B.../S..." rulestring of any rule.
+
+    :param rule: Rule function (is_alive, neighbors) -> 0 or 1.
+    :return: Rulestring, e.g. "B3/S23" for the classic rules
+             (Larger than Life rules use the R...,C0,M.,S..,B..,N. form).
+    """
+    if isinstance(rule, LargerThanLifeRule):
+        return rule.__name__
+    born, survive = rule_table(rule)
+    birth = "".join(str(n) for n in range(9) if born[n])
+    survival = "".join(str(n) for n in range(9) if survive[n])
+    return f"B{birth}/S{survival}"
+
+
+def _make_rule(birth: FrozenSet[int], survival: FrozenSet[int]) -> RuleFunc:
+    """
+    Create a rule function for the given birth and survival counts.
+    """
+    def rule(is_alive: int, neighbors: int) -> int:
+        if is_alive:
+            return 1 if neighbors in survival else 0
+        else:
+            return 1 if neighbors in birth else 0
+
+    return rule
+
+
+def parse_rulestring(text: str) -> RuleFunc:
+    """
+    Create a rule function from a Life-like rulestring.
+
+    Accepted forms (case-insensitive):
+        B36/S23   – birth on 3 or 6, survival on 2 or 3 (HighLife)
+        S23/B36   – same, survival first
+        23/36     – old "survival/birth" notation
+        R5,C0,M1,S34..58,B34..45,NM – Larger than Life (see LTL_RE)
+
+    :param text: Rulestring to parse.
+    :return: A rule function that can be used by the engine.
+             The same rulestring always returns the same function.
+    :raises RuleSetError: If the text is not a valid rulestring.
+    """
+    text = text.strip()
+
+    ltl_rule = _parse_ltl(text)
+    if ltl_rule is not None:
+        return ltl_rule
+
+    m = BS_RE.match(text)
+    if m:
+        birth_digits, survival_digits = m.group(1), m.group(2)
+    else:
+        m = SB_RE.match(text) or PLAIN_RE.match(text)
+        if not m:
+            raise RuleSetError(f"Invalid rulestring: {text}")
+        survival_digits, birth_digits = m.group(1), m.group(2)
+
+    birth = frozenset(int(d) for d in birth_digits)
+    survival = frozenset(int(d) for d in survival_digits)
+    canonical = (
+        "B" + "".join(str(n) for n in sorted(birth))
+        + "/S" + "".join(str(n) for n in sorted(survival))
+    )
+
+    rule = _PARSED.get(canonical)
+    if rule is None:
+        rule = _make_rule(birth, survival)
+        rule.__name__ = canonical
+        _compile(rule)
+        _PARSED[canonical] = rule
+    return rule
+
+
+def _parse_ltl(text: str) -> Optional[RuleFunc]:
+    """
+    Parse a Larger than Life rulestring (None if the text is not one).
+
+    :raises RuleSetError: If the rule has more than two states.
+    """
+    m = LTL_RE.match(text)
+    if not m:
+        return None
+
+    radius, states, center, s0, s1, b0, b1 = (int(g) for g in m.groups()[:7])
+    if states not in (0, 2):
+        raise RuleSetError(
+            f"Only two-state Larger than Life rules are supported, got C{states}"
+        )
+    rule = LargerThanLifeRule(
+        radius, (b0, b1), (s0, s1), m.group(8) or "M", bool(center)
+    )
+
+    cached = _PARSED.get(rule.__name__)
+    if cached is not None:
+        return cached
+    _PARSED[rule.__name__] = rule
+    return rule
+
 
 @ruleset("classic")
 def classic_rule(is_alive: int, neighbors: int) -> int:
@@ -63,17 +359,27 @@ def highlife_rule(is_alive: int, neighbors: int) -> int:
         return 1 if neighbors in (3, 6) else 0
 
 
+# Bosco's rule: range-5 Moore neighborhood, the classic LtL example
+ruleset("bosco")(LargerThanLifeRule(5, (34, 45), (34, 58), "M", include_center=True))
+
+
 def get_ruleset(name: str) -> RuleFunc:
     """
-    Retrieve a ruleset function by name.
+    Retrieve a ruleset function by name or by rulestring.
 
-    :param name: Name of the ruleset (e.g. "classic", "highlife").
+    :param name: Name of the ruleset (e.g. "classic", "highlife")
+                 or a rulestring (e.g. "B36/S23", "B3678/S34678",
+                 "R5,C0,M1,S34..58,B34..45,NM").
     :return: A rule function that can be used by the engine.
-    :raises RuleSetError: If the requested ruleset does not exist.
+    :raises RuleSetError: If the requested ruleset does not exist
+                          and the name is not a valid rulestring.
     """
     try:
         return RULESETS[name]
     except KeyError as e:
+        if "/" in name or LTL_RE.match(name.strip()):
+            return parse_rulestring(name)
         raise RuleSetError(
-            f"Unknown ruleset: {name}. Available rulesets: {list(RULESETS.keys())}"
+            f"Unknown ruleset: {name}. Available rulesets: {list(RULESETS.keys())} "
+            f"(or use a rulestring such as B3/S23)"
         ) from e
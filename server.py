@@ -0,0 +1,737 @@
+# server.py
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from board import Board
+from engine import get_engine, StepFunc
+from errors import GameOfLifeError, InvalidGridSizeError, SessionLimitError
+from patterns import load_pattern, parse_rle
+from rules import get_ruleset, RuleFunc
+from simlog import DELTA, KEYFRAME, pack_cells, unpack_cells
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Generations per second of a new session, and the allowed range
+DEFAULT_SPEED = 10.0
+MAX_SPEED = 1000.0
+
+# Limits that keep one client from exhausting the server
+MAX_SESSIONS = 64
+MAX_CELLS = 1 << 22
+MAX_BODY = 16 << 20
+
+# Boards with at least this many cells are stepped on a worker thread, so
+# the event loop keeps serving other sessions while a large step runs
+OFFLOAD_CELLS = 1 << 16
+
+# --- Stream frames (binary WebSocket messages) ---
+#
+#   kind        uint8   (KEYFRAME or DELTA, as in simlog.py)
+#   generation  uint64
+#   rows        uint32
+#   cols        uint32
+#   payload     zlib-compressed cells packed 8 per byte (keyframe), or
+#               the XOR of those with the previous frame sent to this
+#               subscriber (delta: one bit set per flipped cell)
+#
+# A delta costs the same whatever changed and compresses to almost
+# nothing when few cells flip.
+#
+# A subscriber first gets a keyframe. When it reads slower than the
+# simulation runs, the generations it missed are coalesced into one delta
+# against the last frame it received.
+STREAM_FRAME = struct.Struct("<BQII")
+
+# WebSocket (RFC 6455)
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_CONTINUATION, WS_TEXT, WS_BINARY = 0x0, 0x1, 0x2
+WS_CLOSE, WS_PING, WS_PONG = 0x8, 0x9, 0xA
+
+HTTP_REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large",
+    429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+
+def encode_frame(
+    generation: int, rows: int, cols: int, packed: bytes, previous: Optional[bytes]
+) -> bytes:
+    """
+    Encode one stream frame from packed cells (see pack_cells): a delta
+    against `previous` (the packed cells of the last frame sent to this
+    subscriber), or a keyframe when there is none or the size changed.
+    """
+    if previous is not None and len(previous) == len(packed):
+        kind, payload = DELTA, _xor(previous, packed)
+    else:
+        kind, payload = KEYFRAME, packed
+    return STREAM_FRAME.pack(kind, generation, rows, cols) + zlib.compress(payload, 1)
+
+
+def decode_frame(
+    data: bytes, previous: Optional[bytes]
+) -> Tuple[int, int, int, bytes]:
+    """
+    Decode a stream frame (for Python clients).
+
+    :param data: Binary WebSocket message.
+    :param previous: Cells of the previous frame (None before the first).
+    :return: (generation, rows, cols, cells), one byte per cell.
+    :raises ValueError: If a delta arrives without a previous frame.
+    """
+    kind, generation, rows, cols = STREAM_FRAME.unpack_from(data)
+    payload = zlib.decompress(data[STREAM_FRAME.size:])
+    if kind == DELTA:
+        if previous is None:
+            raise ValueError("Delta frame received before any keyframe")
+        payload = _xor(pack_cells(previous), payload)
+    return generation, rows, cols, unpack_cells(payload, rows * cols)
+
+
+class WebSocket:
+    """
+    Minimal server side of a WebSocket connection (RFC 6455): unmasked
+    frames out, masked frames in, no extensions.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    async def send(self, opcode: int, payload: bytes) -> None:
+        """
+        Send one frame. The frame is written with a single write() call,
+        so frames sent by different tasks never interleave.
+        """
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        self.writer.write(header + payload)
+        await self.writer.drain()
+
+    async def send_json(self, obj: Any) -> None:
+        await self.send(WS_TEXT, json.dumps(obj).encode("utf-8"))
+
+    async def receive(self) -> Optional[Tuple[int, bytes]]:
+        """
+        Return the next message as (opcode, payload); pings are answered
+        here. Returns None when the connection is closed.
+        """
+        message = bytearray()
+        message_opcode = None
+        while True:
+            try:
+                b0, b1 = await self.reader.readexactly(2)
+                length = b1 & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+                elif length == 127:
+                    (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+                if length > MAX_BODY:
+                    await self.close(1009)
+                    return None
+                mask = await self.reader.readexactly(4) if b1 & 0x80 else b""
+                payload = await self.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+
+            if mask:
+                key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+                payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+
+            opcode = b0 & 0x0F
+            if opcode == WS_CLOSE:
+                await self.close()
+                return None
+            if opcode == WS_PING:
+                await self.send(WS_PONG, payload)
+                continue
+            if opcode == WS_PONG:
+                continue
+
+            if opcode != WS_CONTINUATION:
+                message_opcode = opcode
+                message = bytearray()
+            message += payload
+            if b0 & 0x80 and message_opcode is not None:
+                return message_opcode, bytes(message)
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.send(WS_CLOSE, struct.pack("!H", code))
+        except ConnectionError:
+            pass
+        # No closing handshake wait: dropping the connection also ends a
+        # receive() still waiting for the client
+        self.writer.close()
+
+
+class Subscriber:
+    """
+    One stream of frames to a WebSocket client.
+
+    The simulation never waits for a subscriber: publishing only stores
+    the latest snapshot in the session and sets `wakeup`. The sender task
+    then encodes the newest snapshot against the last frame this client
+    received, so while a slow client is still reading, the generations
+    it misses are coalesced into the next delta.
+    """
+
+    def __init__(self, session: "Session", ws: WebSocket) -> None:
+        self.session = session
+        self.ws = ws
+        self.wakeup = asyncio.Event()
+        self.frames = 0
+        self.coalesced = 0
+        self._sent: Optional[bytes] = None
+        self._sent_generation: Optional[int] = None
+
+    async def run(self) -> None:
+        while not self.ws.closed:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            snapshot = self.session.snapshot
+            if snapshot is None:
+                continue
+
+            generation, rows, cols, packed = snapshot
+            if self._sent_generation is not None:
+                self.coalesced += max(generation - self._sent_generation - 1, 0)
+            frame = encode_frame(generation, rows, cols, packed, self._sent)
+            try:
+                await self.ws.send(WS_BINARY, frame)
+            except ConnectionError:
+                return
+            self._sent = packed
+            self._sent_generation = generation
+            self.frames += 1
+
+
+class Session:
+    """
+    One simulation: a board, its rule and engine, the speed in
+    generations per second and the subscribers of its stream.
+
+    Steps and edits are serialized with an asyncio.Lock, so a toggle
+    never races with a step running on a worker thread.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        board: Board,
+        ruleset_name: str = "classic",
+        engine_name: str = "python",
+        speed: float = DEFAULT_SPEED,
+    ) -> None:
+        self.id = session_id
+        self.board = board
+        self.generation = 0
+        self.ruleset_name = ruleset_name
+        self.rule = get_ruleset(ruleset_name)
+        self.engine_name = engine_name
+        self.step_func = get_engine(engine_name)
+        check_engine(self.step_func, self.rule)
+        self.speed = _check_speed(speed)
+        # Why the background run stopped, if it failed
+        self.error: Optional[str] = None
+        self.subscribers: List[Subscriber] = []
+        self.snapshot: Optional[Tuple[int, int, int, bytes]] = None
+        self.lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "rows": self.board.rows,
+            "cols": self.board.cols,
+            "generation": self.generation,
+            "ruleset": self.ruleset_name,
+            "engine": self.engine_name,
+            "speed": self.speed,
+            "running": self.running,
+            "error": self.error,
+            "population": self.board.to_bytes().count(1),
+            "subscribers": len(self.subscribers),
+        }
+
+    def publish(self) -> None:
+        """
+        Make the current board the latest snapshot and wake the senders.
+        The cells are packed once here, whatever the number of subscribers.
+        """
+        if not self.subscribers:
+            return
+        board = self.board
+        self.snapshot = (
+            self.generation, board.rows, board.cols, pack_cells(board.to_bytes())
+        )
+        for subscriber in self.subscribers:
+            subscriber.wakeup.set()
+
+    async def step(self, steps: int = 1) -> None:
+        """
+        Advance the board by `steps` generations.
+        """
+        for _ in range(steps):
+            async with self.lock:
+                board = self.board
+                if board.rows * board.cols >= OFFLOAD_CELLS:
+                    loop = asyncio.get_running_loop()
+                    board = await loop.run_in_executor(
+                        None, self.step_func, board, self.rule
+                    )
+                else:
+                    board = self.step_func(board, self.rule)
+                self.board = board
+                self.generation += 1
+            self.publish()
+            # Let other sessions and connections run between generations
+            await asyncio.sleep(0)
+
+    async def _run(self) -> None:
+        next_time = time.monotonic()
+        while True:
+            try:
+                await self.step()
+            except Exception as e:
+                # Keep the reason for info(); the task just ends
+                self.error = f"{type(e).__name__}: {e}"
+                return
+            next_time += 1 / self.speed
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Too slow for the requested speed: do not try to catch up
+                next_time = time.monotonic()
+
+    def start(self) -> None:
+        if not self.running:
+            self.error = None
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def set_cells(self, cells: List[List[int]], alive: Optional[bool]) -> None:
+        """
+        Set (alive True/False) or toggle (alive None) a list of [row, col].
+        All cells are checked first, so a rejected request changes nothing.
+
+        :raises IndexError: If a cell is outside the board.
+        :raises ValueError: If a cell is not a [row, col] pair of integers.
+        """
+        async with self.lock:
+            board = self.board
+            for cell in cells:
+                if len(cell) != 2 or not all(type(v) is int for v in cell):
+                    raise ValueError(f"Cell must be [row, col] integers, got {cell}")
+                row, col = cell
+                if not (0 <= row < board.rows and 0 <= col < board.cols):
+                    raise IndexError(
+                        f"Cell ({row}, {col}) is out of bounds for board "
+                        f"{board.rows}x{board.cols}"
+                    )
+            for row, col in cells:
+                state = alive if alive is not None else not board.get_cell(row, col)
+                board.set_cell(row, col, state)
+        self.publish()
+
+    async def replace_board(self, board: Board) -> None:
+        async with self.lock:
+            self.board = board
+            self.generation = 0
+        self.publish()
+
+    async def clear(self) -> None:
+        async with self.lock:
+            self.board.clear()
+        self.publish()
+
+
+def check_engine(step_func: StepFunc, rule: RuleFunc) -> None:
+    """
+    Check that an engine can step a rule (e.g. Larger than Life rules
+    need the ltl engine) by stepping a throwaway 1x1 board.
+
+    :raises GameOfLifeError: (RuleSetError or EngineError) if it cannot.
+    """
+    step_func(Board(1, 1), rule)
+
+
+def _check_speed(speed: Any) -> float:
+    speed = float(speed)
+    if not 0 < speed <= MAX_SPEED:
+        raise ValueError(f"Speed must be between 0 and {MAX_SPEED}, got {speed}")
+    return speed
+
+
+def board_from_params(params: Dict[str, Any]) -> Board:
+    """
+    Build a board from request parameters: "pattern" (file path on the
+    server), "rle" (RLE text) or "rows" and "cols" (empty board), with an
+    optional "margin" of dead cells around a pattern.
+
+    :raises InvalidGridSizeError: If the board exceeds MAX_CELLS.
+    """
+    margin = int(params.get("margin", 0))
+    # The loaders check the size (header plus margin) before allocating
+    if "pattern" in params:
+        board = load_pattern(params["pattern"], margin=margin, max_cells=MAX_CELLS)
+    elif "rle" in params:
+        board = parse_rle(params["rle"], margin=margin, max_cells=MAX_CELLS)
+    else:
+        rows, cols = int(params.get("rows", 64)), int(params.get("cols", 64))
+        if rows * cols > MAX_CELLS:
+            raise InvalidGridSizeError(
+                f"Board {rows}x{cols} exceeds the server limit of {MAX_CELLS} cells"
+            )
+        board = Board(rows, cols)
+    return board
+
+
+class SimulationServer:
+    """
+    asyncio HTTP + WebSocket server holding many simulation sessions.
+
+    HTTP (JSON bodies and responses):
+        GET    /sessions               list sessions
+        POST   /sessions               create one (see board_from_params,
+                                       plus "ruleset", "engine", "speed",
+                                       "running")
+        GET    /sessions/<id>          session info
+        POST   /sessions/<id>          run a command (see command())
+        DELETE /sessions/<id>          stop and remove the session
+        GET    /sessions/<id>/stream   WebSocket: binary stream frames
+                                       out, JSON commands in
+
+    Only meant for localhost: there is no authentication, and "pattern"
+    reads files on the server.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS) -> None:
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Session] = {}
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set["asyncio.Task[None]"] = set()
+
+    # --- Sessions and commands ---
+
+    async def create_session(self, params: Dict[str, Any]) -> Session:
+        if len(self.sessions) >= self.max_sessions:
+            raise SessionLimitError(f"Session limit reached ({self.max_sessions})")
+        session = Session(
+            str(next(self._ids)),
+            board_from_params(params),
+            ruleset_name=params.get("ruleset", "classic"),
+            engine_name=params.get("engine", "python"),
+            speed=params.get("speed", DEFAULT_SPEED),
+        )
+        self.sessions[session.id] = session
+        if params.get("running"):
+            session.start()
+        return session
+
+    def remove_session(self, session_id: str) -> None:
+        session = self.sessions.pop(session_id)
+        session.stop()
+        for subscriber in session.subscribers:
+            subscriber.wakeup.set()
+            asyncio.ensure_future(subscriber.ws.close(1001))
+
+    async def command(self, session: Session, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply one command to a session and return its info.
+
+        {"op": "start"} / {"op": "stop"}
+        {"op": "step", "steps": n}
+        {"op": "speed", "speed": generations per second}
+        {"op": "rule", "ruleset": name or rulestring}
+        {"op": "engine", "engine": name}
+        {"op": "toggle", "cells": [[row, col], ...]}
+        {"op": "set", "cells": [[row, col], ...], "alive": true/false}
+        {"op": "clear"}
+        {"op": "load", ...board parameters, see board_from_params}
+
+        :raises ValueError: If the command is unknown or malformed.
+        """
+        op = params.get("op")
+        if op == "start":
+            session.start()
+        elif op == "stop":
+            session.stop()
+        elif op == "step":
+            await session.step(int(params.get("steps", 1)))
+        elif op == "speed":
+            session.speed = _check_speed(params["speed"])
+        elif op == "rule":
+            rule = get_ruleset(params["ruleset"])
+            check_engine(session.step_func, rule)
+            session.rule = rule
+            session.ruleset_name = params["ruleset"]
+        elif op == "engine":
+            step_func = get_engine(params["engine"])
+            check_engine(step_func, session.rule)
+            session.step_func = step_func
+            session.engine_name = params["engine"]
+        elif op in ("toggle", "set"):
+            alive = bool(params.get("alive", True)) if op == "set" else None
+            await session.set_cells(params["cells"], alive)
+        elif op == "clear":
+            await session.clear()
+        elif op == "load":
+            await session.replace_board(board_from_params(params))
+        else:
+            raise ValueError(f"Unknown command: {op!r}")
+        return session.info()
+
+    # --- HTTP ---
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serve one connection: a single HTTP request, or a WebSocket.
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            method, path, headers, body = request
+            parts = [p for p in path.split("?")[0].split("/") if p]
+
+            if (
+                len(parts) == 3 and parts[0] == "sessions" and parts[2] == "stream"
+                and headers.get("upgrade", "").lower() == "websocket"
+            ):
+                await self._stream(parts[1], headers, reader, writer)
+                return
+
+            status, result = await self._route(method, parts, body)
+            _respond(writer, status, result)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._connections.discard(task)
+
+    async def _route(
+        self, method: str, parts: List[str], body: bytes
+    ) -> Tuple[int, Any]:
+        try:
+            params = json.loads(body) if body else {}
+            if not isinstance(params, dict):
+                raise ValueError("Request body must be a JSON object")
+
+            if parts == ["sessions"]:
+                if method == "GET":
+                    return 200, [s.info() for s in self.sessions.values()]
+                if method == "POST":
+                    return 201, (await self.create_session(params)).info()
+                return 405, {"error": f"{method} not allowed"}
+
+            if len(parts) == 2 and parts[0] == "sessions":
+                session = self.sessions.get(parts[1])
+                if session is None:
+                    return 404, {"error": f"No session {parts[1]}"}
+                if method == "GET":
+                    return 200, session.info()
+                if method == "POST":
+                    return 200, await self.command(session, params)
+                if method == "DELETE":
+                    self.remove_session(session.id)
+                    return 200, {"deleted": session.id}
+                return 405, {"error": f"{method} not allowed"}
+
+            return 404, {"error": "Not found"}
+        except SessionLimitError as e:
+            return 429, {"error": str(e)}
+        except (
+            GameOfLifeError, ValueError, KeyError, TypeError, IndexError,
+            OverflowError,
+        ) as e:
+            return 400, {"error": str(e)}
+
+    # --- WebSocket ---
+
+    async def _stream(
+        self,
+        session_id: str,
+        headers: Dict[str, str],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        session = self.sessions.get(session_id)
+        key = headers.get("sec-websocket-key")
+        if session is None or key is None:
+            _respond(writer, 404, {"error": f"No session {session_id}"})
+            await writer.drain()
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+        ).decode("ascii")
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            + f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+
+        ws = WebSocket(reader, writer)
+        subscriber = Subscriber(session, ws)
+        session.subscribers.append(subscriber)
+        sender = asyncio.ensure_future(subscriber.run())
+        # First frame: the current board as a keyframe
+        session.publish()
+        try:
+            while True:
+                message = await ws.receive()
+                if message is None:
+                    break
+                opcode, payload = message
+                if opcode != WS_TEXT:
+                    continue
+                try:
+                    params = json.loads(payload)
+                    if not isinstance(params, dict):
+                        raise ValueError("Command must be a JSON object")
+                    reply: Any = await self.command(session, params)
+                except (GameOfLifeError, ValueError, KeyError, TypeError,
+                        IndexError) as e:
+                    reply = {"error": str(e)}
+                await ws.send_json(reply)
+        finally:
+            sender.cancel()
+            if subscriber in session.subscribers:
+                session.subscribers.remove(subscriber)
+            await ws.close()
+
+    # --- Running ---
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> int:
+        """
+        Start listening; return the port (useful with port=0).
+        """
+        self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        for session_id in list(self.sessions):
+            self.remove_session(session_id)
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """
+    Read one HTTP/1.1 request: (method, path, lower-case headers, body).
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY:
+        return None
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _respond(writer: asyncio.StreamWriter, status: int, result: Any) -> None:
+    body = json.dumps(result).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode("ascii")
+        + body
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point, e.g.:
+
+        python main.py serve --port 8765
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py serve", description="Local Game of Life simulation server"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    args = parser.parse_args(argv)
+
+    async def serve() -> None:
+        server = SimulationServer(args.max_sessions)
+        port = await server.start(args.host, args.port)
+        print(f"Serving on http://{args.host}:{port}/sessions (Ctrl+C to stop)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,611 @@
+# simlog.py
+
+import lzma
+import os
+import queue
+import re
+import struct
+import threading
+import zlib
+from typing import (
+    TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+)
+
+from board import Board, format_generation
+from errors import LogFormatError
+
+if TYPE_CHECKING:
+    from archive import ArchiveWriter
+
+# Supported values for run_simulation(log_format=...)
+LOG_FORMATS = ("text", "binary", "archive")
+
+# Backpressure policies of AsyncLogWriter
+LOG_POLICIES = ("block", "drop", "sample")
+
+# Default number of snapshots waiting for the writer thread
+DEFAULT_QUEUE_SIZE = 64
+
+# --- Binary log layout ---
+#
+# Header:
+#   magic      6 bytes  b"GOLLOG"
+#   version    uint8
+#   compress   uint8    (0 = none, 1 = zlib, 2 = lzma)
+#   rows       uint32
+#   cols       uint32
+#   keyframe   uint32   (a full frame is written every `keyframe` frames)
+#   rule_len   uint16, followed by the ruleset name (UTF-8)
+#
+# Frame:
+#   kind        uint8   (0 = keyframe, 1 = delta)
+#   generation  uint64
+#   length      uint32, followed by the (possibly compressed) payload
+#
+# Keyframe payload: all cells packed 8 per byte, row-major, most
+# significant bit first. Delta payload: the indices of the cells that
+# flipped since the previous frame, as varint-encoded gaps.
+
+MAGIC = b"GOLLOG"
+VERSION = 1
+HEADER = struct.Struct("<6sBBIIIH")
+FRAME = struct.Struct("<BQI")
+
+KEYFRAME = 0
+DELTA = 1
+
+COMPRESSIONS = {None: 0, "zlib": 1, "lzma": 2}
+
+# Default number of frames between two keyframes
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+_CELLS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGITS_TO_CELLS = bytes.maketrans(b"01", b"\x00\x01")
+_NONZERO_RE = re.compile(rb"[^\x00]")
+
+
+def pack_cells(cells: bytes) -> bytes:
+    """
+    Pack one-byte-per-cell data into bits (8 cells per byte, MSB first).
+    """
+    if not cells:
+        return b""
+    padding = -len(cells) % 8
+    digits = cells.translate(_CELLS_TO_DIGITS) + b"0" * padding
+    return int(digits, 2).to_bytes((len(cells) + padding) // 8, "big")
+
+
+def unpack_cells(data: bytes, count: int) -> bytes:
+    """
+    Unpack bits produced by pack_cells back into `count` cell bytes.
+    """
+    if count == 0:
+        return b""
+    digits = format(int.from_bytes(data, "big"), f"0{len(data) * 8}b")
+    return digits.encode("ascii").translate(_DIGITS_TO_CELLS)[:count]
+
+
+def changed_cells(old: bytes, new: bytes) -> List[int]:
+    """
+    Return the indices of the cells that differ between two snapshots.
+    """
+    diff = int.from_bytes(old, "big") ^ int.from_bytes(new, "big")
+    diff_bytes = diff.to_bytes(len(new), "big")
+    return [m.start() for m in _NONZERO_RE.finditer(diff_bytes)]
+
+
+def encode_indices(indices: List[int]) -> bytes:
+    """
+    Encode increasing indices as varint gaps (LEB128, 7 bits per byte).
+    """
+    out = bytearray()
+    previous = -1
+    for index in indices:
+        gap = index - previous - 1
+        previous = index
+        while gap >= 0x80:
+            out.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return bytes(out)
+
+
+def decode_indices(data: bytes) -> Iterator[int]:
+    """
+    Decode varint gaps produced by encode_indices.
+    """
+    previous = -1
+    gap = 0
+    shift = 0
+    for byte in data:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += gap + 1
+        yield previous
+        gap = 0
+        shift = 0
+
+
+def truncate_log(filepath: str, offset: int) -> None:
+    """
+    Cut a log file back to `offset` bytes, dropping everything written
+    after a checkpoint (see checkpoint.py).
+
+    :raises LogFormatError: If the file is missing or shorter than offset.
+    """
+    try:
+        size = os.path.getsize(filepath)
+    except OSError as e:
+        raise LogFormatError(f"Cannot resume log {filepath}: {e}") from e
+    if size < offset:
+        raise LogFormatError(
+            f"Cannot resume log {filepath}: it has {size} bytes, "
+            f"the checkpoint expects at least {offset}"
+        )
+    os.truncate(filepath, offset)
+
+
+def sync_state(f: Any, generation: int) -> Dict[str, Any]:
+    """
+    Flush a writer's file to disk and return its resume state:
+    the file offset and the last generation written (-1 if none).
+    """
+    f.flush()
+    os.fsync(f.fileno())
+    return {"offset": f.tell(), "generation": generation}
+
+
+def _compress(kind: int, data: bytes) -> bytes:
+    if kind == 1:
+        return zlib.compress(data)
+    if kind == 2:
+        return lzma.compress(data)
+    return data
+
+
+def _decompress(kind: int, data: bytes) -> bytes:
+    if kind == 1:
+        return zlib.decompress(data)
+    if kind == 2:
+        return lzma.decompress(data)
+    return data
+
+
+class TextLogWriter:
+    """
+    Appends generations to a text log (the save_to_file format)
+    through one open, buffered file handle.
+    """
+
+    def __init__(
+        self, filepath: str, resume: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        :param filepath: Path to the log file (appended to).
+        :param resume: State from checkpoint_state(): the file is first
+                       truncated to the checkpointed offset.
+        """
+        self.filepath = filepath
+        self.generation = -1
+        if resume is not None:
+            truncate_log(filepath, resume["offset"])
+            self.generation = resume["generation"]
+        self._file = open(filepath, "a", encoding="utf-8")
+
+    def write(self, board: Board, generation: int) -> None:
+        """
+        Append one generation.
+        """
+        self.write_frame(generation, board.cols, board.to_bytes())
+
+    def write_frame(self, generation: int, cols: int, cells: bytes) -> None:
+        """
+        Append one generation given as a cell snapshot (see Board.to_bytes).
+        """
+        self._file.write(format_generation(generation, cols, cells))
+        self.generation = generation
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush the log to disk and return the state needed to resume it.
+        """
+        return sync_state(self._file, self.generation)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class BinaryLogWriter:
+    """
+    Writes generations to a compact binary log.
+
+    A keyframe (all cells, bit-packed) is written every
+    `keyframe_interval` frames; the frames in between only list the cells
+    that flipped. A delta is replaced by a keyframe when it would be
+    larger. The file is overwritten, not appended to.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        rows: int,
+        cols: int,
+        ruleset_name: str,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        compression: Optional[str] = None,
+        resume: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param filepath: Path to the output file.
+        :param rows: Number of rows of the logged board.
+        :param cols: Number of columns of the logged board.
+        :param ruleset_name: Ruleset name stored in the header.
+        :param keyframe_interval: Frames between two keyframes (must be > 0).
+        :param compression: None, "zlib" or "lzma" (applied to every frame).
+        :param resume: State from checkpoint_state(), plus "previous": the
+                       cells of that last logged generation (or None, then
+                       the next frame is a keyframe). The existing file is
+                       truncated and appended to instead of overwritten.
+        :raises LogFormatError: If the compression or interval is invalid.
+        """
+        if compression not in COMPRESSIONS:
+            raise LogFormatError(
+                f"Unknown compression: {compression}. Available: {list(COMPRESSIONS)}"
+            )
+        if keyframe_interval <= 0:
+            raise LogFormatError(
+                f"Keyframe interval must be positive, got {keyframe_interval}"
+            )
+
+        self.filepath = filepath
+        self.rows = rows
+        self.cols = cols
+        self.keyframe_interval = keyframe_interval
+        self._compression = COMPRESSIONS[compression]
+        self._previous: Optional[bytes] = None
+        self._frames_since_key = 0
+        self.generation = -1
+
+        if resume is not None:
+            truncate_log(filepath, resume["offset"])
+            self._file: BinaryIO = open(filepath, "ab")
+            self._previous = resume.get("previous")
+            self._frames_since_key = resume["frames_since_key"]
+            self.generation = resume["generation"]
+            return
+
+        rule = ruleset_name.encode("utf-8")
+        self._file = open(filepath, "wb")
+        self._file.write(HEADER.pack(
+            MAGIC, VERSION, self._compression, rows, cols, keyframe_interval, len(rule)
+        ))
+        self._file.write(rule)
+
+    def write(self, board: Board, generation: int) -> None:
+        """
+        Append one generation.
+        """
+        self.write_frame(generation, board.cols, board.to_bytes())
+
+    def write_frame(self, generation: int, cols: int, cells: bytes) -> None:
+        """
+        Append one generation given as a cell snapshot (see Board.to_bytes).
+        """
+        if len(cells) != self.rows * self.cols:
+            raise LogFormatError(
+                f"Frame has {len(cells)} cells, log expects {self.rows}x{self.cols}"
+            )
+
+        kind = KEYFRAME
+        payload = b""
+        due_keyframe = self._frames_since_key >= self.keyframe_interval
+        if self._previous is not None and not due_keyframe:
+            payload = encode_indices(changed_cells(self._previous, cells))
+            kind = DELTA
+            if len(payload) * 8 > len(cells):
+                # Too many changes: a keyframe is smaller
+                kind = KEYFRAME
+
+        if kind == KEYFRAME:
+            payload = pack_cells(cells)
+            self._frames_since_key = 1
+        else:
+            self._frames_since_key += 1
+
+        payload = _compress(self._compression, payload)
+        self._file.write(FRAME.pack(kind, generation, len(payload)))
+        self._file.write(payload)
+        self._previous = cells
+        self.generation = generation
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Flush the log to disk and return the state needed to resume it.
+        """
+        state = sync_state(self._file, self.generation)
+        state["frames_since_key"] = self._frames_since_key
+        return state
+
+    def close(self) -> None:
+        self._file.close()
+
+
+LogWriter = Union[TextLogWriter, BinaryLogWriter, "ArchiveWriter"]
+
+
+def open_log(
+    filepath: str,
+    log_format: str,
+    board: Board,
+    ruleset_name: str,
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    compression: Optional[str] = None,
+    resume: Optional[Dict[str, Any]] = None,
+) -> LogWriter:
+    """
+    Open a log writer for a simulation of the given board.
+
+    :param filepath: Path to the log file.
+    :param log_format: "text" (appends, save_to_file format), "binary"
+                       or "archive" (fixed-size frames, see archive.py).
+    :param board: Initial board (gives the dimensions).
+    :param ruleset_name: Ruleset name (stored in binary logs).
+    :param keyframe_interval: Binary logs only, see BinaryLogWriter.
+    :param compression: Binary logs only: None, "zlib" or "lzma".
+    :param resume: Continue an existing log from a checkpoint instead of
+                   starting a new one (the writer's checkpoint_state()).
+    :raises LogFormatError: If the format is unknown.
+    """
+    if log_format == "text":
+        return TextLogWriter(filepath, resume=resume)
+    if log_format == "binary":
+        return BinaryLogWriter(
+            filepath, board.rows, board.cols, ruleset_name,
+            keyframe_interval=keyframe_interval, compression=compression,
+            resume=resume,
+        )
+    if log_format == "archive":
+        # Imported here because archive.py uses the packing helpers above
+        from archive import ArchiveWriter
+        return ArchiveWriter(
+            filepath, board.rows, board.cols, ruleset_name, resume=resume
+        )
+    raise LogFormatError(
+        f"Unknown log format: {log_format}. Available: {list(LOG_FORMATS)}"
+    )
+
+
+class AsyncLogWriter:
+    """
+    Runs a log writer on a background thread.
+
+    The simulation loop only takes an immutable snapshot of the board
+    (Board.to_bytes) and puts it into a bounded queue; formatting,
+    compression and disk I/O happen on the writer thread.
+
+    Backpressure policies (what write() does when the queue is full):
+        - "block":  wait for the writer thread (nothing is ever dropped,
+                    so the log is byte-identical to the synchronous one)
+        - "drop":   skip the generation
+        - "sample": only log every `sample_every`-th generation (blocking)
+
+    The last generation passed to write() is always logged, even if it
+    was dropped or not sampled. Errors raised on the writer thread are
+    re-raised by the next write() or by close().
+    """
+
+    _STOP = None
+
+    def __init__(
+        self,
+        writer: LogWriter,
+        policy: str = "block",
+        sample_every: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        """
+        :param writer: Synchronous writer that does the actual writing.
+        :param policy: "block", "drop" or "sample".
+        :param sample_every: Log every N-th generation (policy "sample").
+        :param queue_size: Maximum number of snapshots waiting to be written.
+        :raises LogFormatError: If the policy or sample_every is invalid.
+        """
+        if policy not in LOG_POLICIES:
+            raise LogFormatError(
+                f"Unknown log policy: {policy}. Available: {list(LOG_POLICIES)}"
+            )
+        if sample_every <= 0:
+            raise LogFormatError(f"sample_every must be positive, got {sample_every}")
+
+        self.writer = writer
+        self.policy = policy
+        self.sample_every = sample_every
+        self.dropped = 0
+
+        self._queue: "queue.Queue[Optional[Tuple[int, int, bytes]]]" = queue.Queue(
+            maxsize=queue_size
+        )
+        # Last snapshot that was not queued (to be written on close)
+        self._skipped: Optional[Tuple[int, int, bytes]] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name="simulation-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                if self._error is None:
+                    # After an error, keep draining so the simulation
+                    # never blocks forever on a full queue
+                    self.writer.write_frame(*item)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise LogFormatError(f"Log writer failed: {self._error}") from self._error
+
+    def write(self, board: Board, generation: int) -> None:
+        """
+        Hand one generation to the writer thread.
+        """
+        self._raise_error()
+        item = (generation, board.cols, board.to_bytes())
+
+        if self.policy == "sample" and generation % self.sample_every != 0:
+            self._skipped = item
+            return
+
+        if self.policy == "drop":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._skipped = item
+                self.dropped += 1
+                return
+        else:
+            self._queue.put(item)
+        self._skipped = None
+
+    def flush(self) -> None:
+        """
+        Wait until everything queued so far has been written and flushed.
+        """
+        self._queue.join()
+        self.writer.flush()
+        self._raise_error()
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Wait for the queue to drain, then return the wrapped writer's
+        resume state. A generation that was dropped or not sampled is
+        not in the log; the state records the last one that is.
+        """
+        self._queue.join()
+        self._raise_error()
+        return self.writer.checkpoint_state()
+
+    def close(self) -> None:
+        """
+        Write the pending last generation, stop the thread and close the log.
+
+        :raises LogFormatError: If writing failed on the writer thread.
+        """
+        if self._skipped is not None:
+            self._queue.put(self._skipped)
+            self._skipped = None
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self.writer.close()
+        self._raise_error()
+
+
+class BinaryLogReader:
+    """
+    Reads a binary log written by BinaryLogWriter.
+
+    Iterating yields (generation, cells) pairs, where cells is the
+    row-major one-byte-per-cell snapshot (see Board.to_bytes).
+    """
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Open the log and read its header.
+
+        :raises LogFormatError: If the file is not a binary simulation log.
+        """
+        self.filepath = filepath
+        with open(filepath, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise LogFormatError(
+                    f"File is too short to be a binary log: {filepath}"
+                )
+
+            (magic, version, compression,
+             rows, cols, keyframe, rule_len) = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise LogFormatError(f"Not a binary simulation log: {filepath}")
+            if version != VERSION:
+                raise LogFormatError(f"Unsupported binary log version: {version}")
+
+            self.ruleset_name = f.read(rule_len).decode("utf-8")
+            self._data_offset = f.tell()
+
+        self.rows = rows
+        self.cols = cols
+        self.keyframe_interval = keyframe
+        self._compression = compression
+
+    def __iter__(self) -> Iterator[Tuple[int, bytes]]:
+        count = self.rows * self.cols
+        cells: Optional[bytearray] = None
+
+        with open(self.filepath, "rb") as f:
+            f.seek(self._data_offset)
+            while True:
+                frame = f.read(FRAME.size)
+                if not frame:
+                    return
+                if len(frame) < FRAME.size:
+                    raise LogFormatError("Truncated frame header in binary log")
+
+                kind, generation, length = FRAME.unpack(frame)
+                payload = f.read(length)
+                if len(payload) < length:
+                    raise LogFormatError(f"Truncated frame for generation {generation}")
+                payload = _decompress(self._compression, payload)
+
+                if kind == KEYFRAME:
+                    cells = bytearray(unpack_cells(payload, count))
+                elif kind == DELTA and cells is not None:
+                    for index in decode_indices(payload):
+                        cells[index] ^= 1
+                else:
+                    raise LogFormatError(f"Invalid frame for generation {generation}")
+
+                yield generation, bytes(cells)
+
+    def boards(self) -> Iterator[Tuple[int, Board]]:
+        """
+        Iterate over (generation, Board) pairs.
+        """
+        for generation, cells in self:
+            yield generation, Board.from_bytes(self.rows, self.cols, cells)
+
+
+def binary_log_to_text(src: str, dst: str) -> None:
+    """
+    Convert a binary log into the text format ("--- Generation N ---").
+
+    :param src: Path to the binary log.
+    :param dst: Path of the text log to create (overwritten).
+    """
+    reader = BinaryLogReader(src)
+    with open(dst, "w", encoding="utf-8") as f:
+        for generation, cells in reader:
+            f.write(format_generation(generation, reader.cols, cells))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python simlog.py <binary log> <text log>")
+        sys.exit(1)
+    binary_log_to_text(sys.argv[1], sys.argv[2])
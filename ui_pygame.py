@@ -1,99 +1,538 @@
 # ui_pygame.py
 
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
 import pygame
 
-from board import Board
-from engine import next_generation
+from board import Board, BoardHistory
+from engine import DoubleBuffer, get_engine, next_generation
 from rules import get_ruleset
 
+try:
+    # Vectorized "any alive" / density of each block when zoomed out
+    # (every cell of blocks up to LOD_EXACT_BLOCK cells wide)
+    import numpy as np
+except ImportError:
+    np = None
+
 
-# Size of one cell in pixels
+# Size of one cell in pixels (initial zoom, if the board fits the window)
 CELL_SIZE = 20
 
+# Largest window size in pixels; bigger boards are shown through the viewport
+WINDOW_SIZE = (1280, 800)
+
+# Zoom levels in pixels per cell. Levels below 1 show one pixel per
+# block of 1/level x 1/level cells (level of detail).
+ZOOM_LEVELS = (
+    1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 4, 6, 8, 12, 16, 20, 28, 40,
+)
+
+# When zoomed out, blocks of up to LOD_EXACT_BLOCK x LOD_EXACT_BLOCK cells
+# are reduced exactly, so no live cell is ever hidden (every zoom level in
+# ZOOM_LEVELS). Larger blocks read only LOD_SAMPLES x LOD_SAMPLES cells, so
+# the cost of a frame stays bounded by the window size.
+LOD_EXACT_BLOCK = 32
+LOD_SAMPLES = 4
+
 # Colors (R, G, B)
 BG_COLOR = (10, 10, 10)
 GRID_COLOR = (40, 40, 40)
 ALIVE_COLOR = (0, 200, 0)
 DEAD_COLOR = BG_COLOR
+# Area of the window outside the board
+OUTSIDE_COLOR = (30, 30, 40)
+
+# Palette of the 8-bit board image: index 0 is dead, 255 alive and the
+# values in between are used for the density of zoomed-out blocks
+PALETTE = [
+    tuple(d + (a - d) * i // 255 for d, a in zip(DEAD_COLOR, ALIVE_COLOR))
+    for i in range(256)
+]
+
+# Board cells (0/1) -> palette indices (0/255)
+_CELLS_TO_PIXELS = bytes.maketrans(b"\x00\x01", b"\x00\xff")
+
+# Grid lines are only drawn when cells are at least this many pixels wide
+GRID_MIN_CELL_SIZE = 4
+
+# Color used as the transparent color key of the grid-line overlay
+_OVERLAY_KEY = (255, 0, 255)
+
+# Frames drawn per second (rendering clock)
+FPS = 60
+
+# Generations simulated per second when the simulation is running
+# (simulation clock, independent of FPS; changed with +/-)
+SIM_RATE = 10
+MIN_SIM_RATE = 1
+MAX_SIM_RATE = 10_000
+
+# Share of a frame that may be spent stepping, so the window stays
+# responsive when the engine cannot keep up with the simulation rate
+STEP_BUDGET = 0.8 / FPS
+
+# Number of previous generations kept for undo (LEFT arrow), limited so
+# that the history never holds more than UNDO_MAX_CELLS cells
+UNDO_DEPTH = 100
+UNDO_MAX_CELLS = 10_000_000
+
+
+class Viewport:
+    """
+    Maps between screen pixels and board cells.
+
+    `x`, `y` are the board coordinates (in cells, fractional) of the
+    top-left pixel of the window and `zoom` is one of ZOOM_LEVELS
+    (pixels per cell). When the board is smaller than the window it is
+    centred.
+    """
+
+    def __init__(
+        self, rows: int, cols: int, width: int, height: int, zoom: float
+    ) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.height = height
+        self.zoom = zoom
+        self.x = 0.0
+        self.y = 0.0
+        self._clamp()
+
+    @property
+    def block(self) -> int:
+        """
+        Number of cells per pixel side when zoomed out (1 otherwise).
+        """
+        return 1 if self.zoom >= 1 else round(1 / self.zoom)
+
+    @property
+    def state(self) -> Tuple[float, float, float]:
+        """
+        Hashable (x, y, zoom), to detect viewport changes.
+        """
+        return (self.x, self.y, self.zoom)
+
+    def screen_to_cell(self, px: int, py: int) -> Tuple[int, int]:
+        """
+        Return the (row, col) of the cell under a screen pixel
+        (may be outside the board).
+        """
+        return (
+            math.floor(self.y + py / self.zoom),
+            math.floor(self.x + px / self.zoom),
+        )
+
+    def pan(self, dx: int, dy: int) -> None:
+        """
+        Move the view by a number of screen pixels (e.g. a mouse drag).
+        """
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+        self._clamp()
+
+    def zoom_at(self, steps: int, px: int, py: int) -> None:
+        """
+        Zoom in (steps > 0) or out (steps < 0) by whole zoom levels,
+        keeping the cell under the screen pixel (px, py) in place.
+        """
+        level = _nearest_level(self.zoom) + steps
+        level = min(max(level, 0), len(ZOOM_LEVELS) - 1)
+        anchor_x = self.x + px / self.zoom
+        anchor_y = self.y + py / self.zoom
+        self.zoom = ZOOM_LEVELS[level]
+        self.x = anchor_x - px / self.zoom
+        self.y = anchor_y - py / self.zoom
+        self._clamp()
+
+    def fit(self) -> None:
+        """
+        Zoom out (or in, up to CELL_SIZE) until the whole board is visible.
+        """
+        self.zoom = fit_zoom(self.rows, self.cols, self.width, self.height)
+        self.x = self.y = 0.0
+        self._clamp()
+
+    def _clamp(self) -> None:
+        view_w = self.width / self.zoom
+        view_h = self.height / self.zoom
+        self.x = _clamp_axis(self.x, self.cols, view_w)
+        self.y = _clamp_axis(self.y, self.rows, view_h)
+        if self.zoom < 1:
+            # Align to whole blocks so the downsampled image does not shimmer
+            block = self.block
+            self.x = math.floor(self.x / block) * block
+            self.y = math.floor(self.y / block) * block
+
+
+def _clamp_axis(pos: float, size: int, view: float) -> float:
+    """
+    Keep one axis of the view on the board (centred if the board is smaller).
+    """
+    if size <= view:
+        return (size - view) / 2
+    return min(max(pos, 0.0), size - view)
+
+
+def _nearest_level(zoom: float) -> int:
+    return min(range(len(ZOOM_LEVELS)), key=lambda i: abs(ZOOM_LEVELS[i] - zoom))
+
+
+def fit_zoom(rows: int, cols: int, width: int, height: int) -> float:
+    """
+    Return the largest zoom level (at most CELL_SIZE) that shows the
+    whole board in a window of the given size.
+    """
+    best = ZOOM_LEVELS[0]
+    for level in ZOOM_LEVELS:
+        if level <= CELL_SIZE and cols * level <= width and rows * level <= height:
+            best = level
+    return best
+
+
+class GridRenderer:
+    """
+    Draws the visible part of a board through an 8-bit palette image.
 
-# Frames per second when simulation is running
-FPS = 10
+    Each frame only the cells inside the viewport are read and turned into
+    one byte per image pixel: at zoom >= 1 one pixel per cell, scaled up
+    with pygame.transform.scale; when zoomed out one pixel per block of
+    cells, showing "any alive" or the density of the block (computed with
+    a vectorized NumPy reduction over every cell of blocks up to
+    LOD_EXACT_BLOCK wide, over LOD_SAMPLES^2 cells of larger blocks;
+    without NumPy one cell per block is sampled). The work per frame
+    therefore depends on the window size, not on the board size.
 
+    If the viewport did not move, only the bands of image rows that
+    changed since the previous frame are blitted, together with the
+    matching part of a cached grid-line overlay. draw() returns the
+    screen rectangles that must be updated.
+    """
+
+    def __init__(self, screen: pygame.Surface, viewport: Viewport) -> None:
+        self.screen = screen
+        self.viewport = viewport
+        # Show the density of zoomed-out blocks instead of "any alive"
+        self.density = False
+        self._overlays: Dict[int, pygame.Surface] = {}
+        self._previous: Optional[Tuple[Any, bytes]] = None
+
+    def invalidate(self) -> None:
+        """
+        Redraw the whole window on the next draw() (e.g. after the window
+        was uncovered or the display mode changed).
+        """
+        self._previous = None
+
+    def draw(self, board: Board) -> List[pygame.Rect]:
+        """
+        Draw the parts of the visible board that changed since the last call.
+
+        :return: Screen rectangles that were redrawn (empty if nothing changed).
+        """
+        view = self.viewport
+        block = view.block
+        scale = max(int(view.zoom), 1)
+
+        # Visible cells, in whole pixels (zoom >= 1) or whole blocks
+        r0 = max(math.floor(view.y), 0)
+        c0 = max(math.floor(view.x), 0)
+        r1 = min(math.ceil(view.y + view.height / view.zoom), board.rows)
+        c1 = min(math.ceil(view.x + view.width / view.zoom), board.cols)
+        if r1 <= r0 or c1 <= c0:
+            return []
+
+        pixels, width, height = _board_image(board, r0, r1, c0, c1, block, self.density)
+
+        # Screen position of cell (r0, c0)
+        dest_x = round((c0 - view.x) * view.zoom)
+        dest_y = round((r0 - view.y) * view.zoom)
+        key = (view.state, self.density, width, height)
+
+        previous = self._previous
+        self._previous = (key, pixels)
+        if previous is not None and previous[0] == key:
+            bands = _changed_bands(previous[1], pixels, height, width)
+            if not bands:
+                return []
+            full = False
+        else:
+            bands = [(0, height)]
+            full = True
+            self.screen.fill(OUTSIDE_COLOR)
+
+        image = pygame.image.frombuffer(pixels, (width, height), "P")
+        image.set_palette(PALETTE)
 
-def run_pygame(board: Board, ruleset_name: str) -> None:
+        overlay = None
+        if scale >= GRID_MIN_CELL_SIZE:
+            overlay = self._overlay(scale)
+        board_rect = pygame.Rect(dest_x, dest_y, width * scale, height * scale)
+
+        rects = []
+        for b0, b1 in bands:
+            band = image.subsurface((0, b0, width, b1 - b0))
+            rect = pygame.Rect(
+                dest_x, dest_y + b0 * scale, width * scale, (b1 - b0) * scale
+            )
+            if scale > 1:
+                band = pygame.transform.scale(band, rect.size)
+            self.screen.blit(band, rect)
+            if overlay is not None:
+                # The overlay's lines are aligned with cell (r0, c0) at dest
+                self.screen.set_clip(board_rect)
+                self.screen.blit(overlay, rect, area=rect.move(-dest_x, -dest_y))
+                self.screen.set_clip(None)
+            rects.append(rect.clip(self.screen.get_rect()))
+
+        if full:
+            return [self.screen.get_rect()]
+        return rects
+
+    def _overlay(self, scale: int) -> pygame.Surface:
+        """
+        Grid lines for one cell size, drawn once and cached.
+        """
+        overlay = self._overlays.get(scale)
+        if overlay is None:
+            width = self.viewport.width + 2 * scale
+            height = self.viewport.height + 2 * scale
+            overlay = pygame.Surface((width, height))
+            overlay.fill(_OVERLAY_KEY)
+            overlay.set_colorkey(_OVERLAY_KEY)
+            for x in range(0, width, scale):
+                pygame.draw.line(overlay, GRID_COLOR, (x, 0), (x, height))
+            for y in range(0, height, scale):
+                pygame.draw.line(overlay, GRID_COLOR, (0, y), (width, y))
+            self._overlays[scale] = overlay
+        return overlay
+
+
+def _board_image(
+    board: Board, r0: int, r1: int, c0: int, c1: int, block: int, density: bool
+) -> Tuple[bytes, int, int]:
+    """
+    Build the palette image of cells [r0, r1) x [c0, c1).
+
+    :return: (pixels, width, height), one byte per pixel, row-major.
+    """
+    height = -(-(r1 - r0) // block)
+    width = -(-(c1 - c0) // block)
+
+    if np is None:
+        # One sampled cell per block, read through the row views
+        grid = board.grid
+        pixels = b"".join(bytes(row[c0:c1:block]) for row in grid[r0:r1:block])
+        return pixels.translate(_CELLS_TO_PIXELS), width, height
+
+    # The board's buffer as an array, without copying the cells
+    grid = np.asarray(board.view())
+    if block == 1:
+        pixels = (grid[r0:r1, c0:c1] * 255).astype(np.uint8).tobytes()
+        return pixels, c1 - c0, r1 - r0
+
+    # Exact reduction over every cell of small blocks; larger blocks read
+    # every `stride`-th cell: `samples` x `samples` cells per block
+    stride = 1 if block <= LOD_EXACT_BLOCK else max(block // LOD_SAMPLES, 1)
+    samples = block // stride
+    cells = grid[r0:r1:stride, c0:c1:stride]
+
+    # Pad to whole blocks and reduce each block to one pixel
+    pad_r = height * samples - cells.shape[0]
+    pad_c = width * samples - cells.shape[1]
+    if pad_r or pad_c:
+        cells = np.pad(cells, ((0, pad_r), (0, pad_c)))
+    # Reduce the rows of each block, then its columns: two passes over
+    # contiguous axes are much faster than one reduction over axes (1, 3)
+    rows = cells.reshape(height, samples, width * samples)
+    if density:
+        values = rows.sum(axis=1, dtype=np.uint16).reshape(height, width, samples)
+        values = values.sum(axis=2, dtype=np.uint32) * 255 // (samples * samples)
+    else:
+        values = rows.max(axis=1).reshape(height, width, samples)
+        values = values.max(axis=2).astype(np.uint32) * 255
+    return values.astype(np.uint8).tobytes(), width, height
+
+
+def _changed_bands(
+    previous: bytes, cells: bytes, rows: int, cols: int
+) -> List[Tuple[int, int]]:
+    """
+    Return (first row, end row) ranges of consecutive rows that differ.
+
+    Rows are compared as memoryview slices, i.e. one C-level comparison
+    per row.
+    """
+    old = memoryview(previous)
+    new = memoryview(cells)
+    bands: List[Tuple[int, int]] = []
+    start = -1
+    for r in range(rows):
+        lo = r * cols
+        if old[lo:lo + cols] != new[lo:lo + cols]:
+            if start < 0:
+                start = r
+        elif start >= 0:
+            bands.append((start, r))
+            start = -1
+    if start >= 0:
+        bands.append((start, rows))
+    return bands
+
+
+def run_pygame(board: Board, ruleset_name: str, engine_name: str = "python") -> None:
     """
     Run an interactive Pygame window for the Game of Life.
 
+    Rendering and simulation run on separate clocks: the window is drawn
+    at up to FPS frames per second, while the simulation advances at the
+    current simulation rate (generations per second), so several
+    generations may be computed for one displayed frame.
+
+    The window is at most WINDOW_SIZE; larger boards are shown through a
+    pannable, zoomable viewport, downsampled when zoomed out.
+
+    :param board: Initial board state.
+    :param ruleset_name: Name of the ruleset (e.g. "classic", "highlife").
+    :param engine_name: Name of the stepping engine (e.g. "python", "numpy").
+
     Controls:
         - LEFT MOUSE BUTTON: toggle a cell (alive/dead)
+        - RIGHT MOUSE BUTTON (drag): pan the view
+        - MOUSE WHEEL: zoom in/out around the mouse pointer
+        - F: fit the whole board in the window
+        - D: zoomed out, show block density instead of "any alive"
         - SPACE: start/stop the simulation (pause/unpause)
         - C: clear the board (all cells dead)
+        - LEFT ARROW: go back one generation (while paused)
+        - + / -: double / halve the simulation rate
         - ESC or window close: exit the application
     """
     pygame.init()
 
-    width = board.cols * CELL_SIZE
-    height = board.rows * CELL_SIZE
+    width = min(board.cols * CELL_SIZE, WINDOW_SIZE[0])
+    height = min(board.rows * CELL_SIZE, WINDOW_SIZE[1])
 
     screen = pygame.display.set_mode((width, height))
-    # ✅ Correct function name:
     pygame.display.set_caption("Conway's Game of Life")
 
     clock = pygame.time.Clock()
     rule = get_ruleset(ruleset_name)
+    step = get_engine(engine_name)
+    undo_depth = min(UNDO_DEPTH, UNDO_MAX_CELLS // (board.rows * board.cols))
+
+    # The python engine steps in place on two preallocated boards (the
+    # history ring is part of the DoubleBuffer); other engines return a new
+    # board per generation and keep a separate BoardHistory
+    buffers = None
+    history = None
+    if step is next_generation:
+        buffers = DoubleBuffer(board, rule, history=undo_depth)
+        board = buffers.current
+    elif undo_depth > 0:
+        history = BoardHistory(board.rows, board.cols, undo_depth)
+    viewport = Viewport(
+        board.rows, board.cols, width, height,
+        fit_zoom(board.rows, board.cols, width, height),
+    )
+    renderer = GridRenderer(screen, viewport)
 
     running = True
     paused = True  # start in paused mode so the user can edit the board first
+    sim_rate = SIM_RATE
+    # Generations owed to the simulation clock (fractional)
+    pending = 0.0
+    generation = 0
+    caption_time = 0.0
 
     while running:
+        elapsed = clock.tick(FPS) / 1000
+
         # --- Event handling ---
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     # Toggle pause state
                     paused = not paused
+                    pending = 0.0
                 elif event.key == pygame.K_c:
                     # Clear the board
                     board.clear()
+                elif event.key == pygame.K_LEFT and paused:
+                    # Undo one generation (if the history still has it)
+                    if buffers is not None:
+                        if buffers.undo():
+                            generation -= 1
+                    elif history is not None:
+                        previous = history.pop()
+                        if previous is not None:
+                            board = previous
+                            generation -= 1
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    sim_rate = min(sim_rate * 2, MAX_SIM_RATE)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    sim_rate = max(sim_rate // 2, MIN_SIM_RATE)
+                elif event.key == pygame.K_f:
+                    viewport.fit()
+                elif event.key == pygame.K_d:
+                    renderer.density = not renderer.density
                 elif event.key == pygame.K_ESCAPE:
                     running = False
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # Toggle cell on mouse click
-                mouse_x, mouse_y = event.pos
-                col = mouse_x // CELL_SIZE
-                row = mouse_y // CELL_SIZE
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                # Toggle the cell under the mouse (through the viewport)
+                row, col = viewport.screen_to_cell(*event.pos)
 
                 if 0 <= row < board.rows and 0 <= col < board.cols:
                     current = board.get_cell(row, col)
                     board.set_cell(row, col, alive=(not bool(current)))
 
-        # --- Update simulation ---
+            elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                viewport.pan(*event.rel)
+
+            elif event.type == pygame.MOUSEWHEEL:
+                viewport.zoom_at(event.y, *pygame.mouse.get_pos())
+
+        # --- Update simulation (simulation clock) ---
         if not paused:
-            board = next_generation(board, rule)
-
-        # --- Drawing ---
-        screen.fill(BG_COLOR)
-
-        # Draw cells
-        for r in range(board.rows):
-            for c in range(board.cols):
-                rect = pygame.Rect(
-                    c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE
-                )
-                color = ALIVE_COLOR if board.grid[r][c] else DEAD_COLOR
-                pygame.draw.rect(screen, color, rect)
-
-        # Draw grid lines (optional)
-        for x in range(0, width, CELL_SIZE):
-            pygame.draw.line(screen, GRID_COLOR, (x, 0), (x, height))
-        for y in range(0, height, CELL_SIZE):
-            pygame.draw.line(screen, GRID_COLOR, (0, y), (width, y))
-
-        pygame.display.flip()
-        clock.tick(FPS)
+            pending += elapsed * sim_rate
+            deadline = time.perf_counter() + STEP_BUDGET
+            while pending >= 1:
+                if buffers is not None:
+                    board = buffers.step()
+                else:
+                    if history is not None:
+                        history.push(board)
+                    board = step(board, rule)
+                generation += 1
+                pending -= 1
+                if time.perf_counter() > deadline:
+                    # The engine is slower than the requested rate:
+                    # drop the backlog instead of freezing the window
+                    pending = 0.0
+                    break
+
+        # --- Drawing (only what changed inside the viewport) ---
+        dirty = renderer.draw(board)
+        if dirty:
+            pygame.display.update(dirty)
+
+        now = time.perf_counter()
+        if now - caption_time >= 1:
+            caption_time = now
+            state = "paused" if paused else f"{sim_rate} gen/s"
+            pygame.display.set_caption(
+                f"Conway's Game of Life - generation {generation} ({state}, "
+                f"zoom {viewport.zoom:g}, {clock.get_fps():.0f} FPS)"
+            )
 
     pygame.quit()